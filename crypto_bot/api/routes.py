@@ -1,18 +1,31 @@
 """FastAPI routes + WebSocket real-time data."""
 import asyncio
+import dataclasses
+import functools
 import json
 import logging
+import sqlite3
 import time
 from typing import Optional
 
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect, HTTPException, BackgroundTasks
 from fastapi.responses import JSONResponse
 from pydantic import BaseModel
+import numpy as np
 
 from ..exchanges import UpbitExchange, BybitExchange
-from ..strategies import AutoStrategy, AutoStrategyConfig, UserStrategy, UserStrategyConfig, compute_indicators
-from ..arbitrage import KimchiPremiumMonitor
+from ..strategies import (
+    AutoStrategy, AutoStrategyConfig, UserStrategy, UserStrategyConfig,
+    compute_indicators, compute_indicator_series,
+)
+from ..arbitrage import (
+    KimchiPremiumMonitor, KimchiScanner, ArbitrageTrigger, CycleScanner, FundingScanner, InventoryManager,
+)
+from ..backtest import Backtester, sweep, grid_candidates, random_candidates
 from ..data import database as db
+from ..data.candle_store import candle_store, venue_name
+from ..data.candle_archive import candle_archive
+from ..data.export import export_table, import_table, resolve_export_path
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
@@ -25,11 +38,17 @@ _state: dict = {
     "auto_strategy": None,
     "user_strategy": None,
     "kimchi_monitor": None,
+    "kimchi_scanner": None,
+    "kimchi_trigger": None,
+    "cycle_scanner": None,
+    "funding_scanner": None,
+    "kimchi_was_profitable": False,
     "dry_run": True,
     "bot_running": False,
     "monitor_task": None,
 }
 _ws_clients: list[WebSocket] = []
+_bg_tasks: set[asyncio.Task] = set()   # 동기 콜백에서 만든 전송 태스크 (GC 방지)
 
 
 # ── WebSocket broadcast ────────────────────────────────────────────────────────
@@ -77,6 +96,7 @@ class AutoStrategyRequest(BaseModel):
     min_score_buy: float = 40.0
     max_score_sell: float = -40.0
     trade_cooldown: int = 300
+    rsi_dca_levels: list = []
 
 
 class UserStrategyRequest(BaseModel):
@@ -98,22 +118,66 @@ class UserStrategyRequest(BaseModel):
     interval: str = "15m"
 
 
+class BacktestRequest(BaseModel):
+    strategy: str = "auto"          # 'auto' | 'user'
+    symbol: str = "KRW-BTC"
+    interval: str = "15m"
+    exchange: str = "upbit"
+    limit: int = 200
+    seed_krw: float = 1_000_000
+    with_trades: bool = True
+
+
+class SweepRequest(BacktestRequest):
+    # Parameter names/units are the strategy config's (AutoStrategyConfig uses
+    # fractions, e.g. stop_loss_pct=0.03). grid: {name: [values]};
+    # random_space: {name: {"low": x, "high": y}} or {name: [choices]}
+    grid: dict = {}
+    random_space: dict = {}
+    n_random: int = 0
+    random_seed: Optional[int] = None
+    rank_by: str = "sharpe"
+    top: int = 10
+    apply_best: bool = False
+
+
 class ArbitrageConfig(BaseModel):
     min_profit_pct: float = 0.3
     trade_amount_krw: float = 1_000_000
     auto_trade: bool = False
+    max_fx_age_sec: float = 300.0
+
+
+class TableFileRequest(BaseModel):
+    table: str                        # trades | signals | arbitrage
+    path: str                         # crypto_bot_exports/ 기준 상대 경로 (.csv, .csv.gz, .parquet)
+    format: Optional[str] = None      # 생략 시 확장자로 판단
+    since: Optional[float] = None     # export 전용
+    until: Optional[float] = None
+    keep_ids: bool = False            # import 전용: 원래 id 유지, 중복은 건너뜀
 
 
 # ── Setup endpoints ────────────────────────────────────────────────────────────
 @router.post("/api/setup")
 async def setup_exchanges(keys: ExchangeKeys):
+    # 실행 중인 봇/김프 트리거/스트림은 기존 커넥터를 붙잡고 있으므로 먼저 멈추게 한다
+    if _state["bot_running"] or _state["kimchi_trigger"]:
+        raise HTTPException(409, "Stop the bot before changing exchange keys")
+    await close_exchanges()   # 이전 커넥터의 연결 풀 정리
     _state["upbit"] = UpbitExchange(keys.upbit_key, keys.upbit_secret)
     _state["bybit_spot"] = BybitExchange(keys.bybit_key, keys.bybit_secret, "spot")
     _state["bybit_futures"] = BybitExchange(keys.bybit_key, keys.bybit_secret, "linear")
     _state["dry_run"] = keys.dry_run
+    # 이전 커넥터를 참조하는 객체는 새 커넥터로 다시 만든다 (김프 모니터는 다음 요청 때 생성)
+    if _state["cycle_scanner"]:
+        _state["cycle_scanner"].stop()
+    for name in ("kimchi_monitor", "kimchi_scanner", "cycle_scanner", "funding_scanner"):
+        _state[name] = None
+    if _state["auto_strategy"]:
+        _state["auto_strategy"].exchange = _state["upbit"]
 
     # Save to DB
-    db.save_config("exchange_keys", {
+    await db.run(db.save_config, "exchange_keys", {
         "upbit_key": keys.upbit_key[:8] + "***",
         "bybit_key": keys.bybit_key[:8] + "***",
         "dry_run": keys.dry_run,
@@ -132,6 +196,11 @@ async def get_status():
         "auto_strategy_active": _state["auto_strategy"] is not None,
         "user_strategy_active": _state["user_strategy"] is not None,
         "kimchi_monitor_active": _state["kimchi_monitor"] is not None,
+        "kimchi_trigger": _state["kimchi_trigger"].status() if _state["kimchi_trigger"] else None,
+        "streams": {
+            name: _state[name].stream.status()
+            for name in EXCHANGE_KEYS if _state.get(name) and _state[name].stream
+        },
     }
 
 
@@ -153,7 +222,7 @@ async def get_ticker(symbol: str = "KRW-BTC", exchange: str = "upbit"):
 async def get_ohlcv(symbol: str = "KRW-BTC", interval: str = "15m",
                     limit: int = 200, exchange: str = "upbit"):
     ex = _get_exchange(exchange)
-    data = await ex.get_ohlcv(symbol, interval, limit)
+    data = await candle_store.get_ohlcv(ex, symbol, interval, limit)
     return {"symbol": symbol, "interval": interval, "data": data}
 
 
@@ -175,7 +244,7 @@ async def get_balances(exchange: str = "upbit"):
 @router.get("/api/analysis")
 async def get_analysis(symbol: str = "KRW-BTC", interval: str = "15m", exchange: str = "upbit"):
     ex = _get_exchange(exchange)
-    ohlcv = await ex.get_ohlcv(symbol, interval, 200)
+    ohlcv = await candle_store.get_ohlcv(ex, symbol, interval, 200)
     ticker = await ex.get_ticker(symbol)
     indicators = compute_indicators(ohlcv)
     if not indicators:
@@ -210,6 +279,27 @@ async def get_analysis(symbol: str = "KRW-BTC", interval: str = "15m", exchange:
     }
 
 
+@router.get("/api/analysis/series")
+async def get_analysis_series(symbol: str = "KRW-BTC", interval: str = "15m",
+                              limit: int = 200, exchange: str = "upbit"):
+    """Indicator history as aligned columns (first 59 bars are null warm-up)."""
+    ex = _get_exchange(exchange)
+    ohlcv = await candle_store.get_ohlcv(ex, symbol, interval, limit)
+    series = compute_indicator_series(ohlcv)
+    if series is None:
+        raise HTTPException(400, "Not enough data for analysis")
+
+    return {
+        "symbol": symbol,
+        "exchange": exchange,
+        "interval": interval,
+        "ts": [c[0] for c in ohlcv],
+        "close": [c[4] for c in ohlcv],
+        "columns": series.to_dict(),
+        "timestamp": time.time(),
+    }
+
+
 @router.get("/api/funding-rate")
 async def get_funding_rate(symbol: str = "BTCUSDT"):
     ex = _state.get("bybit_futures")
@@ -227,12 +317,42 @@ async def get_funding_rate(symbol: str = "BTCUSDT"):
     }
 
 
+@router.get("/api/funding-rates")
+async def scan_funding_rates(top: int = 30, min_persistence: int = 0, upbit_only: bool = False,
+                             backfill: bool = False):
+    """바이비트 USDT 무기한 전 종목 펀딩 캐리 (티커 1회 요청), |연환산 펀딩비| 순.
+
+    정산 펀딩비 백필은 백그라운드에서 돈다 (앱 시작 시 이력이 없으면 자동).
+    backfill=true 면 백필을 다시 시작하고 바로 응답한다.
+    """
+    if not _state.get("bybit_futures"):
+        return {"error": "Bybit not configured"}
+    scanner = await _funding_scanner()
+    monitor = _state["kimchi_monitor"]
+    await monitor.fx.start()
+    if backfill:
+        scanner.start_backfill(force=True)
+    quotes = await scanner.scan(min_persistence)
+    if upbit_only:
+        quotes = [q for q in quotes if q.upbit_symbol]
+    return {
+        "count": len(quotes),
+        "usd_krw": monitor.fx.rate,
+        "backfilling": scanner.backfilling,
+        "timestamp": time.time(),
+        "results": [dataclasses.asdict(q) for q in quotes[:top]],
+    }
+
+
 # ── Kimchi premium endpoints ───────────────────────────────────────────────────
 @router.get("/api/kimchi")
 async def get_kimchi():
-    if not _ensure_kimchi():
+    if not await _ensure_kimchi():
         raise HTTPException(400, "Exchanges not configured")
-    opp = await _state["kimchi_monitor"].check()
+    try:
+        opp = await _state["kimchi_monitor"].check()
+    except RuntimeError as e:
+        raise HTTPException(503, str(e))
     return {
         "upbit_price": opp.upbit_price_krw,
         "bybit_price_usdt": opp.bybit_price_usdt,
@@ -241,27 +361,119 @@ async def get_kimchi():
         "kimchi_pct": opp.kimchi_premium_pct,
         "net_profit_pct": opp.net_profit_pct,
         "is_profitable": opp.is_profitable,
+        "upbit_vwap_krw": opp.upbit_vwap_krw,
+        "bybit_vwap_usdt": opp.bybit_vwap_usdt,
+        "depth_premium_pct": opp.depth_premium_pct,
+        "slippage_pct": opp.slippage_pct,
+        "depth_net_profit_pct": opp.depth_net_profit_pct,
+        "max_profitable_krw": opp.max_profitable_krw,
         "direction": opp.direction,
         "note": opp.note,
+        "fx_source": opp.fx_source,
+        "fx_age_sec": opp.fx_age_sec,
         "timestamp": opp.timestamp,
     }
 
 
+@router.get("/api/kimchi/scan")
+async def scan_kimchi(top: int = 20, profitable_only: bool = False):
+    """김프 전 종목 스캔 (업비트 KRW ∩ 바이비트 USDT), 수수료 후 수익률 순."""
+    if not await _ensure_kimchi():
+        raise HTTPException(400, "Exchanges not configured")
+    if not _state["kimchi_scanner"]:
+        _state["kimchi_scanner"] = KimchiScanner(_state["kimchi_monitor"])
+    try:
+        quotes = await _state["kimchi_scanner"].scan()
+    except RuntimeError as e:
+        raise HTTPException(503, str(e))
+    if profitable_only:
+        quotes = [q for q in quotes if q.is_profitable]
+    return {
+        "count": len(quotes),
+        "usd_krw": _state["kimchi_monitor"].fx.rate,
+        "timestamp": time.time(),
+        "results": [dataclasses.asdict(q) for q in quotes[:top]],
+    }
+
+
+@router.get("/api/arbitrage/cycles")
+async def scan_cycles(top: int = 20, profitable_only: bool = False, max_len: int = 4):
+    """삼각/교차 거래소 차익 사이클 (업비트 KRW·BTC·USDT 마켓 + 바이비트 현물 + 환율), 수익률 순."""
+    if not await _ensure_kimchi():
+        raise HTTPException(400, "Exchanges not configured")
+    if not 3 <= max_len <= 5:
+        raise HTTPException(400, "max_len must be 3..5")
+    scanner = _state["cycle_scanner"]
+    if not scanner or scanner.max_len != max_len:
+        if scanner:
+            scanner.stop()
+        scanner = _state["cycle_scanner"] = CycleScanner(
+            _state["kimchi_monitor"], max_len=max_len, on_cycle=_on_cycle,
+        )
+    try:
+        cycles = await scanner.scan(top, profitable_only)
+    except RuntimeError as e:
+        raise HTTPException(503, str(e))
+    scanner.listen()   # 그래프가 생긴 뒤부터 스트림 호가로 엣지를 실시간 갱신 (스트림 없으면 무시)
+    return {
+        "cycles_tracked": len(scanner.graph.cycles),
+        "usd_krw": _state["kimchi_monitor"].fx.rate,
+        "timestamp": time.time(),
+        "results": [dataclasses.asdict(c) for c in cycles],
+    }
+
+
+@router.get("/api/inventory")
+async def get_inventory(sync: bool = False):
+    """차익거래용 캐시 잔고, 방향별 최대 거래 금액, 리밸런싱 시점/계획."""
+    if not await _ensure_kimchi():
+        raise HTTPException(400, "Exchanges not configured")
+    monitor = _state["kimchi_monitor"]
+    inv = monitor.inventory
+    try:
+        await inv.sync(force=sync)
+    except Exception as e:
+        raise HTTPException(503, f"Balance sync failed: {e}")
+    out = {"status": inv.status()}
+    if not monitor.history:
+        return out
+    last = monitor.history[-1]
+    prices = (last.upbit_price_krw, last.bybit_price_usdt, last.usd_krw_rate)
+    out["simulation"] = {
+        d: {k: v for k, v in inv.simulate(d, monitor.trade_amount_krw, *prices).items() if k != "balances_at_limit"}
+        for d in ("kimchi_buy_bybit", "reverse_buy_upbit")
+    }
+    out["rebalance"] = dataclasses.asdict(inv.plan_rebalance(*prices))
+    return out
+
+
+@router.get("/api/fx")
+async def get_fx():
+    """공개 환율 + 소스별 마지막 값과 경과 시간."""
+    if not await _ensure_kimchi():
+        raise HTTPException(400, "Exchanges not configured")
+    fx = _state["kimchi_monitor"].fx
+    await fx.start()
+    return {**fx.status(), "max_age_sec": _state["kimchi_monitor"].max_fx_age}
+
+
 @router.get("/api/kimchi/stats")
-async def get_kimchi_stats():
+async def get_kimchi_stats(coin: str = "BTC"):
+    """현재 김프 + 1m/1h/24h 롤링 평균·표준편차·z-score·분위수 (coin 별)."""
     if not _state["kimchi_monitor"]:
         return {"error": "Monitor not running"}
-    return _state["kimchi_monitor"].get_stats()
+    return _state["kimchi_monitor"].get_stats(coin.upper())
 
 
 @router.post("/api/kimchi/config")
 async def set_kimchi_config(cfg: ArbitrageConfig):
-    if not _ensure_kimchi():
+    if not await _ensure_kimchi():
         raise HTTPException(400, "Exchanges not configured")
     monitor = _state["kimchi_monitor"]
     monitor.min_profit_pct = cfg.min_profit_pct
     monitor.trade_amount_krw = cfg.trade_amount_krw
     monitor.auto_trade = cfg.auto_trade
+    monitor.max_fx_age = cfg.max_fx_age_sec
     return {"status": "ok", "config": cfg.dict()}
 
 
@@ -281,8 +493,10 @@ async def set_auto_config(req: AutoStrategyRequest):
         max_score_sell=-abs(req.max_score_sell),
         trade_cooldown=req.trade_cooldown,
     )
-    _state["auto_strategy"] = AutoStrategy(ex, cfg)
-    db.save_config("auto_strategy", req.dict())
+    if req.rsi_dca_levels:
+        cfg.rsi_dca_levels = req.rsi_dca_levels
+    _state["auto_strategy"] = AutoStrategy(ex, cfg, candle_store)
+    await db.run(db.save_config, "auto_strategy", req.dict())
     return {"status": "ok", "config": req.dict()}
 
 
@@ -311,7 +525,7 @@ async def set_user_config(req: UserStrategyRequest):
         interval=req.interval,
     )
     _state["user_strategy"] = UserStrategy(cfg)
-    db.save_config("user_strategy", cfg.to_dict())
+    await db.run(db.save_config, "user_strategy", cfg.to_dict())
     return {"status": "ok", "config": cfg.to_dict()}
 
 
@@ -320,7 +534,7 @@ async def auto_analyze(symbol: str = "KRW-BTC", interval: str = "15m"):
     if not _state.get("auto_strategy"):
         ex = _get_exchange("upbit")
         cfg = AutoStrategyConfig(symbol=symbol, interval=interval)
-        _state["auto_strategy"] = AutoStrategy(ex, cfg)
+        _state["auto_strategy"] = AutoStrategy(ex, cfg, candle_store)
     result = await _state["auto_strategy"].analyze()
     return result
 
@@ -332,6 +546,82 @@ async def auto_stats():
     return _state["auto_strategy"].get_stats()
 
 
+@router.post("/api/backtest")
+async def run_backtest(req: BacktestRequest):
+    """Replay recent candles through the configured (or default) strategy."""
+    ex = _get_exchange(req.exchange)
+    ohlcv = await _history(ex, req.symbol, req.interval, req.limit)
+    if req.strategy == "user":
+        user = _state.get("user_strategy")
+        cfg = user.cfg if user else UserStrategyConfig(interval=req.interval)
+    else:
+        auto = _state.get("auto_strategy")
+        cfg = auto.cfg if auto else AutoStrategyConfig(symbol=req.symbol, interval=req.interval)
+
+    def backtest():
+        bt = Backtester(ohlcv, symbol=req.symbol, seed_krw=req.seed_krw, taker_fee=ex.taker_fee)
+        return bt.run_user(cfg) if req.strategy == "user" else bt.run_auto(cfg)
+
+    # CPU 작업은 이벤트 루프 밖에서 (봇 루프/웹소켓 전송이 멈추지 않게)
+    try:
+        report = await asyncio.get_running_loop().run_in_executor(None, backtest)
+    except ValueError as e:
+        raise HTTPException(400, str(e))
+    return report.summary(with_trades=req.with_trades)
+
+
+@router.post("/api/backtest/sweep")
+async def run_sweep(req: SweepRequest):
+    """Grid/random search over strategy params, ranked by backtest result.
+
+    Each result carries a `config` body that can be posted as-is to
+    /api/strategy/{auto,user}/config; apply_best does that for the winner.
+    """
+    candidates = grid_candidates(req.grid) if req.grid else []
+    if req.n_random:
+        space = {
+            k: (v["low"], v["high"]) if isinstance(v, dict) else v
+            for k, v in req.random_space.items()
+        }
+        candidates += random_candidates(space, req.n_random, req.random_seed)
+    if not candidates:
+        raise HTTPException(400, "No candidates: give a grid or random_space + n_random")
+
+    ex = _get_exchange(req.exchange)
+    ohlcv = await _history(ex, req.symbol, req.interval, req.limit)
+    if req.strategy == "user":
+        user = _state.get("user_strategy")
+        base = user.cfg if user else UserStrategyConfig(interval=req.interval)
+    else:
+        auto = _state.get("auto_strategy")
+        base = auto.cfg if auto else AutoStrategyConfig(symbol=req.symbol, interval=req.interval)
+
+    try:
+        results = await asyncio.get_running_loop().run_in_executor(None, functools.partial(
+            sweep, ohlcv, base, candidates,
+            symbol=req.symbol, seed_krw=req.seed_krw, taker_fee=ex.taker_fee, rank_by=req.rank_by,
+        ))
+    except ValueError as e:
+        raise HTTPException(400, str(e))
+
+    ranked = []
+    for r in results[:req.top]:
+        if req.strategy == "user":
+            config = UserStrategyConfig.from_dict({**base.to_dict(), **r.params}).to_dict()
+        else:
+            config = _auto_request(dataclasses.replace(base, **r.params))
+        ranked.append({**dataclasses.asdict(r), "config": config})
+
+    applied = False
+    if req.apply_best and ranked:
+        if req.strategy == "user":
+            await set_user_config(UserStrategyRequest(**ranked[0]["config"]))
+        else:
+            await set_auto_config(AutoStrategyRequest(**ranked[0]["config"]))
+        applied = True
+    return {"candidates": len(candidates), "applied": applied, "results": ranked}
+
+
 # ── Bot control ────────────────────────────────────────────────────────────────
 @router.post("/api/bot/start")
 async def start_bot(background_tasks: BackgroundTasks, seed_krw: float = 1_000_000):
@@ -352,12 +642,119 @@ async def stop_bot():
 
 @router.get("/api/trades")
 async def get_trades(limit: int = 50):
-    return db.get_trades(limit)
+    return await db.run(db.get_trades, limit)
 
 
 @router.get("/api/pnl")
 async def get_pnl():
-    return db.get_pnl_summary()
+    return await db.run(db.get_pnl_summary)
+
+
+@router.get("/api/pnl/daily")
+async def get_pnl_daily(days: int = 30, dry_run: bool = False):
+    """일별 손익 (KST, 증분 집계 테이블에서 조회)."""
+    return await db.run(db.get_pnl_daily, days, dry_run)
+
+
+@router.get("/api/signals/indicators")
+async def get_indicator_distribution(symbol: str = "KRW-BTC", column: str = "rsi", days: float = 30,
+                                     bins: int = 20):
+    """기록된 시그널의 지표 분포 (타입 컬럼을 배열로 읽어 집계)."""
+    try:
+        data = await db.run(db.load_indicators, symbol, [column], time.time() - days * 86400)
+    except ValueError as e:
+        raise HTTPException(400, str(e))
+    values = data[column][~np.isnan(data[column])]
+    if not len(values):
+        return {"symbol": symbol, "column": column, "count": 0}
+    counts, edges = np.histogram(values, bins=bins)
+    p5, p25, p50, p75, p95 = np.percentile(values, [5, 25, 50, 75, 95])
+    return {
+        "symbol": symbol,
+        "column": column,
+        "count": int(len(values)),
+        "mean": float(values.mean()),
+        "std": float(values.std()),
+        "min": float(values.min()),
+        "max": float(values.max()),
+        "percentiles": {"p5": float(p5), "p25": float(p25), "p50": float(p50), "p75": float(p75), "p95": float(p95)},
+        "histogram": {"counts": counts.tolist(), "edges": edges.tolist()},
+    }
+
+
+@router.get("/api/db/stats")
+async def get_db_stats():
+    """Write-behind 버퍼 상태 (대기 행 수, 백프레셔, flush 지연) + 스키마 버전."""
+    return {**db.write_behind.stats(), "schema_version": await db.run(db.schema_version)}
+
+
+@router.post("/api/db/export")
+async def export_history(req: TableFileRequest):
+    """테이블을 청크 단위로 파일에 스트리밍 (봇 실행 중에도 가능, DB 스레드를 점유하지 않음)."""
+    try:
+        path = resolve_export_path(req.path, create_dir=True)
+        return await asyncio.get_running_loop().run_in_executor(None, functools.partial(
+            export_table, req.table, path, req.format, req.since, req.until,
+        ))
+    except (ValueError, RuntimeError, OSError) as e:
+        raise HTTPException(400, str(e))
+
+
+@router.post("/api/db/import")
+async def import_history(req: TableFileRequest):
+    """export 파일을 청크 단위로 다시 적재 (DB 스레드에서, 청크마다 한 트랜잭션)."""
+    try:
+        path = resolve_export_path(req.path)
+        return await db.run(import_table, req.table, path, req.format, req.keep_ids)
+    except (ValueError, RuntimeError, OSError, sqlite3.Error) as e:
+        raise HTTPException(400, str(e))
+
+
+# ── Exchange lifecycle (app lifespan) ─────────────────────────────────────────
+EXCHANGE_KEYS = ("upbit", "bybit_spot", "bybit_futures")
+
+
+async def start_exchanges():
+    """Create the public connectors and open their pooled HTTP sessions."""
+    for name in EXCHANGE_KEYS:
+        await _get_exchange(name).start()
+
+
+async def start_funding_backfill():
+    """Fill funding history in the background when it is empty (first run)."""
+    try:
+        scanner = await _funding_scanner()
+    except Exception as e:
+        logger.warning(f"펀딩 스캐너 준비 실패: {e}")
+        return
+    scanner.start_backfill()
+
+
+async def _start_streams():
+    """Websocket feeds for the symbols the bot loop reads, so tickers/books come from memory."""
+    upbit_symbols = ["KRW-BTC"]
+    if _state.get("auto_strategy"):
+        upbit_symbols.append(_state["auto_strategy"].cfg.symbol)
+    try:
+        await _state["upbit"].start_stream(upbit_symbols)
+        await _state["bybit_spot"].start_stream(["BTCUSDT"])
+    except Exception as e:
+        logger.warning(f"시세 스트림 시작 실패 (REST 사용): {e}")
+
+
+async def close_exchanges():
+    if _state["kimchi_trigger"]:
+        await _state["kimchi_trigger"].stop()
+        _state["kimchi_trigger"] = None
+    if _state["kimchi_monitor"]:
+        await _state["kimchi_monitor"].fx.stop()
+        _state["kimchi_monitor"].premiums.flush()
+    if _state["funding_scanner"]:
+        await _state["funding_scanner"].stop()
+    for name in EXCHANGE_KEYS:
+        ex = _state.get(name)
+        if ex:
+            await ex.close()
 
 
 # ── Internal helpers ───────────────────────────────────────────────────────────
@@ -379,21 +776,70 @@ def _get_exchange(name: str) -> UpbitExchange | BybitExchange:
     return ex
 
 
-def _ensure_kimchi() -> bool:
+async def _history(ex, symbol: str, interval: str, limit: int):
+    """Long candle history for backtests: synced via the store, read from the mmap archive."""
+    await candle_store.sync(ex, symbol, interval, limit)
+    venue = venue_name(ex)
+    await db.run(candle_archive.sync_from_store, candle_store, venue, symbol, interval)
+    return candle_archive.read(venue, symbol, interval, limit=limit).to_array()
+
+
+def _auto_request(cfg: AutoStrategyConfig) -> dict:
+    """AutoStrategyConfig -> AutoStrategyRequest body (percent units)."""
+    return AutoStrategyRequest(
+        symbol=cfg.symbol,
+        interval=cfg.interval,
+        base_invest_ratio=cfg.base_invest_ratio,
+        max_invest_ratio=cfg.max_invest_ratio,
+        stop_loss_pct=cfg.stop_loss_pct * 100,
+        take_profit_pct=cfg.take_profit_pct * 100,
+        trailing_stop_pct=cfg.trailing_stop_pct * 100,
+        min_score_buy=cfg.min_score_buy,
+        max_score_sell=cfg.max_score_sell,
+        trade_cooldown=cfg.trade_cooldown,
+        rsi_dca_levels=cfg.rsi_dca_levels,
+    ).dict()
+
+
+async def _ensure_kimchi() -> bool:
     if not _state["upbit"] or not _state["bybit_spot"]:
         _state["upbit"] = _state["upbit"] or UpbitExchange()
         _state["bybit_spot"] = _state["bybit_spot"] or BybitExchange()
     if not _state["kimchi_monitor"]:
-        _state["kimchi_monitor"] = KimchiPremiumMonitor(
-            _state["upbit"], _state["bybit_spot"]
+        monitor = KimchiPremiumMonitor(
+            _state["upbit"], _state["bybit_spot"],
+            inventory=InventoryManager(_state["upbit"], _state["bybit_spot"]),
         )
+        loaded = await db.run(monitor.premiums.load)
+        if not _state["kimchi_monitor"]:   # 로드 중 다른 요청이 먼저 만들었으면 그것을 사용
+            _state["kimchi_monitor"] = monitor
+            logger.info(f"김프 이력 {loaded}건 로드")
     return True
 
 
+async def _funding_scanner() -> FundingScanner:
+    ex = _get_exchange("bybit_futures")
+    await _ensure_kimchi()
+    scanner = _state["funding_scanner"]
+    if not scanner or scanner.bybit is not ex:
+        if scanner:
+            await scanner.stop()
+        scanner = FundingScanner(ex, _state["upbit"], _state["kimchi_monitor"].fx)
+        await db.run(scanner.load_history)
+        _state["funding_scanner"] = scanner
+    return scanner
+
+
 async def _run_bot_loop(seed_krw: float):
     """Main trading loop - runs in background."""
     logger.info(f"Bot loop started | seed={seed_krw:,.0f}KRW | dry_run={_state['dry_run']}")
-    _ensure_kimchi()
+    await _ensure_kimchi()
+    await _start_streams()
+    if _state["cycle_scanner"]:
+        _state["cycle_scanner"].listen()   # 스캔으로 만든 사이클 그래프를 스트림에 연결
+    # 김프는 시세 이벤트마다 트리거가 처리 (30초 루프와 별개)
+    _state["kimchi_trigger"] = ArbitrageTrigger(_state["kimchi_monitor"], on_update=_on_kimchi_update)
+    await _state["kimchi_trigger"].start()
 
     while _state["bot_running"]:
         try:
@@ -401,7 +847,7 @@ async def _run_bot_loop(seed_krw: float):
             if _state.get("auto_strategy"):
                 result = await _state["auto_strategy"].analyze()
                 await broadcast({"type": "analysis", "data": result})
-                db.save_signal(
+                db.queue_signal(   # write-behind 버퍼 → 일괄 기록
                     "upbit",
                     result.get("symbol", ""),
                     result.get("signal", ""),
@@ -415,7 +861,7 @@ async def _run_bot_loop(seed_krw: float):
                     seed_krw, dry_run=_state["dry_run"]
                 )
                 if trade:
-                    db.save_trade(
+                    db.queue_trade(
                         "upbit", trade.symbol, trade.side, trade.price, trade.qty,
                         trade.krw_amount, trade.fee, trade.pnl, trade.order_id,
                         "auto", trade.note, _state["dry_run"]
@@ -425,25 +871,6 @@ async def _run_bot_loop(seed_krw: float):
                         "qty": trade.qty, "pnl": trade.pnl, "note": trade.note
                     }})
 
-            # 2) Kimchi premium check
-            if _state.get("kimchi_monitor"):
-                opp = await _state["kimchi_monitor"].check()
-                await broadcast({"type": "kimchi", "data": {
-                    "kimchi_pct": opp.kimchi_premium_pct,
-                    "net_profit_pct": opp.net_profit_pct,
-                    "is_profitable": opp.is_profitable,
-                    "direction": opp.direction,
-                    "usd_krw": opp.usd_krw_rate,
-                    "upbit_price": opp.upbit_price_krw,
-                    "bybit_price_krw": opp.bybit_price_krw,
-                }})
-                if opp.is_profitable:
-                    db.save_arbitrage(
-                        opp.kimchi_premium_pct, opp.net_profit_pct, opp.direction,
-                        opp.upbit_price_krw, opp.bybit_price_krw, opp.usd_krw_rate,
-                        _state["kimchi_monitor"].trade_amount_krw, 0, "detected"
-                    )
-
             await asyncio.sleep(30)  # 30초마다 실행
 
         except asyncio.CancelledError:
@@ -453,4 +880,43 @@ async def _run_bot_loop(seed_krw: float):
             await broadcast({"type": "error", "data": {"message": str(e)}})
             await asyncio.sleep(10)
 
+    if _state["kimchi_trigger"]:
+        await _state["kimchi_trigger"].stop()
+        _state["kimchi_trigger"] = None
     logger.info("Bot loop stopped")
+
+
+def _on_cycle(cycle):
+    """사이클 스캐너 리스너 콜백 (동기): 수익 사이클을 대시보드로 전송."""
+    task = asyncio.get_running_loop().create_task(
+        broadcast({"type": "cycle", "data": dataclasses.asdict(cycle)})
+    )
+    _bg_tasks.add(task)
+    task.add_done_callback(_bg_tasks.discard)
+
+
+async def _on_kimchi_update(opp, result):
+    """김프 트리거 콜백: 대시보드 전송 + 수익 구간 진입/실행 기록."""
+    await broadcast({"type": "kimchi", "data": {
+        "kimchi_pct": opp.kimchi_premium_pct,
+        "net_profit_pct": opp.net_profit_pct,
+        "is_profitable": opp.is_profitable,
+        "direction": opp.direction,
+        "usd_krw": opp.usd_krw_rate,
+        "upbit_price": opp.upbit_price_krw,
+        "bybit_price_krw": opp.bybit_price_krw,
+    }})
+    monitor = _state["kimchi_monitor"]
+    if result is not None:
+        db.queue_arbitrage(
+            opp.kimchi_premium_pct, opp.net_profit_pct, opp.direction,
+            opp.upbit_price_krw, opp.bybit_price_krw, opp.usd_krw_rate,
+            result.trade_amount_krw, result.actual_profit_krw, result.status,
+        )
+    elif opp.is_profitable and not _state["kimchi_was_profitable"]:
+        db.queue_arbitrage(
+            opp.kimchi_premium_pct, opp.net_profit_pct, opp.direction,
+            opp.upbit_price_krw, opp.bybit_price_krw, opp.usd_krw_rate,
+            monitor.trade_amount_krw, 0, "detected"
+        )
+    _state["kimchi_was_profitable"] = opp.is_profitable
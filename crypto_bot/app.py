@@ -1,6 +1,8 @@
 """FastAPI application factory."""
+import asyncio
 import logging
 import os
+from contextlib import asynccontextmanager
 from pathlib import Path
 
 from fastapi import FastAPI
@@ -8,8 +10,8 @@ from fastapi.staticfiles import StaticFiles
 from fastapi.responses import FileResponse
 from fastapi.middleware.cors import CORSMiddleware
 
-from .api.routes import router
-from .data.database import init_db
+from .api.routes import router, start_exchanges, close_exchanges, start_funding_backfill
+from .data.database import init_db, close as close_db, retention_loop
 
 logging.basicConfig(
     level=logging.INFO,
@@ -21,6 +23,22 @@ STATIC_DIR = Path(__file__).parent / "dashboard" / "static"
 DASHBOARD_DIR = Path(__file__).parent / "dashboard"
 
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    logger.info("=== 코인 자동매매 봇 시작 ===")
+    logger.info("대시보드: http://localhost:8000")
+    logger.info("API 문서: http://localhost:8000/docs")
+    await start_exchanges()
+    await start_funding_backfill()   # 펀딩 이력이 비어 있으면 백그라운드로 채움
+    retention = asyncio.create_task(retention_loop())   # 오래된 시그널 주기적 삭제
+    yield
+    retention.cancel()
+    await close_exchanges()
+    # 대기 중인 DB 쓰기를 마저 처리하고 연결을 닫는다
+    await asyncio.get_running_loop().run_in_executor(None, close_db)
+    logger.info("=== 코인 자동매매 봇 종료 ===")
+
+
 def create_app() -> FastAPI:
     init_db()
 
@@ -28,6 +46,7 @@ def create_app() -> FastAPI:
         title="코인 자동매매 봇",
         description="업비트 + 바이비트 자동매매 | 김프 차익거래 | 실시간 분석",
         version="1.0.0",
+        lifespan=lifespan,
     )
 
     app.add_middleware(
@@ -52,12 +71,6 @@ def create_app() -> FastAPI:
             return FileResponse(str(html_path))
         return {"status": "running", "docs": "/docs"}
 
-    @app.on_event("startup")
-    async def startup():
-        logger.info("=== 코인 자동매매 봇 시작 ===")
-        logger.info("대시보드: http://localhost:8000")
-        logger.info("API 문서: http://localhost:8000/docs")
-
     return app
 
 
@@ -1,3 +1,18 @@
 from .kimchi import KimchiPremiumMonitor, ArbitrageOpportunity, ArbitrageResult
+from .scanner import KimchiScanner, PremiumQuote
+from .trigger import ArbitrageTrigger
+from .graph import ArbitrageGraph, ArbitrageCycle, CycleScanner
+from .funding import FundingScanner, CarryQuote
+from .inventory import InventoryManager, RebalancePlan, RebalanceStep, TransferCost
+from .history import PremiumHistory, PremiumSeries
+from .fx import FxService, FxQuote, FxSource, ErApiSource, UpbitUsdtSource, StaticFxSource
 
-__all__ = ["KimchiPremiumMonitor", "ArbitrageOpportunity", "ArbitrageResult"]
+__all__ = [
+    "KimchiPremiumMonitor", "ArbitrageOpportunity", "ArbitrageResult",
+    "KimchiScanner", "PremiumQuote", "ArbitrageTrigger",
+    "FxService", "FxQuote", "FxSource", "ErApiSource", "UpbitUsdtSource", "StaticFxSource",
+    "PremiumHistory", "PremiumSeries",
+    "ArbitrageGraph", "ArbitrageCycle", "CycleScanner",
+    "FundingScanner", "CarryQuote",
+    "InventoryManager", "RebalancePlan", "RebalanceStep", "TransferCost",
+]
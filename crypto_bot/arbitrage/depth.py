@@ -0,0 +1,78 @@
+"""
+호가 깊이 기반 차익 수익성 평가.
+
+두 거래소 호가를 실제 주문 수량만큼 훑어서(VWAP) 슬리피지를 반영한 김프와
+수수료 후 순수익률을 구하고, 순수익률이 최소 기준을 넘는 최대 주문 규모를 찾는다.
+수량 그리드 전체를 한 번의 벡터 연산으로 계산하므로 호가 갱신마다 돌릴 수 있다.
+"""
+from dataclasses import dataclass
+
+import numpy as np
+
+from ..exchanges.orderbook import L2Book
+
+DEPTH_GRID = 128   # 최대 규모 탐색용 수량 분할 수
+
+
+@dataclass
+class DepthQuote:
+    qty: float                   # 주문 수량 (코인)
+    filled: bool                 # 양쪽 호가로 전량 체결 가능한지
+    upbit_vwap_krw: float
+    bybit_vwap_usdt: float
+    premium_pct: float           # VWAP 기준 김프 %
+    slippage_pct: float          # 최우선 호가 대비 김프 손실 %p
+    net_profit_pct: float        # 슬리피지 + 수수료 후 순수익률 %
+    max_profitable_krw: float    # 순수익률 >= 기준인 최대 업비트 체결 금액
+    max_profitable_qty: float
+
+
+def evaluate_depth(
+    upbit_book: L2Book,
+    bybit_book: L2Book,
+    usd_krw: float,
+    kimchi_positive: bool,
+    trade_amount_krw: float,
+    fee_pct: float,
+    min_profit_pct: float,
+    grid: int = DEPTH_GRID,
+) -> DepthQuote:
+    """Walk both books for trade_amount_krw (and a size grid for the maximum size).
+
+    kimchi_positive: sell on Upbit / buy on Bybit; otherwise buy on Upbit / sell on Bybit.
+    fee_pct: total fee % deducted from the premium (same basis as the last-price check).
+    """
+    upbit_side, bybit_side = ("sell", "buy") if kimchi_positive else ("buy", "sell")
+    sign = 1.0 if kimchi_positive else -1.0
+    best_upbit = upbit_book.best_bid() if kimchi_positive else upbit_book.best_ask()
+    best_bybit = bybit_book.best_ask() if kimchi_positive else bybit_book.best_bid()
+    if not best_upbit or not best_bybit:
+        return DepthQuote(0.0, False, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0)
+
+    qty = trade_amount_krw / best_upbit
+    max_qty = min(upbit_book.depth(upbit_side), bybit_book.depth(bybit_side))
+    q = np.concatenate(([qty], np.linspace(max_qty / grid, max_qty, grid)))
+
+    upbit_krw = upbit_book.cost_to_fill(upbit_side, q)
+    bybit_usdt = bybit_book.cost_to_fill(bybit_side, q)
+    bybit_krw = bybit_usdt * usd_krw
+    with np.errstate(invalid="ignore", divide="ignore"):
+        premium = (upbit_krw - bybit_krw) / bybit_krw * 100
+    net = sign * premium - fee_pct
+
+    ok = np.flatnonzero(net[1:] >= min_profit_pct)   # net only falls as size grows
+    best = ok[-1] + 1 if len(ok) else None
+    top_premium = (best_upbit - best_bybit * usd_krw) / (best_bybit * usd_krw) * 100
+
+    filled = bool(np.isfinite(net[0]))
+    return DepthQuote(
+        qty=float(qty),
+        filled=filled,
+        upbit_vwap_krw=float(upbit_krw[0] / qty) if filled else 0.0,
+        bybit_vwap_usdt=float(bybit_usdt[0] / qty) if filled else 0.0,
+        premium_pct=round(float(premium[0]), 4) if filled else 0.0,
+        slippage_pct=round(float(sign * (top_premium - premium[0])), 4) + 0.0 if filled else 0.0,
+        net_profit_pct=round(float(net[0]), 4) if filled else 0.0,
+        max_profitable_krw=float(upbit_krw[best]) if best is not None else 0.0,
+        max_profitable_qty=float(q[best]) if best is not None else 0.0,
+    )
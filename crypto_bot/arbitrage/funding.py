@@ -0,0 +1,205 @@
+"""
+펀딩비 캐리 스캐너 (바이비트 USDT 무기한 전 종목).
+
+linear 티커 1회 요청으로 전 종목 펀딩비/마크가를 받고, 종목별 펀딩 주기로 연환산해서 순위를 매긴다.
+  펀딩비 양수(+) = 롱이 숏에게 지불 → 현물 롱 + 무기한 숏 으로 펀딩 수취
+  펀딩비 음수(-) = 숏이 롱에게 지불 → 무기한 롱 (+ 현물/대차 숏) 으로 펀딩 수취
+업비트 KRW 마켓에 상장된 코인은 "업비트 현물 롱 + 바이비트 무기한 숏" 조합의
+진입 김프와 왕복 수수료, 손익분기 일수도 함께 계산한다.
+펀딩 주기별 예상 펀딩비를 로컬 이력(funding_history)에 남겨 같은 부호가 몇 회 연속됐는지로 거른다.
+이력이 비어 있으면 정산 펀딩비 백필(종목당 1회 요청)은 스캔과 분리된 백그라운드 태스크로 돈다.
+"""
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+from ..exchanges.bybit import BybitExchange
+from ..exchanges.upbit import UpbitExchange
+from ..data import database as db
+from .fx import FxService
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_INTERVAL_MIN = 480      # 펀딩 주기 정보가 없을 때 (8시간)
+INSTRUMENT_REFRESH_SEC = 3600
+HISTORY_DAYS = 30               # 메모리에 유지할 펀딩 이력
+BACKFILL_CONCURRENCY = 5
+
+
+@dataclass
+class CarryQuote:
+    symbol: str
+    coin: str
+    funding_rate: float          # 1회 펀딩비 (0.0001 = 0.01%)
+    interval_hours: float
+    annualized_pct: float        # 연환산 %
+    next_funding: float
+    mark_price: float
+    basis_pct: float             # (마크가 - 인덱스가) / 인덱스가 %
+    turnover_24h: float
+    direction: str               # 'long_spot_short_perp' | 'long_perp'
+    persistence: int             # 최근 연속 같은 부호 펀딩 횟수 (현재 예상치 포함)
+    avg_rate_pct: float          # 이력 평균 1회 펀딩비 %
+    upbit_symbol: str = ""       # 업비트 KRW 상장 시
+    upbit_premium_pct: float = 0.0   # 업비트 현물 vs 바이비트 마크가 김프 %
+    fee_pct: float = 0.0         # 업비트 현물 롱 + 바이비트 숏 왕복 수수료 %
+    breakeven_days: float = 0.0  # 수수료를 펀딩으로 회수하는 데 걸리는 일수
+
+
+class FundingScanner:
+    def __init__(self, bybit: BybitExchange, upbit: Optional[UpbitExchange] = None,
+                 fx: Optional[FxService] = None):
+        self.bybit = bybit               # category='linear'
+        self.upbit = upbit
+        self.fx = fx
+        self.intervals: dict[str, int] = {}     # symbol -> funding interval (min)
+        self.coins: dict[str, str] = {}         # symbol -> base coin
+        self.upbit_markets: set[str] = set()
+        self._instruments_updated: float = 0
+        self.history: dict[str, dict[float, float]] = {}   # symbol -> {funding ts: rate}
+        self.last_scan: list[CarryQuote] = []
+        self._backfill_task: Optional[asyncio.Task] = None
+
+    # ── History ───────────────────────────────────────────────────────────────
+    def load_history(self, days: float = HISTORY_DAYS) -> int:
+        rows = db.load_funding(time.time() - days * 86400)
+        for r in rows:
+            self.history.setdefault(r["symbol"], {})[r["ts"]] = r["rate"]
+        return len(rows)
+
+    def _record(self, rows: list[tuple]):
+        for symbol, ts, rate in rows:
+            self.history.setdefault(symbol, {})[ts] = rate
+        db.submit(db.save_funding, rows)
+
+    async def backfill(self, symbols: list[str], limit: int = 30) -> int:
+        """Settled rates from /v5/market/funding/history (one request per symbol, throttled)."""
+        sem = asyncio.Semaphore(BACKFILL_CONCURRENCY)
+
+        async def one(symbol: str) -> list:
+            async with sem:
+                try:
+                    return await self.bybit.get_historical_funding(symbol, limit)
+                except Exception as e:
+                    logger.warning(f"펀딩 이력 조회 실패 ({symbol}): {e}")
+                    return []
+
+        results = await asyncio.gather(*(one(s) for s in symbols))
+        rows = [(h["symbol"], h["timestamp"], h["rate"]) for hist in results for h in hist]
+        self._record(rows)
+        return len(rows)
+
+    # ── Lifecycle ─────────────────────────────────────────────────────────────
+    @property
+    def backfilling(self) -> bool:
+        return self._backfill_task is not None and not self._backfill_task.done()
+
+    def start_backfill(self, force: bool = False) -> bool:
+        """Backfill every symbol in a background task; skipped if history exists (unless forced)."""
+        if self.backfilling or (self.history and not force):
+            return False
+        self._backfill_task = asyncio.create_task(self._backfill_all())
+        return True
+
+    async def stop(self):
+        if self._backfill_task:
+            self._backfill_task.cancel()
+            try:
+                await self._backfill_task
+            except asyncio.CancelledError:
+                pass
+            self._backfill_task = None
+
+    async def _backfill_all(self):
+        try:
+            await self.refresh_instruments()
+            n = await self.backfill(list(self.intervals))
+            logger.info(f"펀딩 이력 백필 {n}건 ({len(self.intervals)}종목)")
+        except Exception as e:
+            logger.warning(f"펀딩 이력 백필 실패: {e}")
+
+    def persistence(self, symbol: str) -> tuple[int, float]:
+        """(consecutive same-sign periods ending at the latest one, mean rate %)."""
+        hist = self.history.get(symbol)
+        if not hist:
+            return 0, 0.0
+        rates = [hist[ts] for ts in sorted(hist)]
+        sign = rates[-1] > 0
+        n = 0
+        for r in reversed(rates):
+            if r == 0 or (r > 0) != sign:
+                break
+            n += 1
+        return n, sum(rates) / len(rates) * 100
+
+    # ── Scan ──────────────────────────────────────────────────────────────────
+    async def refresh_instruments(self, force: bool = False):
+        if not force and self.intervals and time.time() - self._instruments_updated < INSTRUMENT_REFRESH_SEC:
+            return
+        tasks = [self.bybit.get_instruments()]
+        if self.upbit is not None:
+            tasks.append(self.upbit.get_all_markets())
+        results = await asyncio.gather(*tasks)
+        instruments = [i for i in results[0] if i["quote"] == "USDT"]
+        self.intervals = {i["symbol"]: i["funding_interval_min"] or DEFAULT_INTERVAL_MIN for i in instruments}
+        self.coins = {i["symbol"]: i["base"] for i in instruments}
+        if self.upbit is not None:
+            self.upbit_markets = set(results[1])
+        self._instruments_updated = time.time()
+
+    async def scan(self, min_persistence: int = 0) -> list[CarryQuote]:
+        """Every USDT perpetual ranked by |annualized funding|; one tickers request per scan."""
+        await self.refresh_instruments()
+        upbit_syms = sorted(self.upbit_markets & {f"KRW-{c}" for c in self.coins.values()})
+        tasks = [self.bybit.get_funding_rates(list(self.intervals))]
+        if upbit_syms:
+            tasks.append(self.upbit.get_tickers(upbit_syms))
+        results = await asyncio.gather(*tasks)
+        rates = results[0]
+        upbit_tickers = results[1] if upbit_syms else {}
+        usd_krw = self.fx.rate if self.fx is not None else None
+
+        self._record([(s, d["next_funding"], d["rate"]) for s, d in rates.items() if d["next_funding"]])
+
+        fee_pct = 0.0
+        if self.upbit is not None:
+            fee_pct = (self.upbit.calc_fee(1.0) + self.bybit.calc_fee(1.0)) * 2 * 100   # 진입 + 청산
+        quotes = []
+        for symbol, d in rates.items():
+            interval_min = self.intervals.get(symbol, DEFAULT_INTERVAL_MIN)
+            annualized = d["rate"] * (525_600 / interval_min) * 100
+            persistence, avg_rate_pct = self.persistence(symbol)
+            if persistence < min_persistence:
+                continue
+            coin = self.coins.get(symbol, symbol[:-4])
+            q = CarryQuote(
+                symbol=symbol,
+                coin=coin,
+                funding_rate=d["rate"],
+                interval_hours=interval_min / 60,
+                annualized_pct=round(annualized, 3),
+                next_funding=d["next_funding"],
+                mark_price=d["mark_price"],
+                basis_pct=round((d["mark_price"] - d["index_price"]) / d["index_price"] * 100, 4)
+                if d["index_price"] else 0.0,
+                turnover_24h=d["turnover_24h"],
+                direction="long_spot_short_perp" if d["rate"] > 0 else "long_perp",
+                persistence=persistence,
+                avg_rate_pct=round(avg_rate_pct, 5),
+            )
+            ticker = upbit_tickers.get(f"KRW-{coin}")
+            if ticker is not None and d["rate"] > 0:
+                q.upbit_symbol = ticker.symbol
+                q.fee_pct = round(fee_pct, 4)
+                if usd_krw and d["mark_price"]:
+                    perp_krw = d["mark_price"] * usd_krw
+                    q.upbit_premium_pct = round((ticker.price - perp_krw) / perp_krw * 100, 4)
+                daily_pct = annualized / 365
+                q.breakeven_days = round(fee_pct / daily_pct, 2) if daily_pct > 0 else 0.0
+            quotes.append(q)
+
+        quotes.sort(key=lambda q: abs(q.annualized_pct), reverse=True)
+        self.last_scan = quotes
+        return quotes
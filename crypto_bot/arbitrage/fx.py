@@ -0,0 +1,176 @@
+"""
+환율 서비스 (USD/KRW).
+
+여러 소스(공개 환율 API, 업비트 KRW-USDT 시세로 본 내재 환율 등)를 백그라운드에서
+주기적으로 갱신하고, 우선순위가 가장 높은 신선한 소스의 환율을 갱신 시각과 함께 공개한다.
+조회하는 쪽은 네트워크를 기다리지 않고 마지막 값과 경과 시간(age)을 읽는다.
+"""
+import asyncio
+import logging
+import math
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Optional
+
+import aiohttp
+
+logger = logging.getLogger(__name__)
+
+ER_API_URL = "https://open.er-api.com/v6/latest/USD"
+
+REFRESH_INTERVAL = 30.0    # 초
+SOURCE_TIMEOUT = 5.0
+SOURCE_MAX_AGE = 600.0     # 이보다 오래된 소스 값은 공개 환율 후보에서 제외
+
+
+@dataclass
+class FxQuote:
+    rate: float
+    source: str
+    timestamp: float
+
+    @property
+    def age(self) -> float:
+        return time.time() - self.timestamp
+
+
+# ── Sources ────────────────────────────────────────────────────────────────────
+class FxSource(ABC):
+    name: str = "source"
+
+    @abstractmethod
+    async def fetch(self) -> float:
+        """KRW per 1 USD (or USD proxy)."""
+        ...
+
+    async def close(self):
+        pass
+
+
+class ErApiSource(FxSource):
+    """open.er-api.com 공개 환율 (USD/KRW)."""
+    name = "er-api"
+
+    def __init__(self, url: str = ER_API_URL):
+        self.url = url
+        self._http: Optional[aiohttp.ClientSession] = None
+
+    async def fetch(self) -> float:
+        if self._http is None or self._http.closed:
+            self._http = aiohttp.ClientSession()
+        async with self._http.get(self.url, timeout=aiohttp.ClientTimeout(total=SOURCE_TIMEOUT)) as resp:
+            resp.raise_for_status()
+            data = await resp.json()
+            return float(data["rates"]["KRW"])
+
+    async def close(self):
+        if self._http is not None:
+            await self._http.close()
+            self._http = None
+
+
+class UpbitUsdtSource(FxSource):
+    """업비트 KRW-USDT 시세 = 내재 USDT/KRW 환율 (스트림이 있으면 메모리에서)."""
+    name = "upbit-usdt"
+
+    def __init__(self, upbit, symbol: str = "KRW-USDT"):
+        self.upbit = upbit
+        self.symbol = symbol
+
+    async def fetch(self) -> float:
+        ticker = await self.upbit.get_ticker(self.symbol)
+        return float(ticker.price)
+
+
+class StaticFxSource(FxSource):
+    """고정/수동 환율 (테스트, 오프라인용). fail=True 면 조회 실패를 흉내낸다."""
+
+    def __init__(self, rate: float, name: str = "static"):
+        self.rate = rate
+        self.name = name
+        self.fail = False
+
+    async def fetch(self) -> float:
+        if self.fail:
+            raise RuntimeError(f"{self.name} unavailable")
+        return self.rate
+
+
+# ── Service ────────────────────────────────────────────────────────────────────
+class FxService:
+    def __init__(self, sources: list[FxSource], refresh_interval: float = REFRESH_INTERVAL,
+                 source_max_age: float = SOURCE_MAX_AGE):
+        self.sources = sources               # 우선순위 순
+        self.refresh_interval = refresh_interval
+        self.source_max_age = source_max_age
+        self.quotes: dict[str, FxQuote] = {}   # 소스별 마지막 성공 값
+        self.quote: Optional[FxQuote] = None   # 공개 환율
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def rate(self) -> Optional[float]:
+        return self.quote.rate if self.quote else None
+
+    @property
+    def age(self) -> float:
+        return self.quote.age if self.quote else math.inf
+
+    # ── Lifecycle ─────────────────────────────────────────────────────────────
+    async def start(self):
+        if self._task is None or self._task.done():
+            if self.quote is None:
+                await self.refresh()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        for source in self.sources:
+            await source.close()
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.refresh_interval)
+            try:
+                await self.refresh()
+            except Exception as e:
+                logger.warning(f"환율 갱신 오류: {e}")
+
+    # ── Refresh ───────────────────────────────────────────────────────────────
+    async def refresh(self) -> Optional[FxQuote]:
+        """Fetch every source concurrently; publish the highest-priority fresh one."""
+        results = await asyncio.gather(
+            *(asyncio.wait_for(s.fetch(), SOURCE_TIMEOUT) for s in self.sources),
+            return_exceptions=True,
+        )
+        now = time.time()
+        for source, result in zip(self.sources, results):
+            if isinstance(result, BaseException):
+                logger.warning(f"환율 소스 실패 ({source.name}): {result!r}")
+            elif result > 0:
+                self.quotes[source.name] = FxQuote(float(result), source.name, now)
+
+        for source in self.sources:
+            q = self.quotes.get(source.name)
+            if q is not None and q.age <= self.source_max_age:
+                if self.quote is None or q.source != self.quote.source or q.rate != self.quote.rate:
+                    logger.debug(f"FX rate: 1 USD = {q.rate:,.2f} KRW ({q.source})")
+                self.quote = q
+                break
+        return self.quote
+
+    def status(self) -> dict:
+        return {
+            "rate": self.rate,
+            "source": self.quote.source if self.quote else None,
+            "age_sec": round(self.age, 1) if self.quote else None,
+            "sources": {
+                name: {"rate": q.rate, "age_sec": round(q.age, 1)} for name, q in self.quotes.items()
+            },
+        }
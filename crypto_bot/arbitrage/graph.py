@@ -0,0 +1,353 @@
+"""
+삼각/교차 거래소 차익 그래프 탐색.
+
+노드 = (거래소, 자산) 예: "upbit:KRW", "upbit:XRP", "bybit:USDT".
+간선 = 한 번의 환전과 그 비율 (수수료 반영, BaseExchange.calc_fee 사용):
+  마켓 BASE/QUOTE  매도 BASE→QUOTE = bid × (1 - fee),  매수 QUOTE→BASE = (1 - fee) / ask
+  전송 (같은 코인의 거래소 간 이동) = 1 - 전송 비용
+  환율 upbit:KRW ↔ bybit:USDT = USD/KRW (김프 모니터와 같은 가정)
+가중치 = -log(비율) 이므로 가중치 합이 음수인 사이클 = 한 바퀴 돌면 자산이 늘어나는 경로.
+
+기준 자산(anchor: 원화/USDT) 을 지나는 길이 max_len 이하 사이클을 구조가 바뀔 때 한 번 열거하고,
+간선 → 사이클 색인을 만들어 둔다. 시세 하나가 바뀌면 그 간선을 지나는 사이클만 다시 합산한다.
+임의 길이 음수 사이클 전체 탐색은 bellman_ford() (벡터화된 완화) 로 한다.
+"""
+import asyncio
+import logging
+import math
+import time
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+import numpy as np
+
+from ..exchanges.base import BaseExchange
+
+logger = logging.getLogger(__name__)
+
+MAX_CYCLE_LEN = 4
+MIN_CYCLE_LEN = 3          # 2 간선 사이클(같은 마켓 매수→매도)은 항상 손해
+ANCHORS = ("upbit:KRW", "bybit:USDT")
+MARKET_REFRESH_SEC = 3600
+
+
+@dataclass
+class Edge:
+    src: int
+    dst: int
+    venue: str        # 'upbit' | 'bybit' | 'transfer' | 'fx'
+    symbol: str
+    action: str       # 'buy' | 'sell' | 'transfer' | 'fx'
+
+
+@dataclass
+class ArbitrageCycle:
+    nodes: list             # ["upbit:KRW", "upbit:XRP", "upbit:USDT", "upbit:KRW"]
+    steps: list             # ["upbit KRW-XRP buy", ...]
+    return_pct: float       # 수수료 후 한 바퀴 수익률 %
+    is_profitable: bool
+
+
+class ArbitrageGraph:
+    def __init__(self, anchors=ANCHORS, max_len: int = MAX_CYCLE_LEN, min_profit_pct: float = 0.1):
+        self.anchors = tuple(anchors)
+        self.max_len = max_len
+        self.min_profit_pct = min_profit_pct
+        self.nodes: list[str] = []
+        self.node_index: dict[str, int] = {}
+        self.edges: list[Edge] = []
+        self.edge_index: dict[tuple, int] = {}   # (venue, symbol, action) -> edge id
+        self.venues: dict[str, BaseExchange] = {}
+        self.markets: dict[tuple, tuple] = {}    # (venue, symbol) -> (base, quote)
+        self.weights = np.zeros(1)               # 마지막 칸 = 사이클 패딩용 0
+        self.cycles = np.empty((0, max_len), dtype=np.int64)   # 간선 id, 패딩 = len(edges)
+        self.cycle_weight = np.empty(0)
+        self._edge_ptr = np.zeros(1, dtype=np.int64)   # 간선 → 사이클 CSR
+        self._edge_cycles = np.empty(0, dtype=np.int64)
+        self._built = False
+
+    # ── Structure ─────────────────────────────────────────────────────────────
+    def node(self, name: str) -> int:
+        idx = self.node_index.get(name)
+        if idx is None:
+            idx = self.node_index[name] = len(self.nodes)
+            self.nodes.append(name)
+            self._built = False
+        return idx
+
+    def _add_edge(self, src: str, dst: str, venue: str, symbol: str, action: str) -> int:
+        key = (venue, symbol, action)
+        if key in self.edge_index:
+            return self.edge_index[key]
+        self.edge_index[key] = len(self.edges)
+        self.edges.append(Edge(self.node(src), self.node(dst), venue, symbol, action))
+        self.weights = np.concatenate((self.weights[:-1], [np.inf, 0.0]))   # 시세 전까지 통과 불가
+        self._built = False
+        return self.edge_index[key]
+
+    def add_market(self, ex: BaseExchange, symbol: str, base: str, quote: str):
+        self.venues[ex.name] = ex
+        self.markets[(ex.name, symbol)] = (base, quote)
+        self._add_edge(f"{ex.name}:{base}", f"{ex.name}:{quote}", ex.name, symbol, "sell")
+        self._add_edge(f"{ex.name}:{quote}", f"{ex.name}:{base}", ex.name, symbol, "buy")
+
+    def add_transfer(self, asset: str, venue_a: str, venue_b: str, cost_pct: float = 0.0):
+        a, b = f"{venue_a}:{asset}", f"{venue_b}:{asset}"
+        for src, dst in ((a, b), (b, a)):
+            self._add_edge(src, dst, "transfer", f"{src}>{dst}", "transfer")
+        self.set_transfer_cost(asset, venue_a, venue_b, cost_pct)
+
+    def add_fx(self, krw_node: str = "upbit:KRW", usd_node: str = "bybit:USDT"):
+        self._add_edge(krw_node, usd_node, "fx", "USDKRW", "buy")    # 원 → 달러
+        self._add_edge(usd_node, krw_node, "fx", "USDKRW", "sell")   # 달러 → 원
+
+    def build(self):
+        """Enumerate anchor cycles (MIN_CYCLE_LEN..max_len edges) and index them by edge."""
+        n_edges = len(self.edges)
+        out: list[list[int]] = [[] for _ in self.nodes]
+        for e, edge in enumerate(self.edges):
+            out[edge.src].append(e)
+        anchors = [self.node_index[a] for a in self.anchors if a in self.node_index]
+        found: list[list[int]] = []
+        for i, start in enumerate(anchors):
+            banned = set(anchors[:i])   # 앞 anchor 를 지나는 사이클은 이미 열거됨
+            self._dfs(start, start, out, [], {start}, banned, found)
+
+        pad = n_edges
+        cycles = np.full((len(found), self.max_len), pad, dtype=np.int64)
+        for c, path in enumerate(found):
+            cycles[c, :len(path)] = path
+        self.cycles = cycles
+
+        flat = cycles.ravel()
+        cycle_ids = np.repeat(np.arange(len(found)), self.max_len)
+        real = flat != pad
+        flat, cycle_ids = flat[real], cycle_ids[real]
+        order = np.argsort(flat, kind="stable")
+        self._edge_cycles = cycle_ids[order]
+        self._edge_ptr = np.concatenate(([0], np.cumsum(np.bincount(flat, minlength=n_edges))))
+        self.cycle_weight = self.weights[cycles].sum(axis=1) if len(found) else np.empty(0)
+        self._built = True
+        logger.info(f"차익 그래프: 노드 {len(self.nodes)} / 간선 {n_edges} / 사이클 {len(found)}")
+
+    def _dfs(self, start: int, node: int, out, path: list, seen: set, banned: set, found: list):
+        for e in out[node]:
+            dst = self.edges[e].dst
+            if dst == start:
+                if len(path) + 1 >= MIN_CYCLE_LEN:
+                    found.append(path + [e])
+            elif len(path) + 1 < self.max_len and dst not in seen and dst not in banned:
+                seen.add(dst)
+                self._dfs(start, dst, out, path + [e], seen, banned, found)
+                seen.discard(dst)
+
+    # ── Weights (incremental) ─────────────────────────────────────────────────
+    def _set_rate(self, e: int, rate: float) -> bool:
+        w = -math.log(rate) if rate > 0 else math.inf
+        if self.weights[e] == w:
+            return False
+        self.weights[e] = w
+        return True
+
+    def _affected(self, edge_ids: list[int]) -> np.ndarray:
+        parts = [self._edge_cycles[self._edge_ptr[e]:self._edge_ptr[e + 1]] for e in edge_ids]
+        return np.unique(np.concatenate(parts)) if parts else np.empty(0, dtype=np.int64)
+
+    def _recompute(self, edge_ids: list[int]) -> list[ArbitrageCycle]:
+        """Re-sum only the cycles through the changed edges; return the profitable ones."""
+        if not self._built:
+            self.build()
+        if not edge_ids:
+            return []
+        cids = self._affected(edge_ids)
+        if not len(cids):
+            return []
+        self.cycle_weight[cids] = self.weights[self.cycles[cids]].sum(axis=1)
+        hit = cids[self.cycle_weight[cids] <= self._threshold()]
+        return [self.cycle(c) for c in hit[np.argsort(self.cycle_weight[hit])]]
+
+    def _threshold(self) -> float:
+        return -math.log1p(self.min_profit_pct / 100)
+
+    def update_quote(self, venue: str, symbol: str, bid: float, ask: float) -> list[ArbitrageCycle]:
+        """New best bid/ask for one market; returns profitable cycles through it."""
+        return self.update_quotes(venue, {symbol: (bid, ask)})
+
+    def update_quotes(self, venue: str, quotes: dict[str, tuple[float, float]]) -> list[ArbitrageCycle]:
+        """Bulk update: every market first, then one recompute over the union of affected cycles."""
+        ex = self.venues.get(venue)
+        changed = []
+        for symbol, (bid, ask) in quotes.items():
+            if (venue, symbol) not in self.markets:
+                continue
+            sell, buy = self.edge_index[(venue, symbol, "sell")], self.edge_index[(venue, symbol, "buy")]
+            if self._set_rate(sell, bid - ex.calc_fee(bid, symbol=symbol) if bid else 0.0):
+                changed.append(sell)
+            if self._set_rate(buy, (1 - ex.calc_fee(1.0, symbol=symbol)) / ask if ask else 0.0):
+                changed.append(buy)
+        return self._recompute(changed)
+
+    def set_fx(self, usd_krw: float) -> list[ArbitrageCycle]:
+        changed = []
+        for action, rate in (("buy", 1 / usd_krw), ("sell", usd_krw)):
+            e = self.edge_index.get(("fx", "USDKRW", action))
+            if e is not None and self._set_rate(e, rate):
+                changed.append(e)
+        return self._recompute(changed)
+
+    def set_transfer_cost(self, asset: str, venue_a: str, venue_b: str, cost_pct: float) -> list[ArbitrageCycle]:
+        a, b = f"{venue_a}:{asset}", f"{venue_b}:{asset}"
+        changed = []
+        for src, dst in ((a, b), (b, a)):
+            e = self.edge_index[("transfer", f"{src}>{dst}", "transfer")]
+            if self._set_rate(e, 1 - cost_pct / 100):
+                changed.append(e)
+        return self._recompute(changed) if self._built else []
+
+    # ── Queries ───────────────────────────────────────────────────────────────
+    def cycle(self, c: int) -> ArbitrageCycle:
+        edge_ids = [e for e in self.cycles[c] if e != len(self.edges)]
+        nodes = [self.nodes[self.edges[edge_ids[0]].src]] + [self.nodes[self.edges[e].dst] for e in edge_ids]
+        ret = (math.exp(-self.cycle_weight[c]) - 1) * 100
+        return ArbitrageCycle(
+            nodes=nodes,
+            steps=[f"{self.edges[e].venue} {self.edges[e].symbol} {self.edges[e].action}" for e in edge_ids],
+            return_pct=round(ret, 4),
+            is_profitable=bool(self.cycle_weight[c] <= self._threshold()),
+        )
+
+    def best(self, top: int = 20, profitable_only: bool = False) -> list[ArbitrageCycle]:
+        if not self._built:
+            self.build()
+        w = self.cycle_weight
+        idx = np.flatnonzero(np.isfinite(w) & ((w <= self._threshold()) if profitable_only else True))
+        idx = idx[np.argsort(w[idx], kind="stable")[:top]]
+        return [self.cycle(c) for c in idx]
+
+    def bellman_ford(self) -> Optional[ArbitrageCycle]:
+        """Any negative-weight cycle (no length limit), or None. O(V·E), vectorized over edges."""
+        if not self._built:
+            self.build()
+        n = len(self.nodes)
+        if not n or not self.edges:
+            return None
+        src = np.array([e.src for e in self.edges])
+        dst = np.array([e.dst for e in self.edges])
+        w = self.weights[:-1]
+        dist = np.zeros(n)                 # 가상 시작점에서 모든 노드로 0
+        pred = np.full(n, -1, dtype=np.int64)
+        for _ in range(n + 1):
+            cand = dist[src] + w
+            better = cand < dist[dst] - 1e-12
+            if not better.any():
+                return None
+            # 같은 노드로 여러 간선이 좋아지면 가장 작은 후보를 채택
+            e_ids = np.flatnonzero(better)
+            order = e_ids[np.lexsort((cand[e_ids], dst[e_ids]))]
+            first = np.concatenate(([True], dst[order][1:] != dst[order][:-1]))
+            chosen = order[first]
+            dist[dst[chosen]] = cand[chosen]
+            pred[dst[chosen]] = chosen
+        # n 번째에도 완화됨 → 음수 사이클. pred 를 n 번 따라가면 사이클 안에 들어감
+        node = int(dst[chosen[0]])
+        for _ in range(n):
+            node = int(src[pred[node]])
+        edge_ids, cur = [], node
+        while True:
+            e = int(pred[cur])
+            edge_ids.append(e)
+            cur = int(src[e])
+            if cur == node:
+                break
+        edge_ids.reverse()
+        total = float(w[edge_ids].sum())
+        nodes = [self.nodes[self.edges[edge_ids[0]].src]] + [self.nodes[self.edges[e].dst] for e in edge_ids]
+        return ArbitrageCycle(
+            nodes=nodes,
+            steps=[f"{self.edges[e].venue} {self.edges[e].symbol} {self.edges[e].action}" for e in edge_ids],
+            return_pct=round((math.exp(-total) - 1) * 100, 4),
+            is_profitable=total <= self._threshold(),
+        )
+
+
+class CycleScanner:
+    """Builds the graph from both venues' markets and keeps it updated (bulk REST or stream books)."""
+
+    def __init__(self, monitor, max_len: int = MAX_CYCLE_LEN, transfer_cost_pct: float = 0.0,
+                 on_cycle: Optional[Callable[[ArbitrageCycle], None]] = None):
+        self.monitor = monitor     # 거래소, 환율, min_profit_pct 공유
+        self.max_len = max_len
+        self.transfer_cost_pct = transfer_cost_pct
+        self.on_cycle = on_cycle
+        self.graph: Optional[ArbitrageGraph] = None
+        self._markets_updated: float = 0
+        self._listeners: list = []   # (exchange, callback)
+
+    async def refresh_markets(self, force: bool = False) -> ArbitrageGraph:
+        if not force and self.graph and time.time() - self._markets_updated < MARKET_REFRESH_SEC:
+            return self.graph
+        upbit, bybit = self.monitor.upbit, self.monitor.bybit
+        markets, instruments = await asyncio.gather(upbit.get_all_markets(quote=None), bybit.get_instruments())
+        graph = ArbitrageGraph(max_len=self.max_len, min_profit_pct=self.monitor.min_profit_pct)
+        upbit_assets, bybit_assets = set(), set()
+        for m in markets:
+            quote, base = m.split("-", 1)
+            graph.add_market(upbit, m, base, quote)
+            upbit_assets |= {base, quote}
+        for i in instruments:
+            graph.add_market(bybit, i["symbol"], i["base"], i["quote"])
+            bybit_assets |= {i["base"], i["quote"]}
+        for asset in sorted(upbit_assets & bybit_assets):
+            graph.add_transfer(asset, upbit.name, bybit.name, self.transfer_cost_pct)
+        graph.add_fx(f"{upbit.name}:KRW", f"{bybit.name}:USDT")
+        graph.build()
+        self.graph = graph
+        self._markets_updated = time.time()
+        return graph
+
+    async def scan(self, top: int = 20, profitable_only: bool = False) -> list[ArbitrageCycle]:
+        """Bulk best quotes from both venues + FX, then the best cycles."""
+        graph = await self.refresh_markets()
+        graph.min_profit_pct = self.monitor.min_profit_pct
+        upbit, bybit = self.monitor.upbit, self.monitor.bybit
+        upbit_symbols = [s for (v, s) in graph.markets if v == upbit.name]
+        usd_krw, upbit_quotes, bybit_quotes = await asyncio.gather(
+            self.monitor.update_fx_rate(),
+            upbit.get_best_quotes(upbit_symbols),
+            bybit.get_best_quotes(),
+        )
+        graph.set_fx(usd_krw)
+        graph.update_quotes(upbit.name, upbit_quotes)
+        graph.update_quotes(bybit.name, bybit_quotes)
+        return graph.best(top, profitable_only)
+
+    # ── Streams ───────────────────────────────────────────────────────────────
+    def listen(self):
+        """Update single edges from live order books (stream listeners)."""
+        if self._listeners or self.graph is None:
+            return
+        for ex in (self.monitor.upbit, self.monitor.bybit):
+            if ex.stream is not None:
+                callback = self._listener(ex)
+                ex.stream.add_listener(callback)
+                self._listeners.append((ex, callback))
+
+    def stop(self):
+        for ex, callback in self._listeners:
+            if ex.stream is not None:
+                ex.stream.remove_listener(callback)
+        self._listeners = []
+
+    def _listener(self, ex: BaseExchange):
+        def on_quote(kind: str, symbol: str):
+            if kind != "orderbook" or self.graph is None:
+                return
+            book = ex.stream.book(symbol)
+            if book is None:
+                return
+            if self.monitor.fx.rate:
+                self.graph.set_fx(self.monitor.fx.rate)
+            for cycle in self.graph.update_quote(ex.name, symbol, book.best_bid() or 0.0, book.best_ask() or 0.0):
+                if self.on_cycle:
+                    self.on_cycle(cycle)
+        return on_quote
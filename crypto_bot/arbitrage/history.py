@@ -0,0 +1,244 @@
+"""
+김프 시계열 저장소 + 롤링 통계.
+
+코인별 김프를 NumPy 링 버퍼(윈도우가 담는 샘플 수만큼만 증가)에 저장하고, 윈도우(1m/1h/24h 등)마다
+합/제곱합과 윈도우 시작 위치를 유지해서 평균·표준편차·z-score 를 O(1)로 낸다
+(샘플 추가 시 윈도우 밖으로 밀려난 샘플만 빼므로 분할상환 O(1)).
+분위수는 조회 시 해당 윈도우 구간에서만 계산한다.
+같은 resolution 초 안에 들어온 샘플은 마지막 값으로 덮어써서 메모리 상한을 고정하고,
+새 샘플은 모아 두었다가 배치로 DB(premium_history)에 기록한다.
+"""
+import logging
+import math
+import time
+from typing import Optional
+
+import numpy as np
+
+from ..data import database as db
+
+logger = logging.getLogger(__name__)
+
+WINDOWS = {"1m": 60.0, "1h": 3600.0, "24h": 86400.0}
+RESOLUTION = 1.0          # 샘플 최소 간격 (초): 이보다 촘촘한 샘플은 마지막 값으로 덮어씀
+INITIAL_CAPACITY = 1024   # 링 버퍼 초기 크기; 윈도우가 더 많은 샘플을 담아야 할 때만 두 배로 증가
+PERCENTILES = (5, 25, 50, 75, 95)
+FLUSH_BATCH = 200         # 이만큼 쌓이면 DB 기록
+FLUSH_INTERVAL = 30.0     # 또는 이 시간이 지나면 (초)
+
+
+class _Window:
+    __slots__ = ("seconds", "start", "total", "total_sq")
+
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+        self.start = 0        # 윈도우 첫 샘플의 논리 인덱스
+        self.total = 0.0
+        self.total_sq = 0.0
+
+
+class PremiumSeries:
+    """Ring buffer of (timestamp, premium %) for one coin with rolling window stats.
+
+    Windows are anchored at the latest sample: "1h" is the samples newer than last_ts - 3600.
+    """
+
+    def __init__(self, windows: Optional[dict[str, float]] = None, resolution: float = RESOLUTION):
+        self.windows = {name: _Window(sec) for name, sec in (windows or WINDOWS).items()}
+        self.resolution = resolution
+        self.max_capacity = int(max(w.seconds for w in self.windows.values()) / resolution) + 2
+        self.capacity = min(INITIAL_CAPACITY, self.max_capacity)
+        self.ts = np.zeros(self.capacity)
+        self.values = np.zeros(self.capacity)
+        self.count = 0        # 지금까지 추가된 샘플 수 (논리 인덱스 = count - 1)
+
+    def __len__(self) -> int:
+        return min(self.count, self.capacity)
+
+    @property
+    def last(self) -> Optional[float]:
+        return float(self.values[(self.count - 1) % self.capacity]) if self.count else None
+
+    @property
+    def last_ts(self) -> Optional[float]:
+        return float(self.ts[(self.count - 1) % self.capacity]) if self.count else None
+
+    # ── Updates ───────────────────────────────────────────────────────────────
+    def add(self, timestamp: float, value: float) -> bool:
+        """Append one sample; False when it replaced the last one (same resolution bucket)."""
+        value = float(value)
+        if not math.isfinite(value):
+            return False
+        if self.count and timestamp - self.ts[(self.count - 1) % self.capacity] < self.resolution:
+            slot = (self.count - 1) % self.capacity
+            old = float(self.values[slot])
+            self.values[slot] = value
+            for w in self.windows.values():   # 최신 샘플은 모든 윈도우에 포함
+                w.total += value - old
+                w.total_sq += value * value - old * old
+            return False
+
+        if self.count >= self.capacity and self.capacity < self.max_capacity:
+            if min(w.start for w in self.windows.values()) <= self.count - self.capacity:
+                self._grow()   # 가장 오래된 샘플이 아직 윈도우 안에 있음
+        slot = self.count % self.capacity
+        self.ts[slot] = timestamp
+        self.values[slot] = value
+        self.count += 1
+        oldest = self.count - self.capacity
+        for w in self.windows.values():
+            w.total += value
+            w.total_sq += value * value
+            cutoff = timestamp - w.seconds
+            while w.start < self.count - 1 and (
+                w.start < oldest or self.ts[w.start % self.capacity] <= cutoff
+            ):
+                v = float(self.values[w.start % self.capacity])
+                w.total -= v
+                w.total_sq -= v * v
+                w.start += 1
+            if w.start == self.count - 1:   # 샘플 하나만 남으면 누적 오차를 털어냄
+                w.total, w.total_sq = value, value * value
+        return True
+
+    def _grow(self):
+        capacity = min(self.capacity * 2, self.max_capacity)
+        live = np.arange(max(self.count - self.capacity, 0), self.count)
+        ts, values = np.zeros(capacity), np.zeros(capacity)
+        ts[live % capacity] = self.ts[live % self.capacity]
+        values[live % capacity] = self.values[live % self.capacity]
+        self.ts, self.values, self.capacity = ts, values, capacity
+
+    # ── Rolling stats (O(1)) ──────────────────────────────────────────────────
+    def _window(self, window: str) -> _Window:
+        if window not in self.windows:
+            raise ValueError(f"Unknown window: {window} (have {', '.join(self.windows)})")
+        return self.windows[window]
+
+    def n(self, window: str) -> int:
+        return self.count - self._window(window).start if self.count else 0
+
+    def mean(self, window: str) -> Optional[float]:
+        n = self.n(window)
+        return self._window(window).total / n if n else None
+
+    def std(self, window: str) -> Optional[float]:
+        n = self.n(window)
+        if not n:
+            return None
+        w = self._window(window)
+        mean = w.total / n
+        return math.sqrt(max(w.total_sq / n - mean * mean, 0.0))
+
+    def zscore(self, window: str, value: Optional[float] = None) -> Optional[float]:
+        """(value - mean) / std over the window; value defaults to the latest sample."""
+        value = self.last if value is None else value
+        mean, std = self.mean(window), self.std(window)
+        if value is None or mean is None or not std or std < 1e-12:
+            return None
+        return (value - mean) / std
+
+    # ── Window slices ─────────────────────────────────────────────────────────
+    def window_values(self, window: str) -> np.ndarray:
+        """Samples in the window, oldest first (a copy)."""
+        start = self._window(window).start
+        if not self.count:
+            return np.empty(0)
+        idx = np.arange(start, self.count) % self.capacity
+        return self.values[idx]
+
+    def tail(self, n: int) -> np.ndarray:
+        n = min(n, len(self))
+        idx = np.arange(self.count - n, self.count) % self.capacity
+        return self.values[idx]
+
+    def percentiles(self, window: str, qs=PERCENTILES) -> dict:
+        values = self.window_values(window)
+        if not len(values):
+            return {}
+        return {f"p{q}": round(float(v), 4) for q, v in zip(qs, np.percentile(values, qs))}
+
+    def stats(self, window: str, percentiles: bool = True) -> dict:
+        mean, std, z = self.mean(window), self.std(window), self.zscore(window)
+        out = {
+            "n": self.n(window),
+            "mean": round(mean, 4) if mean is not None else None,
+            "std": round(std, 4) if std is not None else None,
+            "zscore": round(z, 3) if z is not None else None,
+        }
+        if percentiles:
+            values = self.window_values(window)
+            out["min"] = round(float(values.min()), 4) if len(values) else None
+            out["max"] = round(float(values.max()), 4) if len(values) else None
+            out.update(self.percentiles(window))
+        return out
+
+
+class PremiumHistory:
+    """Premium series per coin + batched persistence to the premium_history table."""
+
+    def __init__(self, windows: Optional[dict[str, float]] = None, resolution: float = RESOLUTION,
+                 persist: bool = True, flush_batch: int = FLUSH_BATCH,
+                 flush_interval: float = FLUSH_INTERVAL):
+        self.windows = dict(windows or WINDOWS)
+        self.resolution = resolution
+        self.persist = persist
+        self.flush_batch = flush_batch
+        self.flush_interval = flush_interval
+        self.series: dict[str, PremiumSeries] = {}
+        self._pending: dict[tuple[str, float], float] = {}   # (coin, bucket ts) -> premium
+        self._last_flush = time.time()
+
+    def get(self, coin: str) -> Optional[PremiumSeries]:
+        return self.series.get(coin)
+
+    def _series(self, coin: str) -> PremiumSeries:
+        s = self.series.get(coin)
+        if s is None:
+            s = self.series[coin] = PremiumSeries(self.windows, self.resolution)
+        return s
+
+    def record(self, coin: str, premium_pct: float, timestamp: Optional[float] = None):
+        timestamp = time.time() if timestamp is None else timestamp
+        s = self._series(coin)
+        s.add(timestamp, premium_pct)
+        if self.persist and s.count:
+            # 덮어쓴 샘플도 같은 버킷 키로 마지막 값만 기록
+            self._pending[(coin, s.last_ts)] = s.last
+            if len(self._pending) >= self.flush_batch or timestamp - self._last_flush >= self.flush_interval:
+                self.flush()
+
+    def record_many(self, premiums: dict[str, float], timestamp: Optional[float] = None):
+        """One scan's premiums (coin -> %), all stamped with the same time."""
+        timestamp = time.time() if timestamp is None else timestamp
+        for coin, premium in premiums.items():
+            self.record(coin, premium, timestamp)
+
+    def flush(self) -> int:
+        """Queue pending samples as one transaction on the DB thread; returns the number of rows."""
+        self._last_flush = time.time()
+        if not self._pending:
+            return 0
+        rows = [(coin, ts, value) for (coin, ts), value in self._pending.items()]
+        self._pending = {}
+        db.submit(db.save_premiums, rows)
+        return len(rows)
+
+    def load(self, coins: Optional[list[str]] = None, since: Optional[float] = None) -> int:
+        """Warm the series from the database (default: the longest window)."""
+        since = time.time() - max(self.windows.values()) if since is None else since
+        rows = db.load_premiums(coins, since)
+        for r in rows:
+            self._series(r["coin"]).add(r["ts"], r["premium_pct"])
+        return len(rows)
+
+    def stats(self, coin: str, windows: Optional[list[str]] = None, percentiles: bool = True) -> dict:
+        s = self.series.get(coin)
+        if s is None:
+            return {}
+        return {
+            "coin": coin,
+            "last": s.last,
+            "last_ts": s.last_ts,
+            "windows": {w: s.stats(w, percentiles) for w in (windows or self.windows)},
+        }
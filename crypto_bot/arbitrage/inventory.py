@@ -0,0 +1,301 @@
+"""
+차익거래 자금 인벤토리 + 리밸런싱 시뮬레이션.
+
+두 거래소 잔고를 한 번 조회해서 캐시하고, 이후에는 체결 결과로 직접 갱신한다
+(refresh_interval 마다, 또는 주문 실패 후에만 실제 잔고로 다시 맞춤).
+  - 방향별 최대 거래 금액: 팔 코인 / 살 현금 중 작은 쪽 (수수료·여유분 반영)
+  - 한 방향 거래가 반복되면 한쪽 거래소의 코인과 다른 쪽의 현금이 줄어든다.
+    simulate() 로 몇 번째 거래에서 막히는지, plan_rebalance() 로 무엇을 얼마나
+    옮겨야 하는지(출금 수수료, 도착 지연, 비용)를 계산한다.
+원화는 해외로 직접 보낼 수 없으므로 현금 리밸런싱은 업비트 KRW-USDT 매수/매도 + USDT 전송으로 한다.
+"""
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Optional
+
+from ..exchanges.base import BaseExchange
+
+logger = logging.getLogger(__name__)
+
+REFRESH_INTERVAL = 300.0   # 캐시 잔고를 실제 잔고로 다시 맞추는 주기 (초)
+BUFFER_PCT = 2.0           # 가용 잔고 중 쓰지 않고 남겨둘 비율 %
+MIN_TRADE_KRW = 10_000     # 이보다 작게 잘리면 거래하지 않음
+DEFAULT_LEVERAGE = 1.0     # 선물 숏 증거금 계산용
+
+
+@dataclass
+class TransferCost:
+    withdraw_fee: float    # 출금 수수료 (코인 단위)
+    delay_sec: float       # 입금 반영까지 걸리는 시간
+    min_amount: float = 0.0
+
+
+# 거래소/네트워크별로 바뀌므로 설정값으로 취급 (대략적인 기본값)
+TRANSFER_COSTS = {
+    "BTC": TransferCost(withdraw_fee=0.0005, delay_sec=3600, min_amount=0.001),
+    "USDT": TransferCost(withdraw_fee=1.0, delay_sec=600, min_amount=10),
+}
+
+
+@dataclass
+class RebalanceStep:
+    asset: str
+    from_venue: str
+    to_venue: str
+    amount: float          # 보내는 수량 (수수료 포함)
+    fee: float             # 출금 수수료 (코인 단위)
+    cost_krw: float        # 출금 수수료 + 환전 수수료 원화 환산
+    delay_sec: float
+    note: str = ""
+
+
+@dataclass
+class RebalancePlan:
+    steps: list = field(default_factory=list)
+    total_cost_krw: float = 0.0
+    ready_after_sec: float = 0.0
+    capacity_before_krw: dict = field(default_factory=dict)   # 방향별 최대 거래 금액
+    capacity_after_krw: dict = field(default_factory=dict)
+
+
+class InventoryManager:
+    def __init__(self, upbit: BaseExchange, bybit: BaseExchange, coin: str = "BTC",
+                 refresh_interval: float = REFRESH_INTERVAL, buffer_pct: float = BUFFER_PCT,
+                 leverage: float = DEFAULT_LEVERAGE, transfer_costs: Optional[dict] = None):
+        self.upbit = upbit
+        self.bybit = bybit
+        self.coin = coin
+        self.refresh_interval = refresh_interval
+        self.buffer_pct = buffer_pct
+        self.leverage = leverage
+        self.transfer_costs = transfer_costs or dict(TRANSFER_COSTS)
+        self.balances: dict[str, dict[str, float]] = {upbit.name: {}, bybit.name: {}}   # 가용 잔고
+        self.position: float = 0.0     # 바이비트 선물 순포지션 (코인, 숏 = 음수)
+        self.synced_at: float = 0.0
+        self.fills_since_sync = 0
+        self._dirty = False            # 주문 실패 등으로 캐시를 믿을 수 없음
+
+    @property
+    def synced(self) -> bool:
+        return self.synced_at > 0
+
+    @property
+    def linear(self) -> bool:
+        return getattr(self.bybit, "category", "spot") == "linear"
+
+    def get(self, venue: str, asset: str) -> float:
+        return self.balances.get(venue, {}).get(asset, 0.0)
+
+    def _add(self, venue: str, asset: str, amount: float):
+        self._move(self.balances, venue, asset, amount)
+
+    # ── Sync ──────────────────────────────────────────────────────────────────
+    async def sync(self, force: bool = False) -> bool:
+        """Re-read balances when stale (refresh_interval), marked dirty, or forced."""
+        if not force and not self._dirty and self.synced and time.time() - self.synced_at < self.refresh_interval:
+            return False
+        upbit_bal, bybit_bal = await asyncio.gather(self.upbit.get_balances(), self.bybit.get_balances())
+        self.balances = {
+            self.upbit.name: {b.currency: b.available for b in upbit_bal},
+            self.bybit.name: {b.currency: b.available for b in bybit_bal},
+        }
+        if self.linear and hasattr(self.bybit, "get_positions"):
+            positions = await self.bybit.get_positions(f"{self.coin}USDT")
+            self.position = sum(
+                float(p.get("size", 0)) * (1 if p.get("side") == "Buy" else -1) for p in positions
+            )
+        self.synced_at = time.time()
+        self.fills_since_sync = 0
+        self._dirty = False
+        return True
+
+    def mark_dirty(self):
+        """Next sync() re-reads balances (e.g. after a failed or partially filled leg)."""
+        self._dirty = True
+
+    # ── Fills ─────────────────────────────────────────────────────────────────
+    def apply_fill(self, ex: BaseExchange, symbol: str, side: str, qty: float, price: float):
+        """Update cached balances from one fill (qty in coin, price in the market's quote)."""
+        if qty <= 0:
+            return
+        buy = side in ("bid", "buy", "Buy")
+        notional = qty * price
+        fee = ex.calc_fee(notional, symbol=symbol)
+        if ex is self.upbit:
+            quote, base = symbol.split("-", 1)
+            self._add(ex.name, base, qty if buy else -qty)
+            self._add(ex.name, quote, -(notional + fee) if buy else notional - fee)
+        elif self.linear:
+            self.position += qty if buy else -qty
+            self._add(ex.name, "USDT", -fee)
+        else:
+            base = symbol[:-4]
+            self._add(ex.name, base, qty if buy else -qty)
+            self._add(ex.name, "USDT", -(notional + fee) if buy else notional - fee)
+        self.fills_since_sync += 1
+
+    # ── Capacity ──────────────────────────────────────────────────────────────
+    def _usable(self, amount: float) -> float:
+        return max(amount, 0.0) * (1 - self.buffer_pct / 100)
+
+    def capacity_krw(self, direction: str, upbit_price_krw: float, bybit_price_usdt: float,
+                     usd_krw: float, balances: Optional[dict] = None, position: Optional[float] = None) -> float:
+        """Largest trade (KRW notional) both legs can fund right now."""
+        bal = self.balances if balances is None else balances
+        position = self.position if position is None else position
+        up, by = bal.get(self.upbit.name, {}), bal.get(self.bybit.name, {})
+        upbit_fee = self.upbit.fee_rate()
+        bybit_fee = self.bybit.fee_rate()
+        bybit_usdt_krw = self._usable(by.get("USDT", 0.0)) * usd_krw
+        if direction == "kimchi_buy_bybit":
+            # 업비트 코인 매도 + 바이비트 코인 매수 (선물이면 숏 청산 / 롱)
+            upbit_cap = self._usable(up.get(self.coin, 0.0)) * upbit_price_krw
+            if self.linear:
+                bybit_cap = max(-position, 0.0) * bybit_price_usdt * usd_krw + bybit_usdt_krw * self.leverage
+            else:
+                bybit_cap = bybit_usdt_krw / (1 + bybit_fee)
+        else:
+            # 업비트 코인 매수 + 바이비트 코인 매도 (선물이면 숏)
+            upbit_cap = self._usable(up.get("KRW", 0.0)) / (1 + upbit_fee)
+            if self.linear:
+                bybit_cap = max(position, 0.0) * bybit_price_usdt * usd_krw + bybit_usdt_krw * self.leverage
+            else:
+                bybit_cap = self._usable(by.get(self.coin, 0.0)) * bybit_price_usdt * usd_krw
+        return max(min(upbit_cap, bybit_cap), 0.0)
+
+    def cap_trade(self, direction: str, amount_krw: float, upbit_price_krw: float,
+                  bybit_price_usdt: float, usd_krw: float) -> float:
+        """amount_krw capped by inventory; 0 when below MIN_TRADE_KRW. Unsynced → unchanged."""
+        if not self.synced:
+            return amount_krw
+        capped = min(amount_krw, self.capacity_krw(direction, upbit_price_krw, bybit_price_usdt, usd_krw))
+        return capped if capped >= MIN_TRADE_KRW else 0.0
+
+    # ── Simulation ────────────────────────────────────────────────────────────
+    def simulate(self, direction: str, trade_krw: float, upbit_price_krw: float,
+                 bybit_price_usdt: float, usd_krw: float, max_trades: int = 1000) -> dict:
+        """Repeat one-directional trades on a copy of the inventory until one can't be funded."""
+        bal = {v: dict(b) for v, b in self.balances.items()}
+        position = self.position
+        qty = trade_krw / upbit_price_krw
+        usdt = qty * bybit_price_usdt
+        up, by = bal.setdefault(self.upbit.name, {}), bal.setdefault(self.bybit.name, {})
+        upbit_fee, bybit_fee = self.upbit.fee_rate(), self.bybit.fee_rate()
+        trades = 0
+        while trades < max_trades:
+            cap = self.capacity_krw(direction, upbit_price_krw, bybit_price_usdt, usd_krw, bal, position)
+            if cap < trade_krw:
+                break
+            if direction == "kimchi_buy_bybit":
+                up[self.coin] = up.get(self.coin, 0.0) - qty
+                up["KRW"] = up.get("KRW", 0.0) + trade_krw * (1 - upbit_fee)
+                if self.linear:
+                    position += qty
+                    by["USDT"] = by.get("USDT", 0.0) - usdt * bybit_fee
+                else:
+                    by[self.coin] = by.get(self.coin, 0.0) + qty
+                    by["USDT"] = by.get("USDT", 0.0) - usdt * (1 + bybit_fee)
+            else:
+                up[self.coin] = up.get(self.coin, 0.0) + qty
+                up["KRW"] = up.get("KRW", 0.0) - trade_krw * (1 + upbit_fee)
+                if self.linear:
+                    position -= qty
+                    by["USDT"] = by.get("USDT", 0.0) - usdt * bybit_fee
+                else:
+                    by[self.coin] = by.get(self.coin, 0.0) - qty
+                    by["USDT"] = by.get("USDT", 0.0) + usdt * (1 - bybit_fee)
+            trades += 1
+        return {
+            "direction": direction,
+            "trade_krw": trade_krw,
+            "trades_until_rebalance": trades,
+            "capacity_now_krw": round(self.capacity_krw(direction, upbit_price_krw, bybit_price_usdt, usd_krw), 0),
+            "balances_at_limit": bal,
+            "position_at_limit": position,
+        }
+
+    def plan_rebalance(self, upbit_price_krw: float, bybit_price_usdt: float, usd_krw: float,
+                       usdt_krw: Optional[float] = None, target_ratio: float = 0.5) -> RebalancePlan:
+        """Transfers that restore a target_ratio split (Upbit share) of coin and cash value.
+
+        Coin moves as-is; KRW ↔ USDT goes through Upbit's KRW-USDT market (usdt_krw, default usd_krw)
+        and a USDT transfer. Moves below the asset's minimum (or its withdrawal fee) are skipped.
+        """
+        usdt_krw = usdt_krw or usd_krw
+        upbit_name, bybit_name = self.upbit.name, self.bybit.name
+        plan = RebalancePlan()
+        directions = ("kimchi_buy_bybit", "reverse_buy_upbit")
+        plan.capacity_before_krw = {
+            d: round(self.capacity_krw(d, upbit_price_krw, bybit_price_usdt, usd_krw), 0) for d in directions
+        }
+        after = {v: dict(b) for v, b in self.balances.items()}
+
+        # 코인: 선물 계정이면 바이비트 쪽 코인이 없으므로 코인 이동은 하지 않음
+        if not self.linear:
+            up_coin, by_coin = self.get(upbit_name, self.coin), self.get(bybit_name, self.coin)
+            step = self._transfer_step(self.coin, up_coin - (up_coin + by_coin) * target_ratio, upbit_price_krw)
+            if step:
+                self._move(after, step.from_venue, self.coin, -step.amount)
+                self._move(after, step.to_venue, self.coin, step.amount - step.fee)
+                plan.steps.append(step)
+
+        # 현금: 업비트 KRW ↔ 바이비트 USDT (원화 가치 기준)
+        up_krw = self.get(upbit_name, "KRW")
+        by_krw = self.get(bybit_name, "USDT") * usd_krw
+        excess_krw = up_krw - (up_krw + by_krw) * target_ratio
+        fee_rate = self.upbit.fee_rate(symbol="KRW-USDT")
+        if excess_krw > 0:
+            # 업비트 KRW → USDT 매수 후 바이비트로 전송
+            step = self._transfer_step("USDT", excess_krw * (1 - fee_rate) / usdt_krw, usdt_krw)
+            if step:
+                step.cost_krw += excess_krw * fee_rate
+                step.note = f"업비트 KRW-USDT 매수 {excess_krw:,.0f}KRW 후 전송"
+                self._move(after, upbit_name, "KRW", -excess_krw)
+                self._move(after, bybit_name, "USDT", step.amount - step.fee)
+                plan.steps.append(step)
+        elif excess_krw < 0:
+            # 바이비트 USDT 를 업비트로 보내서 KRW-USDT 매도
+            step = self._transfer_step("USDT", excess_krw / usd_krw, usdt_krw)
+            if step:
+                received_krw = (step.amount - step.fee) * usdt_krw
+                step.cost_krw += received_krw * fee_rate
+                step.note = "도착 후 업비트 KRW-USDT 매도"
+                self._move(after, bybit_name, "USDT", -step.amount)
+                self._move(after, upbit_name, "KRW", received_krw * (1 - fee_rate))
+                plan.steps.append(step)
+
+        plan.total_cost_krw = round(sum(s.cost_krw for s in plan.steps), 0)
+        plan.ready_after_sec = max((s.delay_sec for s in plan.steps), default=0.0)
+        plan.capacity_after_krw = {
+            d: round(self.capacity_krw(d, upbit_price_krw, bybit_price_usdt, usd_krw, after), 0) for d in directions
+        }
+        return plan
+
+    def _transfer_step(self, asset: str, excess: float, price_krw: float) -> Optional[RebalanceStep]:
+        """excess > 0: Upbit → Bybit, < 0: Bybit → Upbit; None when too small to be worth the fee."""
+        cost = self.transfer_costs.get(asset)
+        amount = abs(excess)
+        if cost is None or amount < max(cost.min_amount, cost.withdraw_fee):
+            return None
+        src, dst = (self.upbit.name, self.bybit.name) if excess > 0 else (self.bybit.name, self.upbit.name)
+        return RebalanceStep(
+            asset=asset, from_venue=src, to_venue=dst, amount=amount, fee=cost.withdraw_fee,
+            cost_krw=cost.withdraw_fee * price_krw, delay_sec=cost.delay_sec,
+        )
+
+    @staticmethod
+    def _move(balances: dict, venue: str, asset: str, amount: float):
+        bal = balances.setdefault(venue, {})
+        bal[asset] = bal.get(asset, 0.0) + amount
+
+    def status(self) -> dict:
+        return {
+            "synced_at": self.synced_at,
+            "age_sec": round(time.time() - self.synced_at, 1) if self.synced else None,
+            "fills_since_sync": self.fills_since_sync,
+            "dirty": self._dirty,
+            "balances": self.balances,
+            "position": self.position,
+        }
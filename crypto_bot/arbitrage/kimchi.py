@@ -10,18 +10,34 @@
 import asyncio
 import logging
 import time
-from dataclasses import dataclass
+from collections import deque
+from dataclasses import dataclass, field
 from typing import Optional
 
-import aiohttp
-
+from ..exchanges.base import BaseExchange, Order, OrderRejected, PreparedOrder
 from ..exchanges.upbit import UpbitExchange
 from ..exchanges.bybit import BybitExchange
+from ..exchanges.orderbook import L2Book
+from .depth import evaluate_depth
+from .fx import FxService, ErApiSource, UpbitUsdtSource
+from .history import PremiumHistory
+from .inventory import InventoryManager
 
 logger = logging.getLogger(__name__)
 
-# 환율 API (무료 오픈 소스)
-FX_URL = "https://open.er-api.com/v6/latest/USD"
+COIN = "BTC"          # 모니터 대상 (KRW-BTC / BTCUSDT)
+MAX_FX_AGE = 300.0   # 이보다 오래된 환율로는 자동 실행하지 않음 (초)
+
+BOOK_DEPTH = 50   # REST 호가 조회 깊이 (스트림 미사용 시)
+
+# 주문 실행
+LEG_TIMEOUT = 3.0          # 주문 접수 응답 대기 (초)
+FILL_TIMEOUT = 5.0         # 체결 확인 대기 (초)
+FILL_POLL_INTERVAL = 0.2
+FINAL_QUERY_RETRIES = 3    # 시간 초과 후 취소 → 최종 체결 수량 재조회 시도 횟수
+HEDGE_MIN_QTY = 0.001      # 레그 간 체결 수량 차이가 이보다 작으면 무시 (바이비트 BTC 최소 수량)
+FINAL_STATES = {"done", "cancel", "filled", "cancelled", "partiallyfilledcanceled", "rejected", "deactivated"}
+MIN_TRADE_INTERVAL = 10.0  # 자동 실행 간 최소 간격 (초)
 
 
 @dataclass
@@ -37,8 +53,17 @@ class ArbitrageOpportunity:
     # Net profit after fees
     net_profit_pct: float = 0.0
     is_profitable: bool = False
+    # 호가 기준 (trade_amount_krw 만큼 체결 시 VWAP, 슬리피지 반영)
+    upbit_vwap_krw: float = 0.0
+    bybit_vwap_usdt: float = 0.0
+    depth_premium_pct: float = 0.0
+    slippage_pct: float = 0.0
+    depth_net_profit_pct: float = 0.0
+    max_profitable_krw: float = 0.0
     direction: str = ""         # 'kimchi_buy_bybit' | 'reverse_buy_upbit'
     note: str = ""
+    fx_source: str = ""
+    fx_age_sec: float = 0.0
 
 
 @dataclass
@@ -48,9 +73,33 @@ class ArbitrageResult:
     expected_profit_krw: float
     upbit_order_id: str = ""
     bybit_order_id: str = ""
-    status: str = "pending"    # 'pending' | 'executed' | 'failed'
+    status: str = "pending"    # 'pending' | 'executed' | 'failed' | 'unwound' | 'skipped'
     actual_profit_krw: float = 0.0
     error: str = ""
+    # 레그별 체결 수량 / 타임스탬프 (unix sec): 전송 → 접수 → 체결 확인
+    upbit_filled_qty: float = 0.0
+    bybit_filled_qty: float = 0.0
+    upbit_avg_price: float = 0.0    # 체결 평균가 (KRW / USDT)
+    bybit_avg_price: float = 0.0
+    upbit_sent_at: float = 0.0
+    upbit_ack_at: float = 0.0
+    upbit_filled_at: float = 0.0
+    bybit_sent_at: float = 0.0
+    bybit_ack_at: float = 0.0
+    bybit_filled_at: float = 0.0
+    unwind_order_ids: list = field(default_factory=list)
+
+
+@dataclass
+class _LegResult:
+    order: Optional[Order] = None
+    filled_qty: float = 0.0
+    avg_price: float = 0.0
+    unknown: bool = False      # 접수됐지만 최종 체결 수량을 확인하지 못함
+    sent_at: float = 0.0
+    ack_at: float = 0.0
+    filled_at: float = 0.0
+    error: str = ""
 
 
 class KimchiPremiumMonitor:
@@ -61,42 +110,88 @@ class KimchiPremiumMonitor:
         min_profit_pct: float = 0.3,   # 수수료 공제 후 최소 수익률 %
         trade_amount_krw: float = 1_000_000,  # 1회 거래 금액 (원)
         auto_trade: bool = False,
+        fx: Optional[FxService] = None,
+        max_fx_age: float = MAX_FX_AGE,
+        premiums: Optional[PremiumHistory] = None,
+        inventory: Optional[InventoryManager] = None,
     ):
         self.upbit = upbit
         self.bybit = bybit
         self.min_profit_pct = min_profit_pct
         self.trade_amount_krw = trade_amount_krw
         self.auto_trade = auto_trade
-        self._usd_krw: float = 1350.0   # 기본 환율 (자동 갱신)
-        self._last_fx_update: float = 0
-        self.history: list[ArbitrageOpportunity] = []
+        # 환율: 공개 API 우선, 실패 시 업비트 KRW-USDT 내재 환율
+        self.fx = fx or FxService([ErApiSource(), UpbitUsdtSource(upbit)])
+        self.max_fx_age = max_fx_age
+        self.history: deque[ArbitrageOpportunity] = deque(maxlen=500)
+        # 코인별 김프 시계열 (롤링 통계 + DB 배치 기록), 스캐너와 공유
+        self.premiums = premiums or PremiumHistory()
+        # 잔고 캐시 (체결로 갱신): 있으면 거래 금액을 가용 잔고로 제한
+        self.inventory = inventory
         self.trade_history: list[ArbitrageResult] = []
+        # 자동 실행 가드: 같은 움직임에 두 번 실행하지 않도록
+        self.min_trade_interval = MIN_TRADE_INTERVAL
+        self._armed = True          # 수익 구간을 벗어났다가 다시 들어와야 재실행
+        self._executing = False
+        self._last_exec: float = 0
 
     async def update_fx_rate(self) -> float:
-        """달러/원 환율 업데이트 (60초 캐시)."""
-        if time.time() - self._last_fx_update < 60:
-            return self._usd_krw
+        """현재 공개 환율 (백그라운드 갱신; 첫 호출 시 서비스 시작)."""
+        await self.fx.start()
+        if self.fx.rate is None:
+            raise RuntimeError("환율을 가져올 수 없습니다 (모든 소스 실패)")
+        return self.fx.rate
+
+    @staticmethod
+    async def _book(ex: BaseExchange, symbol: str) -> Optional[L2Book]:
+        """스트림 호가가 살아있으면 그대로, 아니면 REST 스냅샷."""
+        if ex.stream is not None and ex.stream.book(symbol):
+            return ex.stream.book(symbol)
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(FX_URL, timeout=aiohttp.ClientTimeout(total=5)) as resp:
-                    data = await resp.json()
-                    self._usd_krw = data["rates"]["KRW"]
-                    self._last_fx_update = time.time()
-                    logger.debug(f"FX rate updated: 1 USD = {self._usd_krw:,.2f} KRW")
+            ob = await ex.get_orderbook(symbol, BOOK_DEPTH)
         except Exception as e:
-            logger.warning(f"FX rate fetch failed, using cached: {e}")
-        return self._usd_krw
+            logger.warning(f"{ex.name} 호가 조회 실패 ({symbol}): {e}")
+            return None
+        book = L2Book(symbol)
+        book.apply_snapshot(ob.bids, ob.asks, timestamp=ob.timestamp)
+        return book
 
     async def check(self) -> ArbitrageOpportunity:
-        """현재 김프 계산."""
-        usd_krw, upbit_ticker, bybit_ticker = await asyncio.gather(
+        """현재 김프 계산 (+ auto_trade 시 실행)."""
+        opp = await self.evaluate_rest()
+        await self.maybe_execute(opp)
+        return opp
+
+    async def evaluate_rest(self) -> ArbitrageOpportunity:
+        """시세/호가를 조회해서 (스트림이 있으면 메모리에서) 김프 계산."""
+        usd_krw, upbit_ticker, bybit_ticker, upbit_book, bybit_book = await asyncio.gather(
             self.update_fx_rate(),
             self.upbit.get_ticker("KRW-BTC"),
             self.bybit.get_ticker("BTCUSDT"),
+            self._book(self.upbit, "KRW-BTC"),
+            self._book(self.bybit, "BTCUSDT"),
+        )
+        return self.evaluate(usd_krw, upbit_ticker.price, bybit_ticker.price, upbit_book, bybit_book)
+
+    def check_live(self) -> Optional[ArbitrageOpportunity]:
+        """스트림 시세/호가만으로 재계산 (네트워크 호출 없음). 스트림 데이터가 없으면 None."""
+        if self.upbit.stream is None or self.bybit.stream is None:
+            return None
+        upbit_ticker = self.upbit.stream.ticker("KRW-BTC")
+        bybit_ticker = self.bybit.stream.ticker("BTCUSDT")
+        if upbit_ticker is None or bybit_ticker is None:
+            return None
+        if self.fx.rate is None:
+            return None
+        return self.evaluate(
+            self.fx.rate, upbit_ticker.price, bybit_ticker.price,
+            self.upbit.stream.book("KRW-BTC"), self.bybit.stream.book("BTCUSDT"),
         )
 
-        upbit_price = upbit_ticker.price
-        bybit_price_usdt = bybit_ticker.price
+    def evaluate(self, usd_krw: float, upbit_price: float, bybit_price_usdt: float,
+                 upbit_book: Optional[L2Book] = None,
+                 bybit_book: Optional[L2Book] = None) -> ArbitrageOpportunity:
+        """시세(+호가)로 김프/수익성 계산 후 history 에 기록."""
         bybit_price_krw = bybit_price_usdt * usd_krw
 
         kimchi_pct = (upbit_price - bybit_price_krw) / bybit_price_krw * 100
@@ -114,6 +209,20 @@ class KimchiPremiumMonitor:
             direction = "reverse_buy_upbit"  # 역김프: 업비트에서 사고 바이비트에서 공매도
             note = f"역김프 {kimchi_pct:.2f}% → 업비트 매수/바이비트 숏"
 
+        if self.fx.age > self.max_fx_age:
+            note += f" | 환율 {self.fx.age:.0f}초 경과 (실행 보류)"
+
+        # 호가를 실제 주문 규모만큼 훑어서 슬리피지까지 반영한 수익성으로 판단
+        depth = None
+        if upbit_book is not None and bybit_book is not None:
+            depth = evaluate_depth(
+                upbit_book, bybit_book, usd_krw, kimchi_pct > 0,
+                self.trade_amount_krw, total_fee_pct, self.min_profit_pct,
+            )
+            is_profitable = depth.filled and depth.net_profit_pct >= self.min_profit_pct
+            if not depth.filled:
+                note += " | 호가 깊이 부족"
+
         opp = ArbitrageOpportunity(
             timestamp=time.time(),
             upbit_price_krw=upbit_price,
@@ -127,85 +236,275 @@ class KimchiPremiumMonitor:
             is_profitable=is_profitable,
             direction=direction,
             note=note,
+            fx_source=self.fx.quote.source if self.fx.quote else "",
+            fx_age_sec=round(self.fx.age, 1) if self.fx.quote else 0.0,
         )
+        if depth is not None:
+            opp.upbit_vwap_krw = depth.upbit_vwap_krw
+            opp.bybit_vwap_usdt = depth.bybit_vwap_usdt
+            opp.depth_premium_pct = depth.premium_pct
+            opp.slippage_pct = depth.slippage_pct
+            opp.depth_net_profit_pct = depth.net_profit_pct
+            opp.max_profitable_krw = depth.max_profitable_krw
 
         self.history.append(opp)
-        if len(self.history) > 1000:
-            self.history = self.history[-500:]
-
-        if is_profitable and self.auto_trade:
-            await self.execute_arbitrage(opp)
-
+        self.premiums.record(COIN, kimchi_pct, opp.timestamp)
         return opp
 
+    async def maybe_execute(self, opp: ArbitrageOpportunity) -> Optional[ArbitrageResult]:
+        """자동 실행 (auto_trade). 실행 중/재무장 전/최소 간격 이내면 건너뜀."""
+        if not opp.is_profitable:
+            self._armed = True
+            return None
+        if not self.auto_trade or not self._armed or self._executing:
+            return None
+        if time.time() - self._last_exec < self.min_trade_interval:
+            return None
+        if self.fx.age > self.max_fx_age:
+            logger.warning(f"환율이 {self.fx.age:.0f}초 경과 (한도 {self.max_fx_age:.0f}초) → 차익거래 보류")
+            return None
+        self._armed = False
+        self._executing = True
+        self._last_exec = time.time()
+        try:
+            if self.inventory is not None:
+                try:
+                    await self.inventory.sync()   # 오래됐거나 실패 후에만 실제 조회
+                except Exception as e:
+                    logger.warning(f"잔고 동기화 실패 (캐시 사용): {e}")
+            return await self.execute_arbitrage(opp)
+        finally:
+            self._executing = False
+
     async def execute_arbitrage(self, opp: ArbitrageOpportunity) -> ArbitrageResult:
         """
-        실제 차익거래 실행.
+        실제 차익거래 실행: 두 레그 주문을 미리 서명해 두고 동시에 전송.
         ※ 김프 방향 (양수): 업비트에서 BTC 보유 필요, 바이비트에서 USDT 필요
         ※ 역김프 방향 (음수): 업비트에서 KRW 필요, 바이비트 선물 숏 포지션
+        한쪽 레그만 체결되면 체결된 수량을 반대 주문으로 청산(unwind)한다.
         """
+        amount_krw = self.trade_amount_krw
+        if self.inventory is not None:
+            amount_krw = self.inventory.cap_trade(
+                opp.direction, amount_krw, opp.upbit_price_krw, opp.bybit_price_usdt, opp.usd_krw_rate
+            )
+        # 호가를 훑어 계산한 수익률(슬리피지 반영)이 있으면 그것으로 기대수익 산정
+        profit_pct = opp.depth_net_profit_pct if opp.upbit_vwap_krw else opp.net_profit_pct
         result = ArbitrageResult(
             opportunity=opp,
-            trade_amount_krw=self.trade_amount_krw,
-            expected_profit_krw=self.trade_amount_krw * opp.net_profit_pct / 100,
+            trade_amount_krw=amount_krw,
+            expected_profit_krw=amount_krw * profit_pct / 100,
         )
+        if amount_krw <= 0:
+            result.status = "skipped"
+            result.error = "잔고 부족 (리밸런싱 필요)"
+            logger.warning(f"차익거래 건너뜀: {opp.direction} 방향 가용 잔고 부족")
+            self.trade_history.append(result)
+            return result
 
         try:
-            qty_btc = self.trade_amount_krw / opp.upbit_price_krw
-            qty_btc = round(qty_btc, 8)
-
+            qty_btc = round(amount_krw / opp.upbit_price_krw, 8)
             if opp.direction == "kimchi_buy_bybit":
-                # 1) 업비트 BTC 매도 (KRW 확보)
-                upbit_order = await self.upbit.place_order(
-                    "KRW-BTC", "ask", "market", qty=qty_btc
-                )
-                result.upbit_order_id = upbit_order.order_id
-
-                # 2) 바이비트 BTC 매수 (USDT 소비)
-                qty_usdt_equiv = qty_btc  # Bybit uses BTC qty for linear
-                bybit_order = await self.bybit.place_order(
-                    "BTCUSDT", "buy", "Market", qty=round(qty_btc, 3)
-                )
-                result.bybit_order_id = bybit_order.order_id
-
+                # 업비트 BTC 매도 (KRW 확보) + 바이비트 BTC 매수 (USDT 소비)
+                upbit_leg = self.upbit.prepare_order("KRW-BTC", "ask", "market", qty=qty_btc)
+                bybit_leg = self.bybit.prepare_order("BTCUSDT", "buy", "Market", qty=round(qty_btc, 3))
             else:  # reverse_buy_upbit
-                # 1) 업비트 BTC 매수
-                upbit_order = await self.upbit.place_order(
-                    "KRW-BTC", "bid", "price", krw_amount=self.trade_amount_krw
-                )
-                result.upbit_order_id = upbit_order.order_id
-
-                # 2) 바이비트 선물 숏 (헤지)
-                bybit_order = await self.bybit.place_order(
-                    "BTCUSDT", "sell", "Market", qty=round(qty_btc, 3)
+                # 업비트 BTC 매수 + 바이비트 선물 숏 (헤지)
+                upbit_leg = self.upbit.prepare_order(
+                    "KRW-BTC", "bid", "market", krw_amount=amount_krw
                 )
-                result.bybit_order_id = bybit_order.order_id
+                bybit_leg = self.bybit.prepare_order("BTCUSDT", "sell", "Market", qty=round(qty_btc, 3))
+        except Exception as e:
+            result.status = "failed"
+            result.error = str(e)
+            logger.error(f"차익거래 주문 준비 실패: {e}")
+            self.trade_history.append(result)
+            return result
 
+        upbit_res, bybit_res = await asyncio.gather(
+            self._run_leg(self.upbit, upbit_leg),
+            self._run_leg(self.bybit, bybit_leg),
+        )
+        for name, leg in (("upbit", upbit_res), ("bybit", bybit_res)):
+            setattr(result, f"{name}_order_id", leg.order.order_id if leg.order else "")
+            setattr(result, f"{name}_filled_qty", leg.filled_qty)
+            setattr(result, f"{name}_avg_price", leg.avg_price)
+            setattr(result, f"{name}_sent_at", leg.sent_at)
+            setattr(result, f"{name}_ack_at", leg.ack_at)
+            setattr(result, f"{name}_filled_at", leg.filled_at)
+        upbit_px = upbit_res.avg_price or opp.upbit_vwap_krw or opp.upbit_price_krw
+        bybit_px = bybit_res.avg_price or opp.bybit_vwap_usdt or opp.bybit_price_usdt
+        if self.inventory is not None:
+            self.inventory.apply_fill(self.upbit, upbit_leg.symbol, upbit_leg.side, upbit_res.filled_qty, upbit_px)
+            self.inventory.apply_fill(self.bybit, bybit_leg.symbol, bybit_leg.side, bybit_res.filled_qty, bybit_px)
+
+        if upbit_res.unknown or bybit_res.unknown:
+            # 체결 여부를 모르는 레그가 있으면 반대 레그를 청산하지 않는다 (헤지가 깨질 수 있음)
+            result.status = "failed"
+            result.error = " | ".join(
+                f"{name}: {leg.error} (체결 수량 확인 불가 — 수동 확인 필요)"
+                for name, leg in (("upbit", upbit_res), ("bybit", bybit_res)) if leg.unknown
+            )
+            if self.inventory is not None:
+                self.inventory.mark_dirty()
+            logger.error(f"차익거래 실패 ({result.status}): {result.error}")
+        elif upbit_res.filled_qty > 0 and bybit_res.filled_qty > 0:
             result.status = "executed"
-            result.actual_profit_krw = result.expected_profit_krw
+            # 부분 체결로 레그 수량이 다르면 초과분을 청산해 헤지를 맞춘다
+            excess = upbit_res.filled_qty - bybit_res.filled_qty
+            if excess >= HEDGE_MIN_QTY:
+                await self._unwind(result, self.upbit, upbit_leg, round(excess, 8), upbit_px)
+            elif -excess >= HEDGE_MIN_QTY:
+                await self._unwind(result, self.bybit, bybit_leg, round(-excess, 3), bybit_px)
+            matched = min(upbit_res.filled_qty, bybit_res.filled_qty)
+            result.actual_profit_krw = self._realized_profit(opp, matched, upbit_px, bybit_px)
+            if self.inventory is not None and result.unwind_order_ids:
+                self.inventory.mark_dirty()
             logger.info(
                 f"차익거래 실행: {opp.direction} | 김프={opp.kimchi_premium_pct:.2f}% | "
-                f"예상수익={result.expected_profit_krw:,.0f}KRW"
+                f"예상수익={result.expected_profit_krw:,.0f}KRW 실현={result.actual_profit_krw:,.0f}KRW | "
+                f"체결 업비트={upbit_res.filled_qty} 바이비트={bybit_res.filled_qty} | "
+                f"지연 업비트={(upbit_res.ack_at - upbit_res.sent_at) * 1000:.0f}ms "
+                f"바이비트={(bybit_res.ack_at - bybit_res.sent_at) * 1000:.0f}ms"
+            )
+        else:
+            result.error = " | ".join(
+                f"{name}: {leg.error or '미체결'}"
+                for name, leg in (("upbit", upbit_res), ("bybit", bybit_res))
+                if leg.filled_qty <= 0
             )
-
-        except Exception as e:
             result.status = "failed"
-            result.error = str(e)
-            logger.error(f"차익거래 실패: {e}")
+            if upbit_res.filled_qty > 0:
+                if await self._unwind(result, self.upbit, upbit_leg, upbit_res.filled_qty, upbit_px):
+                    result.status = "unwound"
+            elif bybit_res.filled_qty > 0:
+                if await self._unwind(result, self.bybit, bybit_leg, bybit_res.filled_qty, bybit_px):
+                    result.status = "unwound"
+            if self.inventory is not None:
+                self.inventory.mark_dirty()   # 청산/미체결 이후 실제 잔고로 다시 맞춤
+            logger.error(f"차익거래 실패 ({result.status}): {result.error}")
 
         self.trade_history.append(result)
         return result
 
-    def get_stats(self) -> dict:
-        if not self.history:
-            return {"avg_kimchi": 0, "current_kimchi": 0, "opportunities": 0}
-
-        last = self.history[-1]
-        recent = self.history[-20:]
+    def _realized_profit(self, opp: ArbitrageOpportunity, qty: float, upbit_px: float, bybit_px: float) -> float:
+        """양쪽 레그에 모두 체결된 수량의 체결가 기준 수익 (왕복 수수료 공제, KRW)."""
+        upbit_krw = qty * upbit_px
+        bybit_krw = qty * bybit_px * opp.usd_krw_rate
+        gross = upbit_krw - bybit_krw if opp.direction == "kimchi_buy_bybit" else bybit_krw - upbit_krw
+        fees = (upbit_krw * self.upbit.taker_fee + bybit_krw * self.bybit.taker_fee) * 2
+        return gross - fees
+
+    async def _run_leg(self, ex: BaseExchange, prepared: PreparedOrder) -> _LegResult:
+        """미리 만든 주문 전송 → 접수 → get_order 로 체결 확인 (각 단계 타임아웃).
+
+        거래소가 확실히 거절한 경우(OrderRejected)만 미체결로 본다. 접수 응답이 시간 초과되거나
+        전송 중 오류가 나면 주문이 나갔을 수 있으므로 클라이언트 주문 ID 로 찾아 이어서 확인한다.
+        체결 확인이 시간 초과되면 주문을 취소하고 최종 체결 수량을 다시 조회한다.
+        끝내 확인하지 못하면 unknown 으로 표시해 반대 레그를 섣불리 청산하지 않게 한다.
+        """
+        leg = _LegResult(sent_at=time.time())
+        try:
+            leg.order = await asyncio.wait_for(ex.send_order(prepared), LEG_TIMEOUT)
+            leg.ack_at = time.time()
+        except OrderRejected as e:
+            leg.error = str(e)
+            return leg
+        except Exception as e:
+            leg.error = "주문 접수 시간 초과" if isinstance(e, asyncio.TimeoutError) else f"주문 전송 오류: {e}"
+            leg.order = await self._final_order(ex, prepared)
+            if leg.order is None:
+                leg.unknown = True
+                return leg
+            logger.warning(f"{ex.name} 접수 응답 없이 주문 확인 ({prepared.client_id} → {leg.order.order_id})")
+        order_id = leg.order.order_id
+        try:
+            order = await asyncio.wait_for(self._wait_filled(ex, prepared.symbol, order_id), FILL_TIMEOUT)
+        except asyncio.TimeoutError:
+            leg.error = "체결 확인 시간 초과"
+            try:
+                await asyncio.wait_for(ex.cancel_order(prepared.symbol, order_id), LEG_TIMEOUT)
+            except Exception as e:
+                logger.warning(f"{ex.name} 주문 취소 실패 ({order_id}): {e}")
+            order = await self._final_order(ex, prepared, order_id)
+            if order is None:
+                leg.unknown = True
+                return leg
+        leg.filled_qty = order.filled_qty
+        leg.avg_price = order.avg_price
+        leg.filled_at = time.time()
+        return leg
+
+    @staticmethod
+    async def _wait_filled(ex: BaseExchange, symbol: str, order_id: str) -> Order:
+        """최종 상태까지 폴링. 일시적인 조회 오류(접수 직후 목록 비어 있음 등)는 재시도."""
+        while True:
+            try:
+                order = await ex.get_order(symbol, order_id)
+            except Exception as e:
+                logger.debug(f"{ex.name} 주문 조회 재시도 ({order_id}): {e}")
+            else:
+                if order.status.lower() in FINAL_STATES or (order.qty and order.filled_qty >= order.qty):
+                    return order
+            await asyncio.sleep(FILL_POLL_INTERVAL)
+
+    @staticmethod
+    async def _final_order(ex: BaseExchange, prepared: PreparedOrder,
+                           order_id: str = "") -> Optional[Order]:
+        """주문 ID(없으면 클라이언트 주문 ID)로 최종 상태 조회 (끝내 실패하면 None)."""
+        if not order_id and not prepared.client_id:
+            return None
+        ref = order_id or prepared.client_id
+        for attempt in range(FINAL_QUERY_RETRIES):
+            try:
+                if order_id:
+                    return await asyncio.wait_for(ex.get_order(prepared.symbol, order_id), LEG_TIMEOUT)
+                return await asyncio.wait_for(
+                    ex.get_order_by_client_id(prepared.symbol, prepared.client_id), LEG_TIMEOUT
+                )
+            except Exception as e:
+                logger.warning(f"{ex.name} 최종 체결 조회 실패 {attempt + 1}/{FINAL_QUERY_RETRIES} ({ref}): {e}")
+                await asyncio.sleep(FILL_POLL_INTERVAL)
+        return None
+
+    async def _unwind(self, result: ArbitrageResult, ex: BaseExchange, leg: PreparedOrder,
+                      filled_qty: float, price: float) -> bool:
+        """체결된 레그(또는 초과 체결분)를 반대 시장가 주문으로 되돌린다."""
+        try:
+            if ex is self.upbit:
+                if leg.side == "ask":   # 판 BTC 되사기 (시장가 매수는 KRW 금액)
+                    order = await self.upbit.place_order(
+                        leg.symbol, "bid", "market", krw_amount=round(filled_qty * price)
+                    )
+                else:
+                    order = await self.upbit.place_order(leg.symbol, "ask", "market", qty=filled_qty)
+            else:
+                side = "sell" if leg.side == "buy" else "buy"
+                order = await self.bybit.place_order(
+                    leg.symbol, side, "Market", qty=filled_qty,
+                    reduce_only=self.bybit.category == "linear",
+                )
+            result.unwind_order_ids.append(order.order_id)
+            logger.warning(f"{ex.name} 레그 청산 완료: {leg.symbol} {filled_qty}")
+            return True
+        except Exception as e:
+            result.error = " | ".join(filter(None, [result.error, f"청산 실패: {e}"]))
+            logger.error(f"{ex.name} 레그 청산 실패 — 수동 확인 필요: {e}")
+            return False
 
+    def get_stats(self, coin: str = COIN) -> dict:
+        """최근 김프 + 윈도우별 롤링 통계 (coin 은 스캐너가 기록한 코인도 가능)."""
         executed = [t for t in self.trade_history if t.status == "executed"]
-        total_profit = sum(t.actual_profit_krw for t in executed)
+        stats = {
+            **self.premiums.stats(coin),
+            "total_arb_trades": len(executed),
+            "total_arb_profit_krw": sum(t.actual_profit_krw for t in executed),
+        }
+        if coin != COIN or not self.history:
+            return stats
 
+        last = self.history[-1]
+        recent = self.premiums.get(COIN).tail(20)
         return {
             "current_kimchi_pct": last.kimchi_premium_pct,
             "current_net_profit_pct": last.net_profit_pct,
@@ -214,8 +513,10 @@ class KimchiPremiumMonitor:
             "bybit_price_krw": last.bybit_price_krw,
             "usd_krw": last.usd_krw_rate,
             "is_profitable": last.is_profitable,
-            "avg_kimchi_pct_20": round(sum(h.kimchi_premium_pct for h in recent) / len(recent), 4),
-            "total_arb_trades": len(executed),
-            "total_arb_profit_krw": total_profit,
+            "depth_net_profit_pct": last.depth_net_profit_pct,
+            "slippage_pct": last.slippage_pct,
+            "max_profitable_krw": last.max_profitable_krw,
+            "avg_kimchi_pct_20": round(float(recent.mean()), 4) if len(recent) else 0.0,
             "note": last.note,
+            **stats,
         }
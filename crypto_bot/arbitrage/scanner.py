@@ -0,0 +1,104 @@
+"""
+전 종목 김프 스캐너.
+
+업비트 KRW 마켓과 바이비트 USDT 마켓에 모두 상장된 코인을 매핑하고,
+거래소별 벌크 시세 1회 요청 + 환율로 전 종목 김프를 한 번에 계산해 순위를 매긴다.
+"""
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+
+import numpy as np
+
+from .kimchi import KimchiPremiumMonitor
+
+logger = logging.getLogger(__name__)
+
+PAIR_REFRESH_SEC = 3600   # 상장 종목 매핑 갱신 주기
+
+
+@dataclass
+class PremiumQuote:
+    coin: str
+    upbit_symbol: str
+    bybit_symbol: str
+    upbit_price_krw: float
+    bybit_price_usdt: float
+    bybit_price_krw: float
+    kimchi_premium_pct: float
+    net_profit_pct: float
+    is_profitable: bool
+    direction: str
+
+
+class KimchiScanner:
+    """Scans every coin listed on both venues, using the monitor's exchanges, FX and thresholds."""
+
+    def __init__(self, monitor: KimchiPremiumMonitor):
+        self.monitor = monitor
+        self.pairs: list[tuple[str, str, str]] = []   # (coin, upbit symbol, bybit symbol)
+        self._pairs_updated: float = 0
+        self.last_scan: list[PremiumQuote] = []
+
+    async def refresh_pairs(self, force: bool = False) -> list[tuple[str, str, str]]:
+        """Coins listed on Upbit KRW and Bybit USDT (cached for PAIR_REFRESH_SEC)."""
+        if not force and self.pairs and time.time() - self._pairs_updated < PAIR_REFRESH_SEC:
+            return self.pairs
+        markets, instruments = await asyncio.gather(
+            self.monitor.upbit.get_all_markets(),
+            self.monitor.bybit.get_instruments(),
+        )
+        bybit_by_coin = {i["base"]: i["symbol"] for i in instruments if i["quote"] == "USDT"}
+        self.pairs = sorted(
+            (m[4:], m, bybit_by_coin[m[4:]]) for m in markets if m[4:] in bybit_by_coin
+        )
+        self._pairs_updated = time.time()
+        logger.info(f"김프 스캐너 종목 매핑: {len(self.pairs)}개")
+        return self.pairs
+
+    async def scan(self) -> list[PremiumQuote]:
+        """All overlapping coins, best net profit first."""
+        pairs = await self.refresh_pairs()
+        if not pairs:
+            return []
+        coins, upbit_syms, bybit_syms = zip(*pairs)
+        usd_krw, upbit_tickers, bybit_tickers = await asyncio.gather(
+            self.monitor.update_fx_rate(),
+            self.monitor.upbit.get_tickers(list(upbit_syms)),
+            self.monitor.bybit.get_tickers(list(bybit_syms)),
+        )
+
+        nan = float("nan")
+        upbit_krw = np.array([upbit_tickers[s].price if s in upbit_tickers else nan for s in upbit_syms])
+        bybit_usdt = np.array([bybit_tickers[s].price if s in bybit_tickers else nan for s in bybit_syms])
+        bybit_krw = bybit_usdt * usd_krw
+        with np.errstate(invalid="ignore", divide="ignore"):
+            premium = (upbit_krw - bybit_krw) / bybit_krw * 100
+        fee_pct = (self.monitor.upbit.taker_fee + self.monitor.bybit.taker_fee) * 2 * 100   # round trip
+        net = np.abs(premium) - fee_pct
+        valid = np.isfinite(net) & (bybit_krw > 0)
+        order = np.flatnonzero(valid)[np.argsort(-net[valid], kind="stable")]
+
+        now = time.time()
+        self.monitor.premiums.record_many(
+            {coins[i]: float(premium[i]) for i in np.flatnonzero(valid)}, now
+        )
+
+        premium_r, net_r = np.round(premium, 4), np.round(net, 4)
+        self.last_scan = [
+            PremiumQuote(
+                coin=coins[i],
+                upbit_symbol=upbit_syms[i],
+                bybit_symbol=bybit_syms[i],
+                upbit_price_krw=float(upbit_krw[i]),
+                bybit_price_usdt=float(bybit_usdt[i]),
+                bybit_price_krw=float(bybit_krw[i]),
+                kimchi_premium_pct=float(premium_r[i]),
+                net_profit_pct=float(net_r[i]),
+                is_profitable=bool(net[i] >= self.monitor.min_profit_pct),
+                direction="kimchi_buy_bybit" if premium[i] > 0 else "reverse_buy_upbit",
+            )
+            for i in order
+        ]
+        return self.last_scan
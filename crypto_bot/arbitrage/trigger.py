@@ -0,0 +1,126 @@
+"""
+이벤트 기반 김프 트리거.
+
+업비트/바이비트 스트림의 시세·호가 갱신 이벤트마다 김프를 다시 계산하고
+(네트워크 호출 없이 메모리의 최신 시세/호가 사용) 곧바로 실행기로 넘긴다.
+평가 중에 들어온 이벤트는 한 번의 재계산으로 합쳐지고, 중복 실행은
+KimchiPremiumMonitor.maybe_execute 의 재무장/최소 간격 가드가 막는다.
+스트림이 끊겨 있으면 poll_interval 마다 REST 로 확인한다.
+"""
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable, Optional
+
+from .kimchi import KimchiPremiumMonitor, ArbitrageOpportunity, ArbitrageResult
+
+logger = logging.getLogger(__name__)
+
+POLL_INTERVAL = 2.0        # 스트림이 없을 때 REST 확인 주기 (초)
+PUBLISH_INTERVAL = 1.0     # on_update 콜백 최소 간격 (초)
+
+UpdateCallback = Callable[[ArbitrageOpportunity, Optional[ArbitrageResult]], Awaitable[None]]
+
+
+class ArbitrageTrigger:
+    def __init__(
+        self,
+        monitor: KimchiPremiumMonitor,
+        on_update: Optional[UpdateCallback] = None,
+        poll_interval: float = POLL_INTERVAL,
+        publish_interval: float = PUBLISH_INTERVAL,
+    ):
+        self.monitor = monitor
+        self.on_update = on_update
+        self.poll_interval = poll_interval
+        self.publish_interval = publish_interval
+        self.symbols = {"KRW-BTC", "BTCUSDT"}
+        self._event = asyncio.Event()
+        self._event_at: float = 0      # 아직 처리되지 않은 첫 이벤트 시각
+        self._last_publish: float = 0
+        self._task: Optional[asyncio.Task] = None
+        self.evaluations = 0
+        self.executions = 0
+        self.last_latency_ms: float = 0.0   # 시세 이벤트 → 실행 시작
+
+    async def start(self):
+        await self.monitor.fx.start()
+        for ex in (self.monitor.upbit, self.monitor.bybit):
+            if ex.stream is not None:
+                ex.stream.add_listener(self._on_quote)
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+        logger.info("김프 이벤트 트리거 시작")
+
+    async def stop(self):
+        for ex in (self.monitor.upbit, self.monitor.bybit):
+            if ex.stream is not None:
+                ex.stream.remove_listener(self._on_quote)
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+
+    def _on_quote(self, kind: str, symbol: str):
+        if symbol in self.symbols and not self._event.is_set():
+            self._event_at = time.time()
+            self._event.set()
+
+    def _streams_live(self) -> bool:
+        return all(
+            ex.stream is not None and ex.stream.connected
+            for ex in (self.monitor.upbit, self.monitor.bybit)
+        )
+
+    async def _run(self):
+        while True:
+            try:
+                try:
+                    await asyncio.wait_for(self._event.wait(), self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                event_at, fired = self._event_at, self._event.is_set()
+                self._event.clear()
+
+                opp = self.monitor.check_live() if fired else None
+                if opp is None:
+                    if fired and self._streams_live():
+                        continue   # 스트림에 아직 양쪽 데이터가 없음
+                    if not self._streams_live():
+                        opp = await self.monitor.evaluate_rest()
+                if opp is None:
+                    continue
+                self.evaluations += 1
+
+                if fired and opp.is_profitable:
+                    self.last_latency_ms = (time.time() - event_at) * 1000
+                result = await self.monitor.maybe_execute(opp)   # 수익 구간 이탈 시 재무장
+                if result is not None:
+                    self.executions += 1
+                await self._publish(opp, result)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"김프 트리거 오류: {e}", exc_info=True)
+                await asyncio.sleep(self.poll_interval)
+
+    async def _publish(self, opp: ArbitrageOpportunity, result: Optional[ArbitrageResult]):
+        if self.on_update is None:
+            return
+        now = time.time()
+        if result is None and now - self._last_publish < self.publish_interval:
+            return
+        self._last_publish = now
+        await self.on_update(opp, result)
+
+    def status(self) -> dict:
+        return {
+            "running": self._task is not None and not self._task.done(),
+            "streams_live": self._streams_live(),
+            "evaluations": self.evaluations,
+            "executions": self.executions,
+            "last_latency_ms": round(self.last_latency_ms, 3),
+        }
@@ -0,0 +1,11 @@
+"""Backtesting: replay historical candles through the trading strategies, and recorded books through the arbitrage executor."""
+from .engine import Backtester, BacktestReport
+from .data import load_ohlcv, to_epoch_seconds
+from .optimizer import sweep, SweepResult, grid_candidates, random_candidates
+from .arb_replay import ArbitrageReplay, ReplayReport, ReplayTrade
+
+__all__ = [
+    "Backtester", "BacktestReport", "load_ohlcv", "to_epoch_seconds",
+    "sweep", "SweepResult", "grid_candidates", "random_candidates",
+    "ArbitrageReplay", "ReplayReport", "ReplayTrade",
+]
@@ -0,0 +1,204 @@
+"""Replay recorded order books through KimchiPremiumMonitor on paper venues.
+
+Every recorded book update is an event: the monitor evaluates the premium on
+the books in effect at that moment and, when profitable (and re-armed after
+leaving the profitable zone), runs the real execute_arbitrage against two
+PaperExchange venues. Orders then fill on the books in effect after the
+injected latency, so the report shows how much of the premium seen at
+decision time was actually captured. Events that happen while an execution
+is in flight are skipped, as they would be live.
+
+Latency sleeps are paced at 1/speed of the wall clock. The monitor's own
+leg/fill timeouts are wall-clock, so keep speed × timeout well above the
+injected latency.
+"""
+import asyncio
+import logging
+from dataclasses import dataclass, field, asdict
+from typing import Optional
+
+import numpy as np
+
+from ..exchanges.paper import PaperExchange, BookTape, SimClock, LatencyModel
+from ..exchanges.upbit import UpbitExchange
+from ..exchanges.bybit import BybitExchange
+from ..arbitrage.kimchi import KimchiPremiumMonitor
+from ..arbitrage.fx import FxService, StaticFxSource
+from ..arbitrage.history import PremiumHistory
+
+logger = logging.getLogger(__name__)
+
+UPBIT_SYMBOL = "KRW-BTC"
+BYBIT_SYMBOL = "BTCUSDT"
+
+
+@dataclass
+class ReplayTrade:
+    timestamp: float             # virtual decision time
+    direction: str
+    status: str
+    expected_pct: float          # depth premium at decision time (signed toward the trade)
+    captured_pct: float          # premium realized by the fills (same sign convention)
+    upbit_price: float
+    bybit_price: float
+    amount_krw: float
+    elapsed_ms: float            # decision → execute_arbitrage returned (virtual)
+
+
+@dataclass
+class ReplayReport:
+    latency_ms: float
+    events: int
+    opportunities: int
+    trades: int
+    failed: int
+    unwound: int
+    avg_expected_pct: float
+    avg_captured_pct: float
+    capture_ratio: float         # captured / expected (executed trades)
+    captured_krw: float
+    wall_seconds: float
+    virtual_seconds: float
+    trade_log: list = field(default_factory=list)
+
+    def summary(self, with_trades: bool = False) -> dict:
+        out = {k: v for k, v in asdict(self).items() if k != "trade_log"}
+        if with_trades:
+            out["trade_log"] = [asdict(t) for t in self.trade_log]
+        return out
+
+
+class ArbitrageReplay:
+    def __init__(
+        self,
+        upbit_tape: BookTape,
+        bybit_tape: BookTape,
+        usd_krw: float,
+        latency_ms: float = 50.0,
+        jitter_ms: float = 0.0,
+        speed: float = 100.0,
+        trade_amount_krw: float = 1_000_000,
+        min_profit_pct: float = 0.3,
+        partial_fill_prob: float = 0.0,
+        reject_prob: float = 0.0,
+        balances: Optional[dict] = None,
+        seed: Optional[int] = 0,
+    ):
+        self.upbit_tape = upbit_tape
+        self.bybit_tape = bybit_tape
+        self.usd_krw = usd_krw
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.speed = speed
+        self.trade_amount_krw = trade_amount_krw
+        self.min_profit_pct = min_profit_pct
+        self.partial_fill_prob = partial_fill_prob
+        self.reject_prob = reject_prob
+        self.balances = balances or {
+            "upbit": {"KRW": 1e10, "BTC": 100.0},
+            "bybit": {"USDT": 1e7, "BTC": 100.0},
+        }
+        self.seed = seed
+
+    def _seed(self, offset: int) -> Optional[int]:
+        return None if self.seed is None else self.seed + offset
+
+    def _venues(self, clock: SimClock, latency_ms: float) -> tuple[PaperExchange, PaperExchange]:
+        # 체결/지연 난수는 레그마다 따로 (같은 시드면 두 레그 지연이 똑같이 뽑힘)
+        common = dict(clock=clock, partial_fill_prob=self.partial_fill_prob, reject_prob=self.reject_prob)
+        upbit = PaperExchange(
+            "upbit", self.upbit_tape, latency=LatencyModel(latency_ms, self.jitter_ms, self._seed(2)),
+            taker_fee=UpbitExchange.taker_fee, balances=self.balances["upbit"], seed=self._seed(0), **common,
+        )
+        bybit = PaperExchange(
+            "bybit", self.bybit_tape, latency=LatencyModel(latency_ms, self.jitter_ms, self._seed(3)),
+            taker_fee=BybitExchange.taker_fee, category="linear", balances=self.balances["bybit"],
+            seed=self._seed(1), **common,
+        )
+        return upbit, bybit
+
+    async def run(self, latency_ms: Optional[float] = None) -> ReplayReport:
+        latency_ms = self.latency_ms if latency_ms is None else latency_ms
+        times = np.union1d(self.upbit_tape.times(UPBIT_SYMBOL), self.bybit_tape.times(BYBIT_SYMBOL))
+        if not len(times):
+            raise ValueError("Empty tapes")
+        clock = SimClock(start=float(times[0]), speed=self.speed)
+        upbit, bybit = self._venues(clock, latency_ms)
+        monitor = KimchiPremiumMonitor(
+            upbit, bybit,
+            min_profit_pct=self.min_profit_pct,
+            trade_amount_krw=self.trade_amount_krw,
+            fx=FxService([StaticFxSource(self.usd_krw)]),
+            premiums=PremiumHistory(persist=False),
+        )
+        await monitor.fx.refresh()
+
+        wall = asyncio.get_running_loop().time()
+        events = opportunities = 0
+        armed = True
+        log: list[ReplayTrade] = []
+        for t in times:
+            if t < clock.now():
+                continue   # 실행 중에 지나간 이벤트
+            clock.jump(float(t))
+            events += 1
+            upbit_book = self.upbit_tape.at(UPBIT_SYMBOL, t)
+            bybit_book = self.bybit_tape.at(BYBIT_SYMBOL, t)
+            if upbit_book is None or bybit_book is None or not upbit_book.mid() or not bybit_book.mid():
+                continue
+            opp = monitor.evaluate(self.usd_krw, upbit_book.mid(), bybit_book.mid(), upbit_book, bybit_book)
+            if not opp.is_profitable:
+                armed = True
+                continue
+            opportunities += 1
+            if not armed:
+                continue
+            armed = False
+            decided = clock.now()
+            result = await monitor.execute_arbitrage(opp)
+            log.append(self._trade(opp, result, upbit, bybit, decided, clock.now()))
+
+        executed = [tr for tr in log if tr.status == "executed"]
+        expected = float(np.mean([tr.expected_pct for tr in executed])) if executed else 0.0
+        captured = float(np.mean([tr.captured_pct for tr in executed])) if executed else 0.0
+        fee_pct = (UpbitExchange.taker_fee + BybitExchange.taker_fee) * 100
+        return ReplayReport(
+            latency_ms=latency_ms,
+            events=events,
+            opportunities=opportunities,
+            trades=len(executed),
+            failed=sum(tr.status == "failed" for tr in log),
+            unwound=sum(tr.status == "unwound" for tr in log),
+            avg_expected_pct=round(expected, 4),
+            avg_captured_pct=round(captured, 4),
+            capture_ratio=round(captured / expected, 4) if expected else 0.0,
+            captured_krw=round(sum(tr.amount_krw * (tr.captured_pct - fee_pct) / 100 for tr in executed), 0),
+            wall_seconds=round(asyncio.get_running_loop().time() - wall, 3),
+            virtual_seconds=round(float(times[-1] - times[0]), 3),
+            trade_log=log,
+        )
+
+    def _trade(self, opp, result, upbit: PaperExchange, bybit: PaperExchange,
+               decided: float, done: float) -> ReplayTrade:
+        sign = 1.0 if opp.direction == "kimchi_buy_bybit" else -1.0
+        up = upbit.orders.get(result.upbit_order_id)
+        by = bybit.orders.get(result.bybit_order_id)
+        captured = 0.0
+        if up is not None and by is not None and up.filled_qty and by.filled_qty:
+            bybit_krw = by.price * self.usd_krw
+            captured = sign * (up.price - bybit_krw) / bybit_krw * 100
+        return ReplayTrade(
+            timestamp=decided,
+            direction=opp.direction,
+            status=result.status,
+            expected_pct=round(sign * (opp.depth_premium_pct or opp.kimchi_premium_pct), 4),
+            captured_pct=round(captured, 4),
+            upbit_price=up.price if up is not None else 0.0,
+            bybit_price=by.price if by is not None else 0.0,
+            amount_krw=result.trade_amount_krw,
+            elapsed_ms=round((done - decided) * 1000, 3),
+        )
+
+    async def sweep_latency(self, latencies_ms: list[float]) -> list[ReplayReport]:
+        """Same tapes, one replay per latency: how much premium each latency level captures."""
+        return [await self.run(latency) for latency in latencies_ms]
@@ -0,0 +1,28 @@
+"""OHLCV loading for backtests (CSV / JSON files)."""
+import json
+from pathlib import Path
+
+import numpy as np
+
+from ..data.candle_store import to_epoch_seconds  # noqa: F401  (re-exported)
+
+
+def load_ohlcv(path) -> np.ndarray:
+    """Load candles as a (candles, 6) float array, oldest first.
+
+    .json: a list of [ts, open, high, low, close, volume] rows, or a saved
+           /api/ohlcv response ({"data": [...]}).
+    .csv:  the same six columns, with or without a header row.
+    """
+    path = Path(path)
+    if path.suffix.lower() == ".json":
+        data = json.loads(path.read_text(encoding="utf-8"))
+        if isinstance(data, dict):
+            data = data["data"]
+        arr = np.asarray(data, dtype=float)
+    else:
+        with path.open(encoding="utf-8") as f:
+            first = f.readline()
+        has_header = any(c.isalpha() for c in first)
+        arr = np.loadtxt(path, delimiter=",", skiprows=1 if has_header else 0, usecols=range(6), ndmin=2)
+    return arr[np.argsort(arr[:, 0], kind="stable")]
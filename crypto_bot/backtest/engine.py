@@ -0,0 +1,297 @@
+"""Event-driven backtester for AutoStrategy / UserStrategy.
+
+Indicators are computed once for the whole history (compute_indicator_series),
+so bar t sees exactly what compute_indicators would return for the candles up
+to t. The replay loop then hands bars to the strategy classes' own decision
+methods, and skips ahead over bars where the strategy cannot act (cooldown,
+flat with no buy score).
+
+Fills happen at the bar close with the exchange taker fee, using the same
+bookkeeping as AutoStrategy.execute_signal.
+"""
+import logging
+from dataclasses import dataclass, field, asdict
+from typing import Optional
+
+import numpy as np
+
+from ..exchanges.upbit import UpbitExchange
+from ..strategies.auto_strategy import AutoStrategy, AutoStrategyConfig, TradeRecord
+from ..strategies.user_strategy import UserStrategy, UserStrategyConfig
+from ..strategies.indicators import compute_indicator_series
+from .data import to_epoch_seconds
+
+logger = logging.getLogger(__name__)
+
+WARMUP = 59  # first bar with indicator values
+
+MIN_ORDER_KRW = 5000  # Upbit minimum order size
+
+# Score thresholds are checked on unrounded values to pick candidate bars; the
+# strategy then decides on the rounded IndicatorResult, so keep a small margin.
+_SCORE_MARGIN = 0.01
+
+
+@dataclass
+class BacktestReport:
+    strategy: str
+    symbol: str
+    seed_krw: float
+    final_equity: float
+    total_pnl: float          # final equity - seed (all fees included)
+    total_fee: float
+    return_pct: float
+    max_drawdown_pct: float
+    sharpe: float             # annualized, from per-bar equity returns
+    trade_count: int
+    win_count: int
+    lose_count: int
+    win_rate: float
+    trades: list[TradeRecord] = field(default_factory=list)
+    equity: Optional[np.ndarray] = None   # mark-to-market KRW per bar
+
+    def summary(self, with_trades: bool = True) -> dict:
+        out = {k: v for k, v in asdict(self).items() if k not in ("trades", "equity")}
+        if with_trades:
+            out["trades"] = [asdict(t) for t in self.trades]
+        return out
+
+
+class _Ledger:
+    """Cash / quantity changes per bar + trade log for one run."""
+
+    def __init__(self, n: int, symbol: str, taker_fee: float, seed_krw: float):
+        self.balance = seed_krw
+        self.cash = np.zeros(n)
+        self.qty = np.zeros(n)
+        self.symbol = symbol
+        self.taker_fee = taker_fee
+        self.trades: list[TradeRecord] = []
+
+    def buy(self, t: int, ts: float, price: float, krw: float, note: str) -> Optional[TradeRecord]:
+        """Market buy for `krw`, capped at the KRW balance; None below the minimum order."""
+        krw = min(krw, self.balance)
+        if krw < MIN_ORDER_KRW:
+            return None
+        self.balance -= krw
+        fee = krw * self.taker_fee
+        qty = (krw - fee) / price
+        self.cash[t] -= krw
+        self.qty[t] += qty
+        record = TradeRecord(
+            symbol=self.symbol, side="buy", price=price, qty=qty, krw_amount=krw,
+            fee=fee, timestamp=ts, order_id=f"bt_{t}", note=note,
+        )
+        self.trades.append(record)
+        return record
+
+    def sell(self, t: int, ts: float, price: float, qty: float, cost: float, note: str) -> TradeRecord:
+        proceeds = qty * price
+        fee = proceeds * self.taker_fee
+        pnl = proceeds - fee - cost
+        self.balance += proceeds - fee
+        self.cash[t] += proceeds - fee
+        self.qty[t] -= qty
+        record = TradeRecord(
+            symbol=self.symbol, side="sell", price=price, qty=qty, krw_amount=proceeds,
+            fee=fee, timestamp=ts, order_id=f"bt_{t}", pnl=pnl,
+            note=f"손익:{pnl:+,.0f}KRW | {note}",
+        )
+        self.trades.append(record)
+        return record
+
+
+class Backtester:
+    """Replays one symbol's candles through the strategy classes."""
+
+    def __init__(
+        self,
+        ohlcv,
+        symbol: str = "KRW-BTC",
+        seed_krw: float = 1_000_000,
+        taker_fee: float = UpbitExchange.taker_fee,
+    ):
+        arr = np.asarray(ohlcv, dtype=float)
+        self.symbol = symbol
+        self.seed_krw = seed_krw
+        self.taker_fee = taker_fee
+        self.times = to_epoch_seconds(arr[:, 0])
+        self.closes = arr[:, 4]
+        self.series = compute_indicator_series(arr)
+        if self.series is None:
+            raise ValueError("Not enough candles for a backtest (need at least 60)")
+        self._times = self.times.tolist()
+        self._closes = self.closes.tolist()
+
+    def __len__(self) -> int:
+        return len(self._closes)
+
+    def _next_bar(self, t: int, ready: float) -> int:
+        """First bar at or after t whose time is past the cooldown."""
+        if self._times[t] >= ready:
+            return t
+        return int(np.searchsorted(self.times, ready, side="left"))
+
+    # ── AutoStrategy ──────────────────────────────────────────────────────────
+    def run_auto(self, cfg: AutoStrategyConfig) -> BacktestReport:
+        strategy = AutoStrategy(None, cfg)   # exchange unused: decisions only
+        series = self.series
+        times, closes = self._times, self._closes
+        n = len(closes)
+        ledger = _Ledger(n, cfg.symbol, self.taker_fee, self.seed_krw)
+
+        buy_bars = np.flatnonzero(series.score >= cfg.min_score_buy - _SCORE_MARGIN)
+        sell_score = (series.score <= cfg.max_score_sell + _SCORE_MARGIN).tolist()
+
+        t = WARMUP
+        while t < n:
+            t = self._next_bar(t, strategy.last_trade_time + cfg.trade_cooldown)
+            if t >= n:
+                break
+            position = strategy.position
+
+            if position is None:
+                i = int(np.searchsorted(buy_bars, t))
+                if i == len(buy_bars):
+                    break
+                t = int(buy_bars[i])
+                ind = series.row(t)
+                rec = strategy._build_recommendation(closes[t], ind)
+                if rec["action"] == "buy":
+                    invest_krw = strategy.calc_invest_amount(self.seed_krw, ind)
+                    record = ledger.buy(
+                        t, times[t], closes[t], invest_krw,
+                        f"점수:{ind.score} | {' | '.join(rec['reasons'][:2])}",
+                    )
+                    if record is None:
+                        break   # out of money
+                    strategy.position = {"price": closes[t], "qty": record.qty, "high_price": closes[t]}
+                    strategy.last_trade_time = times[t]
+                t += 1
+                continue
+
+            # In position: only build a recommendation on bars that can sell
+            price = closes[t]
+            entry = position["price"]
+            high = position["high_price"]
+            pnl_pct = (price - entry) / entry
+            if (
+                sell_score[t]
+                or pnl_pct <= -cfg.stop_loss_pct
+                or pnl_pct >= cfg.take_profit_pct
+                or (high - price) / high >= cfg.trailing_stop_pct
+            ):
+                rec = strategy._build_recommendation(price, series.row(t))
+                if rec["action"] == "sell":
+                    qty = position["qty"]
+                    ledger.sell(t, times[t], price, qty, entry * qty, " | ".join(rec["reasons"][:2]))
+                    strategy.position = None
+                    strategy.last_trade_time = times[t]
+            elif price > high:
+                position["high_price"] = price
+            t += 1
+
+        return self._report("auto", cfg.symbol, ledger)
+
+    # ── UserStrategy ──────────────────────────────────────────────────────────
+    def run_user(self, cfg: UserStrategyConfig) -> BacktestReport:
+        strategy = UserStrategy(cfg)
+        series = self.series
+        times, closes = self._times, self._closes
+        n = len(closes)
+        ledger = _Ledger(n, self.symbol, self.taker_fee, self.seed_krw)
+
+        # evaluate_buy / evaluate_sell read a dict of rounded indicator values
+        digits = {"macd_hist": 6}
+        cols = {
+            name: np.round(getattr(series, name), digits.get(name, 2)).tolist()
+            for name in ("rsi", "macd_hist", "bb_lower", "bb_upper", "score", "volume_ratio")
+        }
+        rsi, hist, bb_lower, bb_upper, score, vol = (
+            cols["rsi"], cols["macd_hist"], cols["bb_lower"], cols["bb_upper"], cols["score"], cols["volume_ratio"]
+        )
+
+        t = WARMUP
+        while t < n:
+            t = self._next_bar(t, strategy.last_trade_time + cfg.trade_cooldown_sec)
+            if t >= n:
+                break
+            price = closes[t]
+            ind = {
+                "rsi": rsi[t], "macd_hist": hist[t], "bb_lower": bb_lower[t],
+                "bb_upper": bb_upper[t], "score": score[t], "volume_ratio": vol[t],
+            }
+            position = strategy.position
+
+            if position is None:
+                buy = strategy.evaluate_buy(ind, price)
+                if buy["should_buy"]:
+                    record = ledger.buy(
+                        t, times[t], price, self.seed_krw * cfg.base_invest_ratio,
+                        " | ".join(buy["signals"][:2]),
+                    )
+                    if record is None:
+                        break   # out of money
+                    strategy.position = {
+                        "price": price, "qty": record.qty,
+                        "cost": record.krw_amount - record.fee, "high_price": price,
+                    }
+                    strategy.total_invested_ratio = cfg.base_invest_ratio
+                    strategy.last_trade_time = times[t]
+                t += 1
+                continue
+
+            avg_price = position["cost"] / position["qty"]
+            sell = strategy.evaluate_sell(ind, price, avg_price)
+            if sell["should_sell"]:
+                ledger.sell(t, times[t], price, position["qty"], position["cost"], " | ".join(sell["signals"][:2]))
+                strategy.reset_position()
+                strategy.last_trade_time = times[t]
+            else:
+                dca_krw = strategy.calc_dca_amount(self.seed_krw, position["price"], price)
+                if dca_krw > 0:
+                    drop_pct = (position["price"] - price) / position["price"] * 100
+                    record = ledger.buy(t, times[t], price, dca_krw, f"DCA {drop_pct:.1f}% 하락")
+                    if record is None:
+                        t += 1
+                        continue
+                    position["qty"] += record.qty
+                    position["cost"] += record.krw_amount - record.fee
+                    strategy.total_invested_ratio += dca_krw / self.seed_krw
+                    strategy.last_trade_time = times[t]
+            t += 1
+
+        return self._report("user", self.symbol, ledger)
+
+    # ── Report ────────────────────────────────────────────────────────────────
+    def _report(self, name: str, symbol: str, ledger: _Ledger) -> BacktestReport:
+        cash = self.seed_krw + np.cumsum(ledger.cash)
+        qty = np.cumsum(ledger.qty)
+        equity = cash + qty * self.closes
+        peak = np.maximum.accumulate(equity)
+        max_dd = float(np.max((peak - equity) / peak)) if len(equity) else 0.0
+        returns = np.diff(equity) / equity[:-1]
+        bar_sec = float(np.median(np.diff(self.times))) if len(self.times) > 1 else 0.0
+        std = float(np.std(returns)) if len(returns) else 0.0
+        sharpe = float(np.mean(returns) / std * np.sqrt(365 * 86400 / bar_sec)) if std > 0 and bar_sec > 0 else 0.0
+
+        sells = [t for t in ledger.trades if t.side == "sell"]
+        wins = [t for t in sells if t.pnl > 0]
+        final_equity = float(equity[-1])
+        return BacktestReport(
+            strategy=name,
+            symbol=symbol,
+            seed_krw=self.seed_krw,
+            final_equity=final_equity,
+            total_pnl=final_equity - self.seed_krw,
+            total_fee=sum(t.fee for t in ledger.trades),
+            return_pct=(final_equity - self.seed_krw) / self.seed_krw * 100,
+            max_drawdown_pct=max_dd * 100,
+            sharpe=sharpe,
+            trade_count=len(ledger.trades),
+            win_count=len(wins),
+            lose_count=len(sells) - len(wins),
+            win_rate=len(wins) / len(sells) * 100 if sells else 0,
+            trades=ledger.trades,
+            equity=equity,
+        )
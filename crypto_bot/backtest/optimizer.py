@@ -0,0 +1,125 @@
+"""Parallel parameter sweep over strategy configs.
+
+Every candidate config is scored by replaying the same candles through the
+Backtester. The candles are placed in shared memory once; each worker process
+attaches to it and builds its Backtester (indicator series) a single time, so
+only the small candidate dicts travel between processes.
+"""
+import itertools
+import logging
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, replace
+from multiprocessing import shared_memory
+from typing import Optional, Union
+
+import numpy as np
+
+from ..exchanges.upbit import UpbitExchange
+from ..strategies.auto_strategy import AutoStrategyConfig
+from ..strategies.user_strategy import UserStrategyConfig
+from .engine import Backtester
+
+logger = logging.getLogger(__name__)
+
+RANK_KEYS = ("sharpe", "total_pnl", "max_drawdown_pct")
+
+# Worker-process globals, set once by _init_worker
+_worker_bt: Optional[Backtester] = None
+_worker_shm: Optional[shared_memory.SharedMemory] = None
+
+
+@dataclass
+class SweepResult:
+    params: dict           # overrides applied to the base config
+    sharpe: float
+    total_pnl: float
+    return_pct: float
+    max_drawdown_pct: float
+    win_rate: float
+    trade_count: int
+
+
+def grid_candidates(grid: dict) -> list[dict]:
+    """{"stop_loss_pct": [0.02, 0.03], ...} -> every combination."""
+    keys = list(grid)
+    return [dict(zip(keys, values)) for values in itertools.product(*(grid[k] for k in keys))]
+
+
+def random_candidates(space: dict, n: int, seed: Optional[int] = None) -> list[dict]:
+    """Random search. Each entry is a (low, high) float range or a list of choices."""
+    rng = random.Random(seed)
+    out = []
+    for _ in range(n):
+        params = {}
+        for key, spec in space.items():
+            if isinstance(spec, tuple) and len(spec) == 2:
+                params[key] = rng.uniform(*spec)
+            else:
+                params[key] = rng.choice(spec)
+        out.append(params)
+    return out
+
+
+def _init_worker(shm_name: str, shape: tuple, symbol: str, seed_krw: float, taker_fee: float):
+    global _worker_bt, _worker_shm
+    _worker_shm = shared_memory.SharedMemory(name=shm_name)
+    ohlcv = np.ndarray(shape, dtype=np.float64, buffer=_worker_shm.buf)
+    _worker_bt = Backtester(ohlcv, symbol=symbol, seed_krw=seed_krw, taker_fee=taker_fee)
+
+
+def _run_candidate(base_cfg: Union[AutoStrategyConfig, UserStrategyConfig], params: dict) -> SweepResult:
+    if isinstance(base_cfg, UserStrategyConfig):
+        report = _worker_bt.run_user(UserStrategyConfig.from_dict({**base_cfg.to_dict(), **params}))
+    else:
+        report = _worker_bt.run_auto(replace(base_cfg, **params))
+    return SweepResult(
+        params=params,
+        sharpe=report.sharpe,
+        total_pnl=report.total_pnl,
+        return_pct=report.return_pct,
+        max_drawdown_pct=report.max_drawdown_pct,
+        win_rate=report.win_rate,
+        trade_count=report.trade_count,
+    )
+
+
+def sweep(
+    ohlcv,
+    base_cfg: Union[AutoStrategyConfig, UserStrategyConfig],
+    candidates: list[dict],
+    symbol: str = "KRW-BTC",
+    seed_krw: float = 1_000_000,
+    taker_fee: float = UpbitExchange.taker_fee,
+    rank_by: str = "sharpe",
+    workers: Optional[int] = None,
+) -> list[SweepResult]:
+    """Backtest every candidate (overrides on base_cfg) across all cores.
+
+    Results are sorted best first: highest sharpe / total_pnl, or lowest
+    max_drawdown_pct.
+    """
+    if rank_by not in RANK_KEYS:
+        raise ValueError(f"rank_by must be one of {RANK_KEYS}")
+    if not candidates:
+        return []
+
+    arr = np.ascontiguousarray(ohlcv, dtype=np.float64)
+    workers = min(workers or os.cpu_count() or 1, len(candidates))
+    shm = shared_memory.SharedMemory(create=True, size=arr.nbytes)
+    try:
+        np.ndarray(arr.shape, dtype=np.float64, buffer=shm.buf)[:] = arr
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(shm.name, arr.shape, symbol, seed_krw, taker_fee),
+        ) as pool:
+            chunksize = max(1, len(candidates) // (workers * 4))
+            results = list(pool.map(_run_candidate, itertools.repeat(base_cfg), candidates, chunksize=chunksize))
+    finally:
+        shm.close()
+        shm.unlink()
+
+    logger.info(f"Sweep done: {len(results)} candidates on {workers} workers")
+    return sorted(results, key=lambda r: getattr(r, rank_by), reverse=rank_by != "max_drawdown_pct")
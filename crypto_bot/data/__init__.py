@@ -1,3 +1,9 @@
-from .database import init_db, save_trade, get_trades, save_signal, save_arbitrage, save_config, load_config, get_pnl_summary
+from .database import init_db, save_trade, get_trades, save_signal, load_indicators, save_arbitrage, queue_trade, queue_signal, queue_arbitrage, write_behind, save_premiums, load_premiums, save_funding, load_funding, save_config, load_config, get_pnl_summary, get_pnl_daily, prune_signals, rebuild_rollups, schema_version
+from .migrations import migrate, MIGRATIONS, LATEST_VERSION
+from .export import export_table, import_table, iter_chunks
+from .candle_store import CandleStore
+from .candle_archive import CandleArchive, CandleView
 
-__all__ = ["init_db", "save_trade", "get_trades", "save_signal", "save_arbitrage", "save_config", "load_config", "get_pnl_summary"]
+__all__ = ["init_db", "save_trade", "get_trades", "save_signal", "load_indicators", "save_arbitrage", "queue_trade", "queue_signal", "queue_arbitrage", "write_behind", "save_premiums", "load_premiums", "save_funding", "load_funding", "save_config", "load_config", "get_pnl_summary", "get_pnl_daily", "prune_signals", "rebuild_rollups", "schema_version",
+           "migrate", "MIGRATIONS", "LATEST_VERSION", "export_table", "import_table", "iter_chunks",
+           "CandleStore", "CandleArchive", "CandleView"]
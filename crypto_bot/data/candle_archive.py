@@ -0,0 +1,204 @@
+"""Append-only, memory-mapped columnar candle archive.
+
+Layout per (exchange, symbol, interval):
+
+    <root>/<exchange>/<symbol>/<interval>/
+        ts.i8  open.f8  high.f8  low.f8  close.f8  volume.f8   fixed-width columns
+        index.i8                                               ts of every BLOCK-th row
+
+Rows are sorted by ts. Appends write the value columns first and ts last,
+so the length of ts.i8 is the committed row count; a torn append is cut back
+on the next write. Reads return zero-copy np.memmap views: a time-range
+lookup is a search in the small block index plus one block of ts.
+
+Only the long backtest histories read from here; dashboard charts and live
+indicators keep using the CandleStore window they were synced from.
+"""
+import logging
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_DIR = Path(__file__).parent.parent.parent / "crypto_bot_candles"
+
+VALUE_COLUMNS = ("open", "high", "low", "close", "volume")
+BLOCK = 4096  # rows per index entry
+
+
+@dataclass
+class CandleView:
+    """Column views over a contiguous range of archived candles."""
+    ts: np.ndarray
+    open: np.ndarray
+    high: np.ndarray
+    low: np.ndarray
+    close: np.ndarray
+    volume: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.ts)
+
+    def to_array(self) -> np.ndarray:
+        """(candles, 6) array in get_ohlcv column order (copies)."""
+        out = np.empty((len(self), 6))
+        out[:, 0] = self.ts
+        for i, name in enumerate(VALUE_COLUMNS, start=1):
+            out[:, i] = getattr(self, name)
+        return out
+
+
+class CandleArchive:
+    def __init__(self, root: Path = ARCHIVE_DIR):
+        self.root = Path(root)
+        self._maps: dict = {}   # path -> (committed rows, {column: memmap})
+
+    def _dir(self, exchange: str, symbol: str, interval: str) -> Path:
+        return self.root / exchange / symbol.replace("/", "_") / interval
+
+    @staticmethod
+    def _rows(path: Path, column: str) -> int:
+        f = path / (f"{column}.i8" if column in ("ts", "index") else f"{column}.f8")
+        return f.stat().st_size // 8 if f.exists() else 0
+
+    def count(self, exchange: str, symbol: str, interval: str) -> int:
+        return self._rows(self._dir(exchange, symbol, interval), "ts")
+
+    def last_ts(self, exchange: str, symbol: str, interval: str) -> Optional[int]:
+        path = self._dir(exchange, symbol, interval)
+        n = self._rows(path, "ts")
+        if not n:
+            return None
+        with open(path / "ts.i8", "rb") as f:
+            f.seek((n - 1) * 8)
+            return int(np.frombuffer(f.read(8), dtype=np.int64)[0])
+
+    # ── Write ─────────────────────────────────────────────────────────────────
+    def append(self, exchange: str, symbol: str, interval: str, candles) -> int:
+        """Append oldest-first [ts, o, h, l, c, v] rows; returns rows added.
+
+        A row with the same ts as the last archived one overwrites it (the
+        still-forming candle); rows older than that are ignored.
+        """
+        arr = np.asarray(candles, dtype=float).reshape(-1, 6)
+        path = self._dir(exchange, symbol, interval)
+        path.mkdir(parents=True, exist_ok=True)
+        n = self._truncate_torn(path)
+        last = self.last_ts(exchange, symbol, interval)
+
+        ts = arr[:, 0].astype(np.int64)
+        if last is not None:
+            if np.any(ts == last):
+                self._overwrite_last(path, n, arr[ts == last][-1])
+            keep = ts > last
+            arr, ts = arr[keep], ts[keep]
+        if not len(ts):
+            return 0
+        order = np.argsort(ts, kind="stable")
+        arr, ts = arr[order], ts[order]
+        dedup = np.r_[ts[1:] != ts[:-1], True]   # keep the latest row per ts
+        arr, ts = arr[dedup], ts[dedup]
+
+        for i, name in enumerate(VALUE_COLUMNS, start=1):
+            with open(path / f"{name}.f8", "ab") as f:
+                f.write(np.ascontiguousarray(arr[:, i]).tobytes())
+        with open(path / "ts.i8", "ab") as f:
+            f.write(ts.tobytes())   # commit point
+        self._extend_index(path, n, ts)
+        return len(ts)
+
+    def _truncate_torn(self, path: Path) -> int:
+        """Cut columns back to the committed length and repair the index."""
+        n = self._rows(path, "ts")
+        for name in VALUE_COLUMNS:
+            f = path / f"{name}.f8"
+            if f.exists() and f.stat().st_size != n * 8:
+                with open(f, "r+b") as fh:
+                    fh.truncate(n * 8)
+        if self._rows(path, "index") != -(-n // BLOCK):
+            ts = np.fromfile(path / "ts.i8", dtype=np.int64) if n else np.empty(0, dtype=np.int64)
+            with open(path / "index.i8", "wb") as f:
+                f.write(ts[::BLOCK].tobytes())
+        return n
+
+    def _overwrite_last(self, path: Path, n: int, row: np.ndarray):
+        for i, name in enumerate(VALUE_COLUMNS, start=1):
+            with open(path / f"{name}.f8", "r+b") as f:
+                f.seek((n - 1) * 8)
+                f.write(np.float64(row[i]).tobytes())
+
+    def _extend_index(self, path: Path, n_before: int, new_ts: np.ndarray):
+        first_block = -(-n_before // BLOCK)   # first block start not yet indexed
+        starts = np.arange(first_block * BLOCK, n_before + len(new_ts), BLOCK)
+        if len(starts):
+            with open(path / "index.i8", "ab") as f:
+                f.write(new_ts[starts - n_before].tobytes())
+
+    def rebuild(self, exchange: str, symbol: str, interval: str, candles) -> int:
+        """Replace the archive for this key with `candles`."""
+        path = self._dir(exchange, symbol, interval)
+        self._maps.pop(path, None)
+        for f in path.glob("*.[fi]8"):
+            f.unlink()
+        return self.append(exchange, symbol, interval, candles)
+
+    # ── Read ──────────────────────────────────────────────────────────────────
+    def _columns(self, path: Path) -> tuple:
+        n = self._rows(path, "ts")
+        cached = self._maps.get(path)
+        if cached and cached[0] == n:
+            return cached
+        cols = {}
+        if n:
+            cols["ts"] = np.memmap(path / "ts.i8", dtype=np.int64, mode="r", shape=(n,))
+            for name in VALUE_COLUMNS:
+                cols[name] = np.memmap(path / f"{name}.f8", dtype=np.float64, mode="r", shape=(n,))
+            if self._rows(path, "index") == -(-n // BLOCK):
+                cols["index"] = np.fromfile(path / "index.i8", dtype=np.int64)
+            else:   # append interrupted before the index was written
+                cols["index"] = np.array(cols["ts"][::BLOCK])
+        self._maps[path] = (n, cols)
+        return self._maps[path]
+
+    def _locate(self, ts: np.ndarray, index: np.ndarray, value: int, side: str) -> int:
+        block = max(int(np.searchsorted(index, value, side=side)) - 1, 0)
+        lo = block * BLOCK
+        return lo + int(np.searchsorted(ts[lo:lo + BLOCK + 1], value, side=side))
+
+    def read(self, exchange: str, symbol: str, interval: str, start: Optional[int] = None,
+             end: Optional[int] = None, limit: Optional[int] = None) -> CandleView:
+        """Zero-copy views of candles with start <= ts <= end; `limit` keeps the newest N."""
+        n, cols = self._columns(self._dir(exchange, symbol, interval))
+        if not n:
+            empty = np.empty(0)
+            return CandleView(np.empty(0, dtype=np.int64), empty, empty, empty, empty, empty)
+        ts, index = cols["ts"], cols["index"]
+        lo = 0 if start is None else self._locate(ts, index, start, "left")
+        hi = n if end is None else self._locate(ts, index, end, "right")
+        if limit:
+            lo = max(lo, hi - limit)
+        return CandleView(**{name: cols[name][lo:hi] for name in ("ts",) + VALUE_COLUMNS})
+
+    # ── Store mirror ──────────────────────────────────────────────────────────
+    def sync_from_store(self, store, exchange: str, symbol: str, interval: str) -> int:
+        """Bring the archive up to date with a CandleStore.
+
+        New bars are appended; if the store has back-filled history older than
+        the archive start, the archive is rebuilt from the store.
+        """
+        oldest, newest, count = store.bounds(exchange, symbol, interval)
+        if not count:
+            return 0
+        first = self.read(exchange, symbol, interval, limit=None)
+        if not len(first) or oldest < int(first.ts[0]):
+            added = self.rebuild(exchange, symbol, interval, store.read(exchange, symbol, interval))
+            logger.info(f"Rebuilt candle archive {exchange}/{symbol}/{interval}: {added} rows")
+            return added
+        last = self.last_ts(exchange, symbol, interval)
+        return self.append(exchange, symbol, interval, store.read(exchange, symbol, interval, start=last))
+
+
+candle_archive = CandleArchive()
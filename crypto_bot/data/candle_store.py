@@ -0,0 +1,145 @@
+"""Local OHLCV cache with incremental gap-fill sync.
+
+Candles are kept in the `candles` table keyed by (exchange, symbol, interval,
+ts). A sync only asks the exchange for the bars since the last stored one
+(the newest stored bar is re-fetched, since it may still be forming), and
+pages backwards with get_ohlcv(before=...) when more history is requested
+than is stored. The async sync/get_ohlcv paths run their reads and writes on
+the database thread.
+"""
+import asyncio
+import logging
+import time
+from typing import Optional
+
+import numpy as np
+
+from ..exchanges.base import BaseExchange
+from . import database as db
+
+logger = logging.getLogger(__name__)
+
+INTERVAL_SEC = {
+    "1m": 60, "3m": 180, "5m": 300, "15m": 900, "30m": 1800,
+    "1h": 3600, "4h": 14400, "1d": 86400, "1w": 604800,
+}
+
+# Pause between history pages (Upbit allows ~10 candle requests/s)
+PAGE_DELAY = 0.12
+
+
+def to_epoch_seconds(ts) -> np.ndarray:
+    """Normalize candle timestamps to unix seconds.
+
+    Upbit candles use YYYYMMDDHHMMSS integers (see UpbitExchange.get_ohlcv),
+    Bybit uses epoch milliseconds; plain epoch seconds pass through.
+    """
+    ts = np.asarray(ts, dtype=np.int64)
+    if ts.size == 0:
+        return ts.astype(float)
+    if ts.flat[0] >= 10**13:  # YYYYMMDDHHMMSS
+        date, clock = np.divmod(ts, 10**6)
+        year, rest = np.divmod(date, 10**4)
+        month, day = np.divmod(rest, 100)
+        months = ((year - 1970) * 12 + month - 1).astype("datetime64[M]")
+        days = months.astype("datetime64[D]") + (day - 1)
+        hh, rest = np.divmod(clock, 10**4)
+        mm, ss = np.divmod(rest, 100)
+        return days.astype(np.int64) * 86400.0 + hh * 3600 + mm * 60 + ss
+    if ts.flat[0] >= 10**11:  # milliseconds
+        return ts / 1000.0
+    return ts.astype(float)
+
+
+def venue_name(ex: BaseExchange) -> str:
+    """Cache key for an exchange connector ('upbit', 'bybit_spot', 'bybit_linear')."""
+    category = getattr(ex, "category", None)
+    return f"{ex.name}_{category}" if category else ex.name
+
+
+class CandleStore:
+    # ── Local reads / writes ─────────────────────────────────────────────────
+    def read(self, exchange: str, symbol: str, interval: str, limit: Optional[int] = None,
+             start: Optional[int] = None, end: Optional[int] = None) -> list:
+        """Stored candles oldest-first; `limit` keeps the newest N, start/end bound ts (inclusive)."""
+        sql = "SELECT ts, open, high, low, close, volume FROM candles WHERE exchange=? AND symbol=? AND interval=?"
+        args: list = [exchange, symbol, interval]
+        if start is not None:
+            sql += " AND ts >= ?"
+            args.append(start)
+        if end is not None:
+            sql += " AND ts <= ?"
+            args.append(end)
+        sql += " ORDER BY ts DESC"
+        if limit:
+            sql += " LIMIT ?"
+            args.append(limit)
+        with db.get_conn() as conn:
+            rows = conn.execute(sql, args).fetchall()
+        return [list(r) for r in reversed(rows)]
+
+    def write(self, exchange: str, symbol: str, interval: str, candles: list):
+        with db.get_conn() as conn:
+            conn.executemany(
+                """INSERT OR REPLACE INTO candles (exchange,symbol,interval,ts,open,high,low,close,volume)
+                   VALUES (?,?,?,?,?,?,?,?,?)""",
+                [(exchange, symbol, interval, int(c[0]), *c[1:6]) for c in candles],
+            )
+
+    def bounds(self, exchange: str, symbol: str, interval: str) -> tuple:
+        """(oldest ts, newest ts, count) of stored candles; ts are None when empty."""
+        with db.get_conn() as conn:
+            row = conn.execute(
+                "SELECT MIN(ts), MAX(ts), COUNT(*) FROM candles WHERE exchange=? AND symbol=? AND interval=?",
+                (exchange, symbol, interval),
+            ).fetchone()
+        return row[0], row[1], row[2]
+
+    # ── Exchange sync ─────────────────────────────────────────────────────────
+    async def get_ohlcv(self, ex: BaseExchange, symbol: str, interval: str = "15m", limit: int = 200) -> list:
+        """Drop-in for ex.get_ohlcv: sync the missing bars, then serve from the store."""
+        await self.sync(ex, symbol, interval, limit)
+        return await db.run(self.read, venue_name(ex), symbol, interval, limit)
+
+    async def sync(self, ex: BaseExchange, symbol: str, interval: str, limit: int = 200):
+        venue = venue_name(ex)
+        oldest, newest, count = await db.run(self.bounds, venue, symbol, interval)
+        page = ex.ohlcv_page_limit
+
+        if newest is not None:
+            # Bars since the newest stored one (+1 to refresh it)
+            elapsed = time.time() - float(to_epoch_seconds([newest])[0])
+            missing = max(int(elapsed // INTERVAL_SEC.get(interval, 60)), 0) + 2
+            before = None
+            while True:
+                candles = await ex.get_ohlcv(symbol, interval, min(missing, page), before=before)
+                if not candles:
+                    break
+                await db.run(self.write, venue, symbol, interval, candles)
+                if candles[0][0] <= newest:
+                    break
+                # Gap longer than one page: keep walking back until it closes
+                before = candles[0][0]
+                missing = page
+                await asyncio.sleep(PAGE_DELAY)
+            oldest, newest, count = await db.run(self.bounds, venue, symbol, interval)
+
+        await self._backfill(ex, venue, symbol, interval, oldest, limit - count)
+
+    async def _backfill(self, ex: BaseExchange, venue: str, symbol: str, interval: str,
+                        oldest: Optional[int], needed: int):
+        """Page backwards from `oldest` (or from now) until `needed` more candles are stored."""
+        page = ex.ohlcv_page_limit
+        while needed > 0:
+            candles = await ex.get_ohlcv(symbol, interval, min(needed, page), before=oldest)
+            if not candles or (oldest is not None and candles[0][0] >= oldest):
+                break   # no older history on the exchange
+            await db.run(self.write, venue, symbol, interval, candles)
+            needed -= len(candles)
+            oldest = candles[0][0]
+            logger.debug(f"Backfilled {len(candles)} {venue} {symbol} {interval} candles")
+            if needed > 0:
+                await asyncio.sleep(PAGE_DELAY)
+
+
+candle_store = CandleStore()
@@ -1,72 +1,189 @@
-"""SQLite database for persisting trades, signals, config."""
+"""SQLite database for persisting trades, signals, config.
+
+Connections are persistent, one per thread, in WAL mode with
+synchronous=NORMAL: commits append to the WAL without an fsync, readers never
+block the writer, and each connection's statement cache keeps the prepared
+INSERT/SELECTs alive across calls. The functions below are synchronous; from
+async code run them on the dedicated DB thread with `await run(fn, ...)`
+(or `submit(fn, ...)` to fire and forget), so fsyncs and lock waits never
+stall the event loop. High-rate rows (signals, arbitrage observations,
+trades) go through queue_* into the write-behind buffer and are committed
+in batches.
+"""
+import asyncio
+import atexit
 import sqlite3
 import json
+import threading
 import time
 import logging
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import partial
 from pathlib import Path
 
+import numpy as np
+
+from .migrations import INDICATOR_COLUMNS, migrate, schema_version as _schema_version, rebuild_rollups as _rebuild_rollups
+
 logger = logging.getLogger(__name__)
 
 DB_PATH = Path(__file__).parent.parent.parent / "crypto_bot_data.db"
 
+BUSY_TIMEOUT_MS = 5000
+STATEMENT_CACHE = 256      # 연결별 prepared statement 캐시 크기
 
-def get_conn() -> sqlite3.Connection:
-    conn = sqlite3.connect(str(DB_PATH))
+
+# ── Connections ───────────────────────────────────────────────────────────────
+_local = threading.local()
+_conns: list[sqlite3.Connection] = []
+_conns_lock = threading.Lock()
+_executor: ThreadPoolExecutor | None = None
+_executor_lock = threading.Lock()
+_generation = 0            # close() 시 증가 → 다른 스레드의 닫힌 연결도 다시 연다
+
+
+def _connect() -> sqlite3.Connection:
+    conn = sqlite3.connect(
+        str(DB_PATH), timeout=BUSY_TIMEOUT_MS / 1000,
+        cached_statements=STATEMENT_CACHE, check_same_thread=False,
+    )
     conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute(f"PRAGMA busy_timeout={BUSY_TIMEOUT_MS}")
+    with _conns_lock:
+        _conns.append(conn)
+    return conn
+
+
+def get_conn() -> sqlite3.Connection:
+    """This thread's persistent connection.
+
+    `with get_conn() as conn:` wraps a transaction (commit / rollback on exit);
+    it does not close the connection.
+    """
+    conn = getattr(_local, "conn", None)
+    if conn is None or _local.key != (DB_PATH, _generation):
+        conn = _local.conn = _connect()
+        _local.key = (DB_PATH, _generation)
     return conn
 
 
-def init_db():
+def _db_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="db")
+        return _executor
+
+
+def submit(fn, *args, **kwargs) -> Future:
+    """Queue fn on the DB thread without waiting (thread-safe; errors are logged)."""
+    future = _db_executor().submit(fn, *args, **kwargs)
+    future.add_done_callback(_log_failure)
+    return future
+
+
+def _log_failure(future: Future):
+    if not future.cancelled() and future.exception() is not None:
+        logger.error(f"DB 작업 실패: {future.exception()}")
+
+
+async def run(fn, *args, **kwargs):
+    """Run fn on the DB thread and await its result."""
+    return await asyncio.get_running_loop().run_in_executor(_db_executor(), partial(fn, *args, **kwargs))
+
+
+def close():
+    """Flush the write-behind buffer, drain queued DB work, then close every pooled connection."""
+    global _executor, _generation
+    write_behind.close()
+    with _executor_lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=True)
+    with _conns_lock:
+        conns = list(_conns)
+        _conns.clear()
+        _generation += 1
+    for conn in conns:
+        try:
+            conn.close()
+        except sqlite3.Error as e:
+            logger.warning(f"DB 연결 종료 실패: {e}")
+
+
+def init_db() -> list[int]:
+    """Bring the schema up to date (see migrations.py); returns the versions applied."""
+    conn = get_conn()
+    applied = migrate(conn, DB_PATH)
+    logger.info(f"Database initialized at {DB_PATH} (schema v{_schema_version(conn)})")
+    return applied
+
+
+def schema_version() -> int:
+    return _schema_version(get_conn())
+
+
+def rebuild_rollups():
+    """Recompute pnl_daily / arb_daily from the raw tables (after manual edits or deletes)."""
+    write_behind.drain(("trades", "arbitrage"))
     with get_conn() as conn:
-        conn.executescript("""
-        CREATE TABLE IF NOT EXISTS trades (
-            id          INTEGER PRIMARY KEY AUTOINCREMENT,
-            exchange    TEXT NOT NULL,
-            symbol      TEXT NOT NULL,
-            side        TEXT NOT NULL,
-            price       REAL NOT NULL,
-            qty         REAL NOT NULL,
-            amount_krw  REAL NOT NULL,
-            fee         REAL NOT NULL,
-            pnl         REAL DEFAULT 0,
-            order_id    TEXT,
-            strategy    TEXT DEFAULT 'auto',
-            note        TEXT,
-            dry_run     INTEGER DEFAULT 1,
-            timestamp   REAL NOT NULL
-        );
-
-        CREATE TABLE IF NOT EXISTS signals (
-            id          INTEGER PRIMARY KEY AUTOINCREMENT,
-            exchange    TEXT,
-            symbol      TEXT,
-            signal      TEXT,
-            score       REAL,
-            price       REAL,
-            indicators  TEXT,
-            timestamp   REAL NOT NULL
-        );
-
-        CREATE TABLE IF NOT EXISTS arbitrage (
-            id              INTEGER PRIMARY KEY AUTOINCREMENT,
-            kimchi_pct      REAL,
-            net_profit_pct  REAL,
-            direction       TEXT,
-            upbit_price     REAL,
-            bybit_price_krw REAL,
-            usd_krw         REAL,
-            amount_krw      REAL,
-            profit_krw      REAL,
-            status          TEXT,
-            timestamp       REAL NOT NULL
-        );
-
-        CREATE TABLE IF NOT EXISTS config (
-            key     TEXT PRIMARY KEY,
-            value   TEXT NOT NULL
-        );
-        """)
-    logger.info(f"Database initialized at {DB_PATH}")
+        _rebuild_rollups(conn)
+
+
+# ── Retention ─────────────────────────────────────────────────────────────────
+SIGNAL_RETENTION_DAYS = 30
+PRUNE_CHUNK = 5000          # 한 트랜잭션에서 지우는 행 수 (쓰기 잠금을 짧게)
+RETENTION_INTERVAL = 3600
+
+
+def prune_signals(max_age_days: float = SIGNAL_RETENTION_DAYS) -> int:
+    """Delete signals older than max_age_days in short chunked transactions; returns rows deleted."""
+    cutoff = time.time() - max_age_days * 86400
+    total = 0
+    while True:
+        with get_conn() as conn:
+            n = conn.execute(
+                "DELETE FROM signals WHERE id IN (SELECT id FROM signals WHERE timestamp < ? LIMIT ?)",
+                (cutoff, PRUNE_CHUNK),
+            ).rowcount
+        total += n
+        if n < PRUNE_CHUNK:
+            return total
+
+
+async def retention_loop(interval: float = RETENTION_INTERVAL, max_age_days: float = SIGNAL_RETENTION_DAYS):
+    """Prune old signals on the DB thread every `interval` seconds (run as a background task)."""
+    while True:
+        try:
+            n = await run(prune_signals, max_age_days)
+            if n:
+                logger.info(f"오래된 시그널 {n}건 삭제 ({max_age_days}일 초과)")
+        except Exception as e:
+            logger.warning(f"시그널 정리 실패: {e}")
+        await asyncio.sleep(interval)
+
+
+INSERT_SQL = {
+    "trades": """INSERT INTO trades (exchange,symbol,side,price,qty,amount_krw,fee,pnl,
+               order_id,strategy,note,dry_run,timestamp)
+               VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?)""",
+    "signals": f"""INSERT INTO signals (exchange,symbol,signal,score,price,indicators,timestamp,
+               {",".join(INDICATOR_COLUMNS)})
+               VALUES ({",".join("?" * (7 + len(INDICATOR_COLUMNS)))})""",
+    "arbitrage": """INSERT INTO arbitrage (kimchi_pct,net_profit_pct,direction,upbit_price,
+               bybit_price_krw,usd_krw,amount_krw,profit_krw,status,timestamp)
+               VALUES (?,?,?,?,?,?,?,?,?,?)""",
+}
+
+
+def _indicator_values(indicators: dict) -> tuple:
+    """(JSON of the keys outside INDICATOR_COLUMNS or None, *typed column values)."""
+    extra = {k: v for k, v in indicators.items() if k not in INDICATOR_COLUMNS}
+    values = tuple(None if indicators.get(c) is None else float(indicators[c]) for c in INDICATOR_COLUMNS)
+    return (json.dumps(extra) if extra else None, *values)
 
 
 def save_trade(exchange: str, symbol: str, side: str, price: float, qty: float,
@@ -74,15 +191,14 @@ def save_trade(exchange: str, symbol: str, side: str, price: float, qty: float,
                strategy: str = "auto", note: str = "", dry_run: bool = True):
     with get_conn() as conn:
         conn.execute(
-            """INSERT INTO trades (exchange,symbol,side,price,qty,amount_krw,fee,pnl,
-               order_id,strategy,note,dry_run,timestamp)
-               VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?)""",
+            INSERT_SQL["trades"],
             (exchange, symbol, side, price, qty, amount_krw, fee, pnl,
              order_id, strategy, note, int(dry_run), time.time()),
         )
 
 
 def get_trades(limit: int = 100, strategy: str = None) -> list[dict]:
+    write_behind.drain(("trades",))   # 버퍼에 남은 거래도 조회에 포함
     with get_conn() as conn:
         if strategy:
             rows = conn.execute(
@@ -98,26 +214,295 @@ def get_trades(limit: int = 100, strategy: str = None) -> list[dict]:
 
 def save_signal(exchange: str, symbol: str, signal: str, score: float,
                 price: float, indicators: dict):
+    json_extra, *values = _indicator_values(indicators)
     with get_conn() as conn:
         conn.execute(
-            "INSERT INTO signals (exchange,symbol,signal,score,price,indicators,timestamp) VALUES (?,?,?,?,?,?,?)",
-            (exchange, symbol, signal, score, price, json.dumps(indicators), time.time()),
+            INSERT_SQL["signals"],
+            (exchange, symbol, signal, score, price, json_extra, time.time(), *values),
         )
 
 
+def load_indicators(symbol: str, columns=None, since: float = 0, until: float = None,
+                    exchange: str = None) -> dict[str, np.ndarray]:
+    """Typed indicator columns for one symbol as float arrays (NULL -> nan), oldest first.
+
+    Always includes "timestamp", "price" and "score"; reads go through the
+    (symbol, timestamp) index and never touch the JSON column.
+    """
+    columns = list(INDICATOR_COLUMNS if columns is None else columns)
+    unknown = set(columns) - set(INDICATOR_COLUMNS) - {"price", "score"}
+    if unknown:
+        raise ValueError(f"Unknown indicator columns: {sorted(unknown)}")
+    names = ["timestamp", "price", "score"] + [c for c in columns if c not in ("price", "score")]
+    sql = f"SELECT {', '.join(names)} FROM signals WHERE symbol=? AND timestamp >= ?"
+    args: list = [symbol, since]
+    if until is not None:
+        sql += " AND timestamp < ?"
+        args.append(until)
+    if exchange is not None:
+        sql += " AND exchange=?"
+        args.append(exchange)
+    write_behind.drain(("signals",))
+    cur = get_conn().cursor()
+    cur.row_factory = None      # 튜플 그대로 → 배열
+    rows = cur.execute(sql + " ORDER BY timestamp", args).fetchall()
+    arr = np.array(rows, dtype=float).reshape(-1, len(names))
+    return {name: arr[:, i] for i, name in enumerate(names)}
+
+
 def save_arbitrage(kimchi_pct: float, net_profit_pct: float, direction: str,
                    upbit_price: float, bybit_price_krw: float, usd_krw: float,
                    amount_krw: float, profit_krw: float, status: str):
     with get_conn() as conn:
         conn.execute(
-            """INSERT INTO arbitrage (kimchi_pct,net_profit_pct,direction,upbit_price,
-               bybit_price_krw,usd_krw,amount_krw,profit_krw,status,timestamp)
-               VALUES (?,?,?,?,?,?,?,?,?,?)""",
+            INSERT_SQL["arbitrage"],
             (kimchi_pct, net_profit_pct, direction, upbit_price, bybit_price_krw,
              usd_krw, amount_krw, profit_krw, status, time.time()),
         )
 
 
+# ── Write-behind buffer ───────────────────────────────────────────────────────
+FLUSH_ROWS = 500            # 이만큼 쌓이면 즉시 flush
+FLUSH_INTERVAL_MS = 1000    # 최대 대기 시간
+MAX_PENDING = 50_000        # 백프레셔 한도 (버퍼 + 기록 대기 중인 배치)
+DROPPABLE = ("signals",)    # 한도 초과 시 버려도 되는 관측 데이터 (거래/차익 기록은 버리지 않음)
+DEAD_LETTER_MAX = 1000      # 기록 불가 행 보관 개수 (초과분은 로그에만 남음)
+
+
+class WriteBehind:
+    """Buffers trades / signals / arbitrage rows and writes them with executemany.
+
+    Rows are stamped when queued. A flush happens every `flush_rows` rows or
+    `flush_interval_ms`, whichever comes first, as one transaction on the DB
+    thread. When pending rows (buffered + queued batches) reach `max_pending`,
+    droppable tables shed new rows and the rest force an immediate flush;
+    stats() reports the backlog. If a batch fails it is retried row by row;
+    rows that still fail are logged and moved to `dead_letter` (the newest
+    `dead_letter_max` are kept) so one bad row never blocks the rest.
+    close() (and interpreter exit) flushes what is left.
+    """
+
+    def __init__(self, flush_rows: int = FLUSH_ROWS, flush_interval_ms: float = FLUSH_INTERVAL_MS,
+                 max_pending: int = MAX_PENDING, droppable: tuple = DROPPABLE,
+                 dead_letter_max: int = DEAD_LETTER_MAX):
+        self.flush_rows = flush_rows
+        self.flush_interval = flush_interval_ms / 1000
+        self.max_pending = max_pending
+        self.droppable = set(droppable)
+        self._rows: dict[str, list[tuple]] = {table: [] for table in INSERT_SQL}
+        self.dead_letter: deque[tuple[str, tuple, str]] = deque(maxlen=dead_letter_max)
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._buffered = 0
+        self._in_flight = 0
+        self.queued = 0
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+        self.dead_lettered = 0
+        self.flushes = 0
+        self.high_water = 0
+        self.last_flush_ms = 0.0
+        self.max_flush_ms = 0.0
+
+    def _ensure_thread(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._loop, name="db-write-behind", daemon=True)
+            self._thread.start()
+
+    def put(self, table: str, row: tuple) -> bool:
+        """Queue one row; False if it was dropped by backpressure."""
+        with self._lock:
+            pending = self._buffered + self._in_flight
+            if pending >= self.max_pending and table in self.droppable:
+                self.dropped += 1
+                return False
+            self._rows[table].append(row)
+            self._buffered += 1
+            self.queued += 1
+            self.high_water = max(self.high_water, pending + 1)
+            full = self._buffered >= self.flush_rows or pending + 1 >= self.max_pending
+            self._ensure_thread()
+        if full:
+            self._wake.set()
+        return True
+
+    def _take(self, tables=None) -> dict[str, list[tuple]]:
+        with self._lock:
+            batch = {t: rows for t, rows in self._rows.items() if rows and (tables is None or t in tables)}
+            for t in batch:
+                self._rows[t] = []
+            n = sum(len(rows) for rows in batch.values())
+            self._buffered -= n
+            self._in_flight += n
+        return batch
+
+    def _write(self, batch: dict[str, list[tuple]]):
+        n = sum(len(rows) for rows in batch.values())
+        start = time.perf_counter()
+        try:
+            with get_conn() as conn:
+                for table, rows in batch.items():
+                    conn.executemany(INSERT_SQL[table], rows)
+        except Exception as e:
+            logger.error(f"DB 일괄 기록 실패 ({n}건, 행 단위 재시도): {e}")
+            written = self._write_rows(batch)
+            with self._lock:
+                self._in_flight -= n
+                self.failed += 1
+                self.written += written
+            return
+        elapsed = (time.perf_counter() - start) * 1000
+        with self._lock:
+            self._in_flight -= n
+            self.written += n
+            self.flushes += 1
+            self.last_flush_ms = elapsed
+            self.max_flush_ms = max(self.max_flush_ms, elapsed)
+
+    def _write_rows(self, batch: dict[str, list[tuple]]) -> int:
+        """Insert a failed batch one row per transaction; dead-letter the rows that still fail."""
+        written = 0
+        for table, rows in batch.items():
+            for row in rows:
+                try:
+                    with get_conn() as conn:
+                        conn.execute(INSERT_SQL[table], row)
+                    written += 1
+                except Exception as e:
+                    with self._lock:
+                        self.dead_letter.append((table, row, str(e)))
+                        self.dead_lettered += 1
+                    logger.error(f"DB 기록 불가 행 격리 ({table}): {e} — {row!r}")
+        return written
+
+    def flush(self) -> Future | None:
+        """Hand everything buffered to the DB thread as one transaction."""
+        batch = self._take()
+        if not batch:
+            return None
+        return submit(self._write, batch)
+
+    def drain(self, tables=None) -> int:
+        """Write buffered rows (optionally only some tables) on the calling thread, now."""
+        batch = self._take(tables)
+        if batch:
+            self._write(batch)
+        return sum(len(rows) for rows in batch.values())
+
+    def _loop(self):
+        while not self._stop.is_set():
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except RuntimeError:   # DB 스레드 종료 후 (close 가 직접 처리)
+                return
+
+    def close(self):
+        """Stop the flush timer and write everything still buffered (blocking)."""
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout=5)
+        self._thread = None
+        future = self.flush()
+        if future is not None:
+            future.result()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "buffered": self._buffered,
+                "in_flight": self._in_flight,
+                "pending_by_table": {t: len(rows) for t, rows in self._rows.items()},
+                "max_pending": self.max_pending,
+                "utilization_pct": round((self._buffered + self._in_flight) / self.max_pending * 100, 2),
+                "high_water": self.high_water,
+                "queued": self.queued,
+                "written": self.written,
+                "dropped": self.dropped,
+                "failed_flushes": self.failed,
+                "dead_letter": self.dead_lettered,
+                "dead_letter_kept": len(self.dead_letter),
+                "flushes": self.flushes,
+                "avg_batch": round(self.written / self.flushes, 1) if self.flushes else 0.0,
+                "last_flush_ms": round(self.last_flush_ms, 3),
+                "max_flush_ms": round(self.max_flush_ms, 3),
+            }
+
+
+write_behind = WriteBehind()
+atexit.register(write_behind.drain)
+
+
+def queue_trade(exchange: str, symbol: str, side: str, price: float, qty: float,
+                amount_krw: float, fee: float, pnl: float = 0, order_id: str = "",
+                strategy: str = "auto", note: str = "", dry_run: bool = True) -> bool:
+    """save_trade through the write-behind buffer; False if the row was dropped."""
+    return write_behind.put("trades", (exchange, symbol, side, price, qty, amount_krw, fee, pnl,
+                                       order_id, strategy, note, int(dry_run), time.time()))
+
+
+def queue_signal(exchange: str, symbol: str, signal: str, score: float,
+                 price: float, indicators: dict) -> bool:
+    """save_signal through the write-behind buffer; False if the row was dropped."""
+    json_extra, *values = _indicator_values(indicators)
+    return write_behind.put("signals", (exchange, symbol, signal, score, price, json_extra,
+                                        time.time(), *values))
+
+
+def queue_arbitrage(kimchi_pct: float, net_profit_pct: float, direction: str,
+                    upbit_price: float, bybit_price_krw: float, usd_krw: float,
+                    amount_krw: float, profit_krw: float, status: str) -> bool:
+    """save_arbitrage through the write-behind buffer; False if the row was dropped."""
+    return write_behind.put("arbitrage", (kimchi_pct, net_profit_pct, direction, upbit_price,
+                                          bybit_price_krw, usd_krw, amount_krw, profit_krw,
+                                          status, time.time()))
+
+
+def save_premiums(rows: list[tuple]):
+    """Batch insert (coin, ts, premium_pct) rows; a repeated (coin, ts) keeps the latest value."""
+    with get_conn() as conn:
+        conn.executemany(
+            "INSERT OR REPLACE INTO premium_history (coin, ts, premium_pct) VALUES (?,?,?)", rows
+        )
+
+
+def load_premiums(coins: list[str] = None, since: float = 0) -> list[dict]:
+    with get_conn() as conn:
+        if coins:
+            marks = ",".join("?" * len(coins))
+            rows = conn.execute(
+                f"SELECT * FROM premium_history WHERE coin IN ({marks}) AND ts >= ? ORDER BY ts",
+                (*coins, since)
+            ).fetchall()
+        else:
+            rows = conn.execute(
+                "SELECT * FROM premium_history WHERE ts >= ? ORDER BY ts", (since,)
+            ).fetchall()
+    return [dict(r) for r in rows]
+
+
+def save_funding(rows: list[tuple]):
+    """Batch upsert (symbol, funding ts, rate); the predicted rate is overwritten until settlement."""
+    with get_conn() as conn:
+        conn.executemany(
+            "INSERT OR REPLACE INTO funding_history (symbol, ts, rate) VALUES (?,?,?)", rows
+        )
+
+
+def load_funding(since: float = 0) -> list[dict]:
+    with get_conn() as conn:
+        rows = conn.execute(
+            "SELECT * FROM funding_history WHERE ts >= ? ORDER BY ts", (since,)
+        ).fetchall()
+    return [dict(r) for r in rows]
+
+
 def save_config(key: str, value):
     with get_conn() as conn:
         conn.execute(
@@ -135,20 +520,17 @@ def load_config(key: str, default=None):
 
 
 def get_pnl_summary() -> dict:
+    """All-time totals from the daily rollups (cost grows with days, not rows)."""
+    write_behind.drain(("trades", "arbitrage"))
     with get_conn() as conn:
         row = conn.execute("""
-            SELECT
-                COUNT(*) as total_trades,
-                SUM(CASE WHEN side='sell' AND pnl > 0 THEN 1 ELSE 0 END) as wins,
-                SUM(CASE WHEN side='sell' AND pnl <= 0 THEN 1 ELSE 0 END) as losses,
-                SUM(pnl) as total_pnl,
-                SUM(fee) as total_fee
-            FROM trades WHERE dry_run=0
-        """).fetchone()
-        arb_row = conn.execute("""
-            SELECT SUM(profit_krw) as arb_profit, COUNT(*) as arb_trades
-            FROM arbitrage WHERE status='executed'
+            SELECT SUM(trades) as total_trades, SUM(wins) as wins, SUM(losses) as losses,
+                   SUM(pnl) as total_pnl, SUM(fee) as total_fee
+            FROM pnl_daily WHERE dry_run=0
         """).fetchone()
+        arb_row = conn.execute(
+            "SELECT SUM(profit_krw) as arb_profit, SUM(trades) as arb_trades FROM arb_daily"
+        ).fetchone()
     return {
         "total_trades": row["total_trades"] or 0,
         "wins": row["wins"] or 0,
@@ -160,3 +542,22 @@ def get_pnl_summary() -> dict:
         "arb_profit": arb_row["arb_profit"] or 0,
         "arb_trades": arb_row["arb_trades"] or 0,
     }
+
+
+def get_pnl_daily(days: int = 30, dry_run: bool = False) -> list[dict]:
+    """Per-day (KST) trade and arbitrage PnL, newest first."""
+    write_behind.drain(("trades", "arbitrage"))
+    with get_conn() as conn:
+        rows = conn.execute(
+            "SELECT day, trades, wins, losses, pnl, fee FROM pnl_daily WHERE dry_run=? ORDER BY day DESC LIMIT ?",
+            (int(dry_run), days),
+        ).fetchall()
+        arb = conn.execute(
+            "SELECT day, trades, profit_krw FROM arb_daily ORDER BY day DESC LIMIT ?", (days,)
+        ).fetchall()
+    out = {r["day"]: {**dict(r), "net_pnl": r["pnl"] - r["fee"], "arb_trades": 0, "arb_profit": 0.0} for r in rows}
+    for r in arb:
+        d = out.setdefault(r["day"], {"day": r["day"], "trades": 0, "wins": 0, "losses": 0,
+                                      "pnl": 0.0, "fee": 0.0, "net_pnl": 0.0})
+        d["arb_trades"], d["arb_profit"] = r["trades"], r["profit_krw"]
+    return [out[day] for day in sorted(out, reverse=True)[:days]]
@@ -0,0 +1,228 @@
+"""Streaming export / import of the history tables (CSV, or Parquet with pyarrow).
+
+Export pages through a table by primary key (`WHERE id > ? ORDER BY id
+LIMIT n`), so every chunk is a short read on the calling thread's own
+connection: memory stays at one chunk, and under WAL the bot keeps writing
+while a multi-GB table is archived. Files are written under a temporary name
+and renamed when complete. CSV paths ending in .gz are gzip-compressed; each
+Parquet chunk becomes one row group.
+
+Import streams the file back in chunks, one executemany transaction per
+chunk, so the rollup triggers stay in sync and other writers interleave;
+like every other write it belongs on the DB thread (`db.run`).
+With keep_ids the original ids are kept and rows already present are
+skipped, so re-importing an archive is idempotent.
+
+The API endpoints only accept file names relative to EXPORT_DIR
+(resolve_export_path); the functions themselves take any path.
+"""
+import csv
+import gzip
+import logging
+import os
+import time
+from operator import itemgetter
+from pathlib import Path
+from typing import Iterator, Optional
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:   # Parquet 는 선택 사항 (CSV 는 항상 가능)
+    pa = pq = None
+
+from . import database as db
+
+logger = logging.getLogger(__name__)
+
+EXPORT_TABLES = ("trades", "signals", "arbitrage")
+EXPORT_DIR = Path(__file__).parent.parent.parent / "crypto_bot_exports"
+EXPORT_EXTENSIONS = (".csv", ".csv.gz", ".parquet")
+CHUNK_ROWS = 50_000
+GZIP_LEVEL = 6
+
+
+def _check_table(table: str):
+    if table not in EXPORT_TABLES:
+        raise ValueError(f"Unsupported table '{table}' (one of {', '.join(EXPORT_TABLES)})")
+
+
+def resolve_export_path(name: str, create_dir: bool = False) -> Path:
+    """Relative file name -> path inside EXPORT_DIR; rejects absolute paths, '..' and other extensions."""
+    rel = Path(name)
+    if not name or rel.is_absolute() or rel.drive or ".." in rel.parts:
+        raise ValueError(f"Path must be relative to {EXPORT_DIR.name}/ without '..': {name}")
+    if not name.lower().endswith(EXPORT_EXTENSIONS):
+        raise ValueError(f"Unsupported file type (one of {', '.join(EXPORT_EXTENSIONS)}): {name}")
+    if create_dir:
+        EXPORT_DIR.mkdir(parents=True, exist_ok=True)
+    root = EXPORT_DIR.resolve()
+    path = (root / rel).resolve()
+    if not path.is_relative_to(root):   # 심볼릭 링크로 빠져나가는 경우
+        raise ValueError(f"Path escapes {EXPORT_DIR.name}/: {name}")
+    if create_dir:
+        path.parent.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def _format(path: Path, fmt: Optional[str]) -> str:
+    fmt = (fmt or ("parquet" if path.suffix == ".parquet" else "csv")).lower()
+    if fmt not in ("csv", "parquet"):
+        raise ValueError(f"Unsupported format '{fmt}'")
+    if fmt == "parquet" and pq is None:
+        raise RuntimeError("Parquet export/import requires pyarrow (pip install pyarrow)")
+    return fmt
+
+
+def _columns(table: str) -> list[tuple[str, str]]:
+    """(name, declared type) in table order."""
+    return [(r[1], (r[2] or "").upper()) for r in db.get_conn().execute(f"PRAGMA table_info({table})")]
+
+
+def iter_chunks(table: str, since: Optional[float] = None, until: Optional[float] = None,
+                chunk_rows: int = CHUNK_ROWS) -> Iterator[list[tuple]]:
+    """Rows of `table` (all columns, id order) in chunks of at most chunk_rows."""
+    _check_table(table)
+    names = [name for name, _ in _columns(table)]
+    conn = db.get_conn()
+    cur = conn.cursor()
+    cur.row_factory = None
+    last = 0
+    filters, args = "", []
+    if since is not None:
+        # timestamp 는 id 순서와 거의 같으므로 시작 id 를 인덱스로 찾아 앞부분을 건너뛴다
+        first = conn.execute(f"SELECT MIN(id) FROM {table} WHERE timestamp >= ?", (since,)).fetchone()[0]
+        if first is None:
+            return
+        last = first - 1
+        filters += " AND timestamp >= ?"
+        args.append(since)
+    if until is not None:
+        filters += " AND timestamp < ?"
+        args.append(until)
+    sql = f"SELECT {', '.join(names)} FROM {table} WHERE id > ?{filters} ORDER BY id LIMIT ?"
+    while True:
+        rows = cur.execute(sql, (last, *args, chunk_rows)).fetchall()
+        if not rows:
+            return
+        yield rows
+        if len(rows) < chunk_rows:
+            return
+        last = rows[-1][0]
+
+
+# ── Export ────────────────────────────────────────────────────────────────────
+def _arrow_schema(columns: list[tuple[str, str]]):
+    types = {"INTEGER": pa.int64(), "REAL": pa.float64()}
+    return pa.schema([(name, types.get(decl, pa.string())) for name, decl in columns])
+
+
+def export_table(table: str, path, fmt: Optional[str] = None, since: Optional[float] = None,
+                 until: Optional[float] = None, chunk_rows: int = CHUNK_ROWS) -> dict:
+    """Stream one table to a CSV / Parquet file; returns row count, size and throughput."""
+    _check_table(table)
+    path = Path(path)
+    fmt = _format(path, fmt)
+    columns = _columns(table)
+    tmp = path.with_name(path.name + ".part")
+    start = time.perf_counter()
+    rows = 0
+    try:
+        if fmt == "csv":
+            if path.suffix == ".gz":
+                f = gzip.open(tmp, "wt", newline="", compresslevel=GZIP_LEVEL)
+            else:
+                f = open(tmp, "w", newline="")
+            with f:
+                writer = csv.writer(f)
+                writer.writerow([name for name, _ in columns])
+                for chunk in iter_chunks(table, since, until, chunk_rows):
+                    writer.writerows(chunk)
+                    rows += len(chunk)
+        else:
+            schema = _arrow_schema(columns)
+            with pq.ParquetWriter(tmp, schema) as writer:
+                for chunk in iter_chunks(table, since, until, chunk_rows):
+                    arrays = [pa.array(col, type=field.type) for col, field in zip(zip(*chunk), schema)]
+                    writer.write_table(pa.Table.from_arrays(arrays, schema=schema))
+                    rows += len(chunk)
+        os.replace(tmp, path)
+    finally:
+        if tmp.exists():
+            tmp.unlink()
+    elapsed = time.perf_counter() - start
+    logger.info(f"{table} 내보내기 {rows}건 → {path} ({elapsed:.1f}s)")
+    return {
+        "table": table,
+        "path": str(path),
+        "format": fmt,
+        "rows": rows,
+        "bytes": path.stat().st_size,
+        "seconds": round(elapsed, 3),
+        "rows_per_sec": round(rows / elapsed) if elapsed > 0 else rows,
+    }
+
+
+# ── Import ────────────────────────────────────────────────────────────────────
+def _csv_chunks(path: Path, columns: dict[str, str], chunk_rows: int):
+    opener = gzip.open if path.suffix == ".gz" else open
+    with opener(path, "rt", newline="") as f:
+        reader = csv.reader(f)
+        header = next(reader, None)
+        if header is None:
+            return
+        keep = [i for i, name in enumerate(header) if name in columns]
+        names = [header[i] for i in keep]
+        get = itemgetter(*keep) if len(keep) > 1 else (lambda r: (r[keep[0]],))
+        # 숫자 컬럼은 SQLite 타입 친화성이 문자열을 변환하므로 빈 값(NULL)만 처리
+        numeric = [j for j, n in enumerate(names) if columns[n] in ("INTEGER", "REAL")]
+        yield names
+        chunk = []
+        for record in reader:
+            row = list(get(record))
+            for j in numeric:
+                if row[j] == "":
+                    row[j] = None
+            chunk.append(row)
+            if len(chunk) >= chunk_rows:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+
+def _parquet_chunks(path: Path, columns: dict[str, str], chunk_rows: int):
+    pf = pq.ParquetFile(path)
+    names = [n for n in pf.schema_arrow.names if n in columns]
+    yield names
+    for batch in pf.iter_batches(batch_size=chunk_rows, columns=names):
+        yield list(zip(*(col.to_pylist() for col in batch.columns)))
+
+
+def import_table(table: str, path, fmt: Optional[str] = None, keep_ids: bool = False,
+                 chunk_rows: int = CHUNK_ROWS) -> dict:
+    """Stream a file written by export_table back into `table`."""
+    _check_table(table)
+    path = Path(path)
+    if not path.exists():
+        raise ValueError(f"File not found: {path}")
+    fmt = _format(path, fmt)
+    columns = dict(_columns(table))
+    chunks = (_csv_chunks if fmt == "csv" else _parquet_chunks)(path, columns, chunk_rows)
+    names = next(chunks, None)
+    start = time.perf_counter()
+    rows = 0
+    if names:
+        drop = None if keep_ids or "id" not in names else names.index("id")
+        if drop is not None:
+            names = names[:drop] + names[drop + 1:]
+        verb = "INSERT OR IGNORE" if keep_ids else "INSERT"
+        sql = f"{verb} INTO {table} ({', '.join(names)}) VALUES ({', '.join('?' * len(names))})"
+        for chunk in chunks:
+            if drop is not None:
+                chunk = [r[:drop] + r[drop + 1:] for r in chunk]   # list / tuple 모두 슬라이스
+            with db.get_conn() as conn:
+                rows += conn.executemany(sql, chunk).rowcount
+    elapsed = time.perf_counter() - start
+    logger.info(f"{table} 가져오기 {rows}건 ← {path} ({elapsed:.1f}s)")
+    return {"table": table, "path": str(path), "format": fmt, "rows": rows, "seconds": round(elapsed, 3)}
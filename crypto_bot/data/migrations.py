@@ -0,0 +1,268 @@
+"""Versioned schema migrations for the bot database.
+
+The applied version lives in `PRAGMA user_version`. Each migration runs in
+its own IMMEDIATE transaction together with the version bump, so a failed
+step rolls back completely and the next start retries it. Databases created
+before versioning report version 0; every step is written to be idempotent
+(IF NOT EXISTS, column checks) so they migrate in place. A copy of the file
+is taken with the online backup API before touching a database that already
+has tables.
+
+To change the schema, append a Migration with the next version number;
+never edit one that has shipped.
+"""
+import logging
+import sqlite3
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+# signals 테이블의 지표 컬럼 (IndicatorResult 의 수치 필드)
+INDICATOR_COLUMNS = (
+    "rsi", "macd", "macd_signal", "macd_hist", "bb_upper", "bb_mid", "bb_lower",
+    "ema5", "ema20", "ema60", "ema120", "volume_ratio", "stoch_k", "stoch_d", "atr",
+)
+
+
+@dataclass
+class Migration:
+    version: int
+    name: str
+    sql: str = ""
+    fn: Optional[Callable[[sqlite3.Connection], None]] = None
+
+
+# ── Steps ─────────────────────────────────────────────────────────────────────
+def rebuild_rollups(conn: sqlite3.Connection):
+    """Recompute pnl_daily / arb_daily from trades / arbitrage."""
+    conn.execute("DELETE FROM pnl_daily")
+    conn.execute("DELETE FROM arb_daily")
+    conn.execute("""
+        INSERT INTO pnl_daily (day, dry_run, trades, wins, losses, pnl, fee)
+        SELECT date(timestamp, 'unixepoch', '+9 hours'), dry_run, COUNT(*),
+               SUM(side = 'sell' AND IFNULL(pnl, 0) > 0), SUM(side = 'sell' AND IFNULL(pnl, 0) <= 0),
+               SUM(IFNULL(pnl, 0)), SUM(fee)
+        FROM trades GROUP BY 1, 2
+    """)
+    conn.execute("""
+        INSERT INTO arb_daily (day, trades, profit_krw)
+        SELECT date(timestamp, 'unixepoch', '+9 hours'), COUNT(*), SUM(IFNULL(profit_krw, 0))
+        FROM arbitrage WHERE status = 'executed' GROUP BY 1
+    """)
+    logger.info("일별 손익 집계 재생성")
+
+
+def _add_indicator_columns(conn: sqlite3.Connection):
+    """Add the typed indicator columns to signals and move values out of the JSON column."""
+    existing = {r[1] for r in conn.execute("PRAGMA table_info(signals)")}
+    missing = [c for c in INDICATOR_COLUMNS if c not in existing]
+    if not missing:
+        return
+    for c in missing:
+        conn.execute(f"ALTER TABLE signals ADD COLUMN {c} REAL")
+    paths = ", ".join(f"'$.{c}'" for c in INDICATOR_COLUMNS)
+    n = conn.execute(f"""
+        UPDATE signals SET
+            {", ".join(f"{c} = json_extract(indicators, '$.{c}')" for c in missing)},
+            indicators = NULLIF(json_remove(indicators, {paths}), '{{}}')
+        WHERE json_valid(indicators)
+    """).rowcount
+    logger.info(f"시그널 지표 컬럼 추가 ({len(missing)}개), 기존 {n}건 변환")
+
+
+MIGRATIONS = [
+    Migration(1, "base tables", sql="""
+        CREATE TABLE IF NOT EXISTS trades (
+            id          INTEGER PRIMARY KEY AUTOINCREMENT,
+            exchange    TEXT NOT NULL,
+            symbol      TEXT NOT NULL,
+            side        TEXT NOT NULL,
+            price       REAL NOT NULL,
+            qty         REAL NOT NULL,
+            amount_krw  REAL NOT NULL,
+            fee         REAL NOT NULL,
+            pnl         REAL DEFAULT 0,
+            order_id    TEXT,
+            strategy    TEXT DEFAULT 'auto',
+            note        TEXT,
+            dry_run     INTEGER DEFAULT 1,
+            timestamp   REAL NOT NULL
+        );
+
+        CREATE TABLE IF NOT EXISTS signals (
+            id          INTEGER PRIMARY KEY AUTOINCREMENT,
+            exchange    TEXT,
+            symbol      TEXT,
+            signal      TEXT,
+            score       REAL,
+            price       REAL,
+            indicators  TEXT,
+            timestamp   REAL NOT NULL
+        );
+
+        CREATE TABLE IF NOT EXISTS arbitrage (
+            id              INTEGER PRIMARY KEY AUTOINCREMENT,
+            kimchi_pct      REAL,
+            net_profit_pct  REAL,
+            direction       TEXT,
+            upbit_price     REAL,
+            bybit_price_krw REAL,
+            usd_krw         REAL,
+            amount_krw      REAL,
+            profit_krw      REAL,
+            status          TEXT,
+            timestamp       REAL NOT NULL
+        );
+
+        CREATE TABLE IF NOT EXISTS premium_history (
+            coin        TEXT NOT NULL,
+            ts          REAL NOT NULL,
+            premium_pct REAL NOT NULL,
+            PRIMARY KEY (coin, ts)
+        ) WITHOUT ROWID;
+
+        CREATE TABLE IF NOT EXISTS funding_history (
+            symbol      TEXT NOT NULL,
+            ts          REAL NOT NULL,
+            rate        REAL NOT NULL,
+            PRIMARY KEY (symbol, ts)
+        ) WITHOUT ROWID;
+
+        CREATE TABLE IF NOT EXISTS candles (
+            exchange    TEXT NOT NULL,
+            symbol      TEXT NOT NULL,
+            interval    TEXT NOT NULL,
+            ts          INTEGER NOT NULL,
+            open        REAL NOT NULL,
+            high        REAL NOT NULL,
+            low         REAL NOT NULL,
+            close       REAL NOT NULL,
+            volume      REAL NOT NULL,
+            PRIMARY KEY (exchange, symbol, interval, ts)
+        ) WITHOUT ROWID;
+
+        CREATE TABLE IF NOT EXISTS config (
+            key     TEXT PRIMARY KEY,
+            value   TEXT NOT NULL
+        );
+    """),
+    Migration(2, "query indexes", sql="""
+        CREATE INDEX IF NOT EXISTS idx_trades_ts ON trades (timestamp);
+        CREATE INDEX IF NOT EXISTS idx_trades_strategy_ts ON trades (strategy, timestamp);
+        CREATE INDEX IF NOT EXISTS idx_signals_ts ON signals (timestamp);
+    """),
+    Migration(3, "daily pnl rollups", sql="""
+        -- 일별 손익 집계 (KST 기준), INSERT 트리거로 증분 갱신
+        CREATE TABLE IF NOT EXISTS pnl_daily (
+            day         TEXT NOT NULL,
+            dry_run     INTEGER NOT NULL,
+            trades      INTEGER NOT NULL DEFAULT 0,
+            wins        INTEGER NOT NULL DEFAULT 0,
+            losses      INTEGER NOT NULL DEFAULT 0,
+            pnl         REAL NOT NULL DEFAULT 0,
+            fee         REAL NOT NULL DEFAULT 0,
+            PRIMARY KEY (day, dry_run)
+        ) WITHOUT ROWID;
+
+        CREATE TABLE IF NOT EXISTS arb_daily (
+            day         TEXT PRIMARY KEY,
+            trades      INTEGER NOT NULL DEFAULT 0,
+            profit_krw  REAL NOT NULL DEFAULT 0
+        ) WITHOUT ROWID;
+
+        CREATE TRIGGER IF NOT EXISTS trades_pnl_daily AFTER INSERT ON trades BEGIN
+            INSERT INTO pnl_daily (day, dry_run, trades, wins, losses, pnl, fee)
+            VALUES (date(NEW.timestamp, 'unixepoch', '+9 hours'), NEW.dry_run, 1,
+                    NEW.side = 'sell' AND IFNULL(NEW.pnl, 0) > 0,
+                    NEW.side = 'sell' AND IFNULL(NEW.pnl, 0) <= 0,
+                    IFNULL(NEW.pnl, 0), NEW.fee)
+            ON CONFLICT (day, dry_run) DO UPDATE SET
+                trades = trades + 1,
+                wins = wins + excluded.wins,
+                losses = losses + excluded.losses,
+                pnl = pnl + excluded.pnl,
+                fee = fee + excluded.fee;
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS arbitrage_arb_daily AFTER INSERT ON arbitrage
+        WHEN NEW.status = 'executed' BEGIN
+            INSERT INTO arb_daily (day, trades, profit_krw)
+            VALUES (date(NEW.timestamp, 'unixepoch', '+9 hours'), 1, IFNULL(NEW.profit_krw, 0))
+            ON CONFLICT (day) DO UPDATE SET
+                trades = trades + 1,
+                profit_krw = profit_krw + excluded.profit_krw;
+        END;
+    """, fn=rebuild_rollups),
+    Migration(4, "typed indicator columns", fn=_add_indicator_columns, sql="""
+        CREATE INDEX IF NOT EXISTS idx_signals_symbol_ts ON signals (symbol, timestamp);
+    """),
+]
+
+LATEST_VERSION = MIGRATIONS[-1].version
+
+
+# ── Runner ────────────────────────────────────────────────────────────────────
+def _statements(sql: str):
+    """Split a script into complete statements (trigger bodies stay whole)."""
+    buf = ""
+    for line in sql.splitlines(keepends=True):
+        buf += line
+        if sqlite3.complete_statement(buf):
+            if buf.strip():
+                yield buf.strip()
+            buf = ""
+    if buf.strip() and not all(l.strip().startswith("--") for l in buf.strip().splitlines()):
+        raise ValueError(f"Incomplete SQL statement: {buf.strip()[:80]}")
+
+
+def schema_version(conn: sqlite3.Connection) -> int:
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def _backup(conn: sqlite3.Connection, path: Path, version: int) -> Optional[Path]:
+    has_tables = conn.execute("SELECT 1 FROM sqlite_master WHERE type='table' LIMIT 1").fetchone()
+    if not has_tables or not path or str(path) == ":memory:":
+        return None
+    dest = Path(f"{path}.v{version}.bak")
+    with sqlite3.connect(str(dest)) as target:
+        conn.backup(target)
+    target.close()
+    logger.info(f"마이그레이션 전 백업: {dest}")
+    return dest
+
+
+def migrate(conn: sqlite3.Connection, path: Optional[Path] = None, target: Optional[int] = None,
+            backup: bool = True) -> list[int]:
+    """Apply pending migrations up to `target` (default: latest); returns the versions applied."""
+    target = LATEST_VERSION if target is None else target
+    current = schema_version(conn)
+    if current > LATEST_VERSION:
+        logger.warning(f"DB 스키마 v{current} 가 코드(v{LATEST_VERSION})보다 새 버전 — 마이그레이션 건너뜀")
+        return []
+    pending = [m for m in MIGRATIONS if current < m.version <= target]
+    if not pending:
+        return []
+    if backup and path is not None:
+        _backup(conn, path, current)
+
+    if conn.in_transaction:
+        conn.commit()
+    applied = []
+    for m in pending:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for stmt in _statements(m.sql):
+                conn.execute(stmt)
+            if m.fn is not None:
+                m.fn(conn)
+            conn.execute(f"PRAGMA user_version = {m.version}")
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            logger.error(f"마이그레이션 v{m.version} ({m.name}) 실패 — 롤백")
+            raise
+        applied.append(m.version)
+        logger.info(f"마이그레이션 v{m.version} 적용: {m.name}")
+    return applied
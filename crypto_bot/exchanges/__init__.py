@@ -1,5 +1,12 @@
 from .upbit import UpbitExchange
 from .bybit import BybitExchange
-from .base import Ticker, OrderBook, Balance, Order, FundingRate
+from .base import Ticker, OrderBook, Balance, Order, FundingRate, PreparedOrder, OrderRejected
+from .orderbook import L2Book
+from .streams import MarketStream, UpbitStream, BybitStream
+from .paper import PaperExchange, SimClock, LatencyModel, BookTape, BookRecorder
 
-__all__ = ["UpbitExchange", "BybitExchange", "Ticker", "OrderBook", "Balance", "Order", "FundingRate"]
+__all__ = [
+    "UpbitExchange", "BybitExchange", "Ticker", "OrderBook", "Balance", "Order", "FundingRate", "PreparedOrder", "OrderRejected",
+    "L2Book", "MarketStream", "UpbitStream", "BybitStream",
+    "PaperExchange", "SimClock", "LatencyModel", "BookTape", "BookRecorder",
+]
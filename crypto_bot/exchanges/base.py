@@ -4,6 +4,8 @@ from dataclasses import dataclass
 from typing import Optional
 import time
 
+import aiohttp
+
 
 @dataclass
 class OrderBook:
@@ -43,6 +45,26 @@ class Order:
     filled_qty: float
     status: str      # 'open' | 'filled' | 'cancelled'
     timestamp: float
+    avg_price: float = 0.0   # average fill price (0 = unknown / nothing filled)
+
+
+class OrderRejected(RuntimeError):
+    """The exchange definitely refused the order (HTTP 4xx / API error code): nothing was placed."""
+
+
+@dataclass
+class PreparedOrder:
+    """Order request serialized and signed ahead of sending (prepare_order -> send_order)."""
+    symbol: str
+    side: str
+    order_type: str
+    qty: float
+    price: float
+    path: str
+    body: str        # serialized request body
+    headers: dict    # auth headers, already signed
+    created: float
+    client_id: str = ""   # client order id sent with the order (lookup when the ack is lost)
 
 
 @dataclass
@@ -52,15 +74,70 @@ class FundingRate:
     next_funding: float  # unix timestamp
 
 
+# Pooled HTTP connections (per exchange instance)
+HTTP_POOL_LIMIT = 100
+HTTP_POOL_PER_HOST = 20
+HTTP_DNS_TTL = 300          # seconds
+HTTP_KEEPALIVE = 60         # seconds an idle connection stays open
+
+
 class BaseExchange(ABC):
     name: str = "base"
     taker_fee: float = 0.0
     maker_fee: float = 0.0
+    ohlcv_page_limit: int = 200   # max candles per get_ohlcv request
+    stream = None                 # MarketStream feeding get_ticker/get_orderbook while live
 
     def __init__(self, api_key: str = "", secret: str = "", passphrase: str = ""):
         self.api_key = api_key
         self.secret = secret
         self.passphrase = passphrase
+        self._http: Optional[aiohttp.ClientSession] = None
+
+    # ── HTTP session ──────────────────────────────────────────────────────────
+    def _session(self) -> aiohttp.ClientSession:
+        """Long-lived session so requests reuse keep-alive TCP/TLS connections."""
+        if self._http is None or self._http.closed:
+            self._http = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    limit=HTTP_POOL_LIMIT,
+                    limit_per_host=HTTP_POOL_PER_HOST,
+                    ttl_dns_cache=HTTP_DNS_TTL,
+                    keepalive_timeout=HTTP_KEEPALIVE,
+                ),
+            )
+        return self._http
+
+    async def start(self):
+        """Open the session up front (otherwise it opens on the first request)."""
+        self._session()
+
+    async def close(self):
+        if self.stream is not None:
+            await self.stream.close()
+            self.stream = None
+        if self._http is not None and not self._http.closed:
+            await self._http.close()
+        self._http = None
+
+    # ── Streaming market data ────────────────────────────────────────────────
+    def _make_stream(self, symbols: list[str]):
+        raise NotImplementedError(f"{self.name} has no market stream")
+
+    async def start_stream(self, symbols: list[str]):
+        """Start (or extend) the websocket feed for `symbols`."""
+        if self.stream is None:
+            self.stream = self._make_stream(symbols)
+            await self.stream.start()
+        else:
+            await self.stream.subscribe(symbols)
+        return self.stream
+
+    def _live_ticker(self, symbol: str) -> Optional[Ticker]:
+        return self.stream.ticker(symbol) if self.stream is not None else None
+
+    def _live_orderbook(self, symbol: str, depth: int) -> Optional[OrderBook]:
+        return self.stream.orderbook(symbol, depth) if self.stream is not None else None
 
     # ── Market data ──────────────────────────────────────────────────────────
     @abstractmethod
@@ -72,8 +149,12 @@ class BaseExchange(ABC):
         ...
 
     @abstractmethod
-    async def get_ohlcv(self, symbol: str, interval: str = "1m", limit: int = 200) -> list:
-        """Return list of [timestamp, open, high, low, close, volume]"""
+    async def get_ohlcv(self, symbol: str, interval: str = "1m", limit: int = 200,
+                        before: Optional[int] = None) -> list:
+        """Return list of [timestamp, open, high, low, close, volume], oldest first.
+
+        before: only candles older than this candle timestamp (for paging back).
+        """
         ...
 
     # ── Account ───────────────────────────────────────────────────────────────
@@ -93,6 +174,14 @@ class BaseExchange(ABC):
     ) -> Order:
         ...
 
+    def prepare_order(self, symbol: str, side: str, order_type: str, qty: float,
+                      price: Optional[float] = None) -> PreparedOrder:
+        """Build + sign the order request now so sending it later is pure I/O."""
+        raise NotImplementedError(f"{self.name} does not support prepared orders")
+
+    async def send_order(self, prepared: PreparedOrder) -> Order:
+        raise NotImplementedError(f"{self.name} does not support prepared orders")
+
     @abstractmethod
     async def cancel_order(self, symbol: str, order_id: str) -> bool:
         ...
@@ -101,14 +190,20 @@ class BaseExchange(ABC):
     async def get_order(self, symbol: str, order_id: str) -> Order:
         ...
 
+    async def get_order_by_client_id(self, symbol: str, client_id: str) -> Order:
+        """Look up an order by the client id set in prepare_order (ack lost / timed out)."""
+        raise NotImplementedError(f"{self.name} does not support client order ids")
+
     # ── Futures (optional) ────────────────────────────────────────────────────
     async def get_funding_rate(self, symbol: str) -> Optional[FundingRate]:
         return None
 
     # ── Fee helpers ───────────────────────────────────────────────────────────
-    def calc_fee(self, amount: float, is_taker: bool = True) -> float:
-        fee_rate = self.taker_fee if is_taker else self.maker_fee
-        return amount * fee_rate
+    def fee_rate(self, is_taker: bool = True, symbol: Optional[str] = None) -> float:
+        return self.taker_fee if is_taker else self.maker_fee
+
+    def calc_fee(self, amount: float, is_taker: bool = True, symbol: Optional[str] = None) -> float:
+        return amount * self.fee_rate(is_taker, symbol)
 
     def _ts(self) -> int:
         return int(time.time() * 1000)
@@ -1,13 +1,16 @@
 """Bybit V5 exchange connector (spot + linear futures)."""
 import hashlib
 import hmac
+import json
 import time
+import uuid
 import logging
 from typing import Optional
 
 import aiohttp
 
-from .base import BaseExchange, Ticker, OrderBook, Balance, Order, FundingRate
+from .base import BaseExchange, Ticker, OrderBook, Balance, Order, FundingRate, PreparedOrder, OrderRejected
+from .streams import BybitStream
 
 logger = logging.getLogger(__name__)
 
@@ -18,6 +21,7 @@ class BybitExchange(BaseExchange):
     name = "bybit"
     taker_fee = 0.00055   # 0.055% spot
     maker_fee = 0.0001
+    ohlcv_page_limit = 1000
 
     SPOT_TAKER = 0.00055
     FUTURES_TAKER = 0.00055
@@ -47,51 +51,107 @@ class BybitExchange(BaseExchange):
         params = params or {}
         query = "&".join(f"{k}={v}" for k, v in sorted(params.items()))
         headers = self._auth_headers(query) if auth else {}
-        async with aiohttp.ClientSession() as session:
-            async with session.get(
-                f"{BYBIT_BASE}{path}",
-                params=params,
-                headers=headers,
-                timeout=aiohttp.ClientTimeout(total=10),
-            ) as resp:
-                resp.raise_for_status()
-                data = await resp.json()
-                if data.get("retCode", 0) != 0:
-                    raise Exception(f"Bybit API error: {data.get('retMsg')}")
-                return data["result"]
+        session = self._session()
+        async with session.get(
+            f"{BYBIT_BASE}{path}",
+            params=params,
+            headers=headers,
+            timeout=aiohttp.ClientTimeout(total=10),
+        ) as resp:
+            resp.raise_for_status()
+            data = await resp.json()
+            if data.get("retCode", 0) != 0:
+                raise Exception(f"Bybit API error: {data.get('retMsg')}")
+            return data["result"]
 
     async def _post(self, path: str, body: dict, auth: bool = True):
-        import json
         body_str = json.dumps(body)
         headers = self._auth_headers(body_str) if auth else {"Content-Type": "application/json"}
-        async with aiohttp.ClientSession() as session:
-            async with session.post(
-                f"{BYBIT_BASE}{path}",
-                data=body_str,
-                headers=headers,
-                timeout=aiohttp.ClientTimeout(total=10),
-            ) as resp:
-                resp.raise_for_status()
-                data = await resp.json()
-                if data.get("retCode", 0) != 0:
-                    raise Exception(f"Bybit API error: {data.get('retMsg')}")
-                return data["result"]
+        return await self._send_post(path, body_str, headers)
+
+    async def _send_post(self, path: str, body_str: str, headers: dict):
+        session = self._session()
+        async with session.post(
+            f"{BYBIT_BASE}{path}",
+            data=body_str,
+            headers=headers,
+            timeout=aiohttp.ClientTimeout(total=10),
+        ) as resp:
+            # 4xx / retCode 오류는 거래소가 요청을 거절한 것 (주문이면 생성되지 않음)
+            if 400 <= resp.status < 500:
+                raise OrderRejected(f"Bybit request rejected ({resp.status}): {await resp.text()}")
+            resp.raise_for_status()
+            data = await resp.json()
+            if data.get("retCode", 0) != 0:
+                raise OrderRejected(f"Bybit API error: {data.get('retMsg')}")
+            return data["result"]
+
+    def _make_stream(self, symbols: list[str]) -> BybitStream:
+        return BybitStream(symbols, self.category, session_factory=self._session)
 
     # ── Market data ──────────────────────────────────────────────────────────
     async def get_ticker(self, symbol: str = "BTCUSDT") -> Ticker:
+        live = self._live_ticker(symbol)
+        if live:
+            return live
         data = await self._get(
             "/v5/market/tickers", {"category": self.category, "symbol": symbol}
         )
-        d = data["list"][0]
+        return self._ticker(data["list"][0], time.time())
+
+    async def get_tickers(self, symbols: Optional[list[str]] = None) -> dict[str, Ticker]:
+        """Every ticker of the category in one request (optionally filtered to `symbols`)."""
+        data = await self._get("/v5/market/tickers", {"category": self.category})
+        now = time.time()
+        wanted = set(symbols) if symbols is not None else None
+        return {
+            d["symbol"]: self._ticker(d, now)
+            for d in data["list"]
+            if wanted is None or d["symbol"] in wanted
+        }
+
+    async def get_best_quotes(self, symbols: Optional[list[str]] = None) -> dict[str, tuple[float, float]]:
+        """Best (bid, ask) for every symbol of the category in one request."""
+        data = await self._get("/v5/market/tickers", {"category": self.category})
+        wanted = set(symbols) if symbols is not None else None
+        return {
+            d["symbol"]: (float(d["bid1Price"]), float(d["ask1Price"]))
+            for d in data["list"]
+            if (wanted is None or d["symbol"] in wanted) and d.get("bid1Price") and d.get("ask1Price")
+        }
+
+    @staticmethod
+    def _ticker(d: dict, timestamp: float) -> Ticker:
         return Ticker(
-            symbol=symbol,
+            symbol=d["symbol"],
             price=float(d["lastPrice"]),
             volume_24h=float(d.get("volume24h", d.get("turnover24h", 0))),
             change_24h=float(d.get("price24hPcnt", 0)) * 100,
-            timestamp=time.time(),
+            timestamp=timestamp,
         )
 
+    async def get_instruments(self) -> list[dict]:
+        """Trading instruments of the category: [{symbol, base, quote, funding_interval_min}, ...]."""
+        out, cursor = [], ""
+        while True:
+            params = {"category": self.category, "limit": 1000}
+            if cursor:
+                params["cursor"] = cursor
+            data = await self._get("/v5/market/instruments-info", params)
+            out += [
+                {"symbol": d["symbol"], "base": d["baseCoin"], "quote": d["quoteCoin"],
+                 "funding_interval_min": int(d.get("fundingInterval") or 0)}
+                for d in data["list"]
+                if d.get("status", "Trading") == "Trading"
+            ]
+            cursor = data.get("nextPageCursor", "")
+            if not cursor or not data["list"]:
+                return out
+
     async def get_orderbook(self, symbol: str = "BTCUSDT", depth: int = 10) -> OrderBook:
+        live = self._live_orderbook(symbol, depth)
+        if live:
+            return live
         data = await self._get(
             "/v5/market/orderbook",
             {"category": self.category, "symbol": symbol, "limit": depth},
@@ -100,17 +160,18 @@ class BybitExchange(BaseExchange):
         asks = [[float(p), float(q)] for p, q in data["a"]]
         return OrderBook(bids=bids, asks=asks, timestamp=time.time())
 
-    async def get_ohlcv(self, symbol: str = "BTCUSDT", interval: str = "1", limit: int = 200) -> list:
+    async def get_ohlcv(self, symbol: str = "BTCUSDT", interval: str = "1", limit: int = 200,
+                        before: Optional[int] = None) -> list:
         # Bybit interval: 1,3,5,15,30,60,120,240,360,720,D,W,M
         interval_map = {
             "1m": "1", "3m": "3", "5m": "5", "15m": "15", "30m": "30",
             "1h": "60", "4h": "240", "1d": "D", "1w": "W",
         }
         iv = interval_map.get(interval, interval)
-        data = await self._get(
-            "/v5/market/kline",
-            {"category": self.category, "symbol": symbol, "interval": iv, "limit": limit},
-        )
+        params = {"category": self.category, "symbol": symbol, "interval": iv, "limit": min(limit, 1000)}
+        if before:
+            params["end"] = before - 1   # ms, inclusive
+        data = await self._get("/v5/market/kline", params)
         candles = data["list"]
         candles = list(reversed(candles))
         return [
@@ -136,6 +197,25 @@ class BybitExchange(BaseExchange):
             logger.warning(f"Failed to get funding rate: {e}")
             return None
 
+    async def get_funding_rates(self, symbols: Optional[list[str]] = None) -> dict[str, dict]:
+        """Funding + prices for every linear perpetual in one tickers request.
+
+        symbol -> {rate, next_funding, mark_price, index_price, turnover_24h}
+        """
+        data = await self._get("/v5/market/tickers", {"category": "linear"})
+        wanted = set(symbols) if symbols is not None else None
+        return {
+            d["symbol"]: {
+                "rate": float(d["fundingRate"]),
+                "next_funding": float(d.get("nextFundingTime") or 0) / 1000,
+                "mark_price": float(d.get("markPrice") or 0),
+                "index_price": float(d.get("indexPrice") or 0),
+                "turnover_24h": float(d.get("turnover24h") or 0),
+            }
+            for d in data["list"]
+            if d.get("fundingRate") not in (None, "") and (wanted is None or d["symbol"] in wanted)
+        }
+
     async def get_historical_funding(self, symbol: str = "BTCUSDT", limit: int = 10) -> list:
         data = await self._get(
             "/v5/market/funding/history",
@@ -186,26 +266,47 @@ class BybitExchange(BaseExchange):
         price: Optional[float] = None,
         reduce_only: bool = False,
     ) -> Order:
+        return await self.send_order(self.prepare_order(symbol, side, order_type, qty, price, reduce_only))
+
+    def prepare_order(
+        self,
+        symbol: str,
+        side: str,
+        order_type: str = "Market",
+        qty: float = None,
+        price: Optional[float] = None,
+        reduce_only: bool = False,
+    ) -> PreparedOrder:
+        """Signed with the current timestamp: send within the 5s recv window."""
         body = {
             "category": self.category,
             "symbol": symbol,
             "side": side.capitalize(),  # Buy | Sell
             "orderType": order_type.capitalize(),  # Market | Limit
             "qty": str(qty),
+            "orderLinkId": uuid.uuid4().hex,   # 응답을 못 받아도 이 값으로 주문 조회
         }
         if order_type.lower() == "limit" and price:
             body["price"] = str(price)
         if reduce_only:
             body["reduceOnly"] = True
 
-        data = await self._post("/v5/order/create", body)
+        body_str = json.dumps(body)
+        return PreparedOrder(
+            symbol=symbol, side=side.lower(), order_type=order_type.lower(), qty=qty, price=price or 0,
+            path="/v5/order/create", body=body_str, headers=self._auth_headers(body_str), created=time.time(),
+            client_id=body["orderLinkId"],
+        )
+
+    async def send_order(self, prepared: PreparedOrder) -> Order:
+        data = await self._send_post(prepared.path, prepared.body, prepared.headers)
         return Order(
             order_id=data.get("orderId", ""),
-            symbol=symbol,
-            side=side.lower(),
-            order_type=order_type.lower(),
-            price=price or 0,
-            qty=qty,
+            symbol=prepared.symbol,
+            side=prepared.side,
+            order_type=prepared.order_type,
+            price=prepared.price,
+            qty=prepared.qty,
             filled_qty=0,
             status="open",
             timestamp=time.time(),
@@ -222,11 +323,19 @@ class BybitExchange(BaseExchange):
             return False
 
     async def get_order(self, symbol: str, order_id: str) -> Order:
+        return await self._query_order(symbol, orderId=order_id)
+
+    async def get_order_by_client_id(self, symbol: str, client_id: str) -> Order:
+        return await self._query_order(symbol, orderLinkId=client_id)
+
+    async def _query_order(self, symbol: str, **ids) -> Order:
         data = await self._get(
             "/v5/order/realtime",
-            {"category": self.category, "symbol": symbol, "orderId": order_id},
+            {"category": self.category, "symbol": symbol, **ids},
             auth=True,
         )
+        if not data["list"]:   # 접수 직후에는 비어 있을 수 있음
+            raise LookupError(f"Bybit order not found: {ids}")
         d = data["list"][0]
         return Order(
             order_id=d["orderId"],
@@ -238,6 +347,7 @@ class BybitExchange(BaseExchange):
             filled_qty=float(d.get("cumExecQty", 0)),
             status=d["orderStatus"],
             timestamp=int(d.get("createdTime", 0)) / 1000,
+            avg_price=float(d.get("avgPrice") or 0),
         )
 
     async def set_leverage(self, symbol: str, leverage: int) -> bool:
@@ -0,0 +1,183 @@
+"""Local L2 order book maintained from snapshot + delta messages.
+
+Each side is a pair of price-sorted NumPy arrays (ascending), so the best bid
+is the last bid and the best ask the first ask. A delta is merged in one
+vectorized step: binary search for every updated price, in-place qty writes
+for existing levels, one insert for new levels and one compaction for
+removed ones. Bybit V5 deltas carry an update id "u" that must increase by
+exactly one; a gap marks the book out of sync until the next snapshot.
+"""
+from typing import Optional
+
+import numpy as np
+
+from .base import OrderBook
+
+
+def _levels(levels) -> np.ndarray:
+    """[[price, qty], ...] (numbers or strings) -> (n, 2) float array."""
+    return np.asarray(levels, dtype=float).reshape(-1, 2)
+
+
+class _Side:
+    __slots__ = ("prices", "qtys")
+
+    def __init__(self):
+        self.prices = np.empty(0)
+        self.qtys = np.empty(0)
+
+    def __len__(self) -> int:
+        return len(self.prices)
+
+    def replace(self, levels):
+        arr = _levels(levels)
+        arr = arr[arr[:, 1] > 0]
+        order = np.argsort(arr[:, 0], kind="stable")
+        self.prices = np.ascontiguousarray(arr[order, 0])
+        self.qtys = np.ascontiguousarray(arr[order, 1])
+
+    def apply(self, levels):
+        """Set qty per price (0 removes the level)."""
+        if not len(levels):
+            return
+        upd = _levels(levels)
+        p, q = upd[:, 0], upd[:, 1]
+        if len(p) > 1:
+            order = np.argsort(p, kind="stable")
+            p, q = p[order], q[order]
+            dup = p[1:] == p[:-1]
+            if dup.any():   # the latest update per price wins
+                last = np.append(~dup, True)
+                p, q = p[last], q[last]
+
+        n = len(self.prices)
+        idx = np.searchsorted(self.prices, p)
+        hit = idx < n
+        hit[hit] = self.prices[idx[hit]] == p[hit]
+        if hit.any():
+            self.qtys[idx[hit]] = q[hit]
+        new = ~hit & (q > 0)
+        if new.any():
+            self.prices = np.insert(self.prices, idx[new], p[new])
+            self.qtys = np.insert(self.qtys, idx[new], q[new])
+        if (hit & (q == 0)).any():
+            keep = self.qtys > 0
+            self.prices, self.qtys = self.prices[keep], self.qtys[keep]
+
+
+class L2Book:
+    """Price-level order book for one symbol."""
+
+    def __init__(self, symbol: str):
+        self.symbol = symbol
+        self.bids = _Side()
+        self.asks = _Side()
+        self.update_id: Optional[int] = None
+        self.seq: Optional[int] = None
+        self.timestamp: float = 0.0
+        self.synced = False
+        self._version = 0
+        self._ladders: dict = {}   # side -> (version, prices, cum qty, cum notional)
+
+    # ── Updates ───────────────────────────────────────────────────────────────
+    def apply_snapshot(self, bids, asks, update_id: Optional[int] = None,
+                       seq: Optional[int] = None, timestamp: float = 0.0):
+        self.bids.replace(bids)
+        self.asks.replace(asks)
+        self.update_id, self.seq, self.timestamp = update_id, seq, timestamp
+        self.synced = True
+        self._version += 1
+
+    def apply_delta(self, bids, asks, update_id: int, seq: Optional[int] = None,
+                    timestamp: float = 0.0) -> bool:
+        """Apply one delta; False (and out of sync) when update ids skip or go back."""
+        if not self.synced:
+            return False
+        if self.update_id is not None and update_id != self.update_id + 1:
+            self.synced = False
+            return False
+        self.bids.apply(bids)
+        self.asks.apply(asks)
+        self.update_id, self.timestamp = update_id, timestamp
+        if seq is not None:
+            self.seq = seq
+        self._version += 1
+        if len(self.bids) and len(self.asks) and self.bids.prices[-1] >= self.asks.prices[0]:
+            self.synced = False   # crossed book: deltas were lost somewhere
+            return False
+        return True
+
+    def apply_bybit(self, msg: dict) -> bool:
+        """Bybit V5 orderbook.{depth}.{symbol} message. u == 1 is a service-restart snapshot."""
+        d = msg["data"]
+        ts = msg.get("ts", 0) / 1000
+        if msg.get("type") == "snapshot" or d.get("u") == 1:
+            self.apply_snapshot(d["b"], d["a"], d.get("u"), d.get("seq"), ts)
+            return True
+        return self.apply_delta(d["b"], d["a"], d["u"], d.get("seq"), ts)
+
+    # ── Top of book (O(1)) ────────────────────────────────────────────────────
+    def best_bid(self) -> Optional[float]:
+        return float(self.bids.prices[-1]) if len(self.bids) else None
+
+    def best_ask(self) -> Optional[float]:
+        return float(self.asks.prices[0]) if len(self.asks) else None
+
+    def mid(self) -> Optional[float]:
+        bid, ask = self.best_bid(), self.best_ask()
+        return (bid + ask) / 2 if bid is not None and ask is not None else None
+
+    def spread(self) -> Optional[float]:
+        bid, ask = self.best_bid(), self.best_ask()
+        return ask - bid if bid is not None and ask is not None else None
+
+    # ── Depth queries (vectorized) ────────────────────────────────────────────
+    def ladder(self, side: str) -> tuple:
+        """(prices, cumulative qty, cumulative notional) in fill order.
+
+        side='buy' walks the asks upward, side='sell' the bids downward.
+        Cached until the book changes.
+        """
+        cached = self._ladders.get(side)
+        if cached and cached[0] == self._version:
+            return cached[1:]
+        book = self.asks if side == "buy" else self.bids
+        prices, qtys = (book.prices, book.qtys) if side == "buy" else (book.prices[::-1], book.qtys[::-1])
+        ladder = (prices, np.cumsum(qtys), np.cumsum(prices * qtys))
+        self._ladders[side] = (self._version,) + ladder
+        return ladder
+
+    def cost_to_fill(self, side: str, qty):
+        """Quote notional to buy/sell `qty` base units by sweeping the book.
+
+        qty may be a scalar or an array; NaN where the book is too thin.
+        """
+        prices, cum_qty, cum_cost = self.ladder(side)
+        q = np.asarray(qty, dtype=float)
+        if not len(prices):
+            return np.full(q.shape, np.nan) if q.ndim else float("nan")
+        k = np.searchsorted(cum_qty, q, side="left")   # level that completes the fill
+        kk = np.minimum(k, len(prices) - 1)
+        prev_qty = np.where(kk > 0, cum_qty[kk - 1], 0.0)
+        prev_cost = np.where(kk > 0, cum_cost[kk - 1], 0.0)
+        cost = np.where(k < len(prices), prev_cost + (q - prev_qty) * prices[kk], np.nan)
+        return cost if q.ndim else float(cost)
+
+    def vwap(self, side: str, qty):
+        """Average fill price for `qty` (NaN where the book is too thin)."""
+        q = np.asarray(qty, dtype=float)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            out = self.cost_to_fill(side, q) / q
+        return out if q.ndim else float(out)
+
+    def depth(self, side: str) -> float:
+        """Total base quantity available to a buy/sell."""
+        _, cum_qty, _ = self.ladder(side)
+        return float(cum_qty[-1]) if len(cum_qty) else 0.0
+
+    def to_orderbook(self, depth: int = 10) -> OrderBook:
+        return OrderBook(
+            bids=np.column_stack((self.bids.prices[::-1][:depth], self.bids.qtys[::-1][:depth])).tolist(),
+            asks=np.column_stack((self.asks.prices[:depth], self.asks.qtys[:depth])).tolist(),
+            timestamp=self.timestamp,
+        )
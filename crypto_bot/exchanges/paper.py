@@ -0,0 +1,378 @@
+"""Paper-trading venue that fills orders against recorded order books.
+
+PaperExchange implements BaseExchange, so KimchiPremiumMonitor (and anything
+else that trades through an exchange connector) can run unchanged against it.
+Order books come from a BookTape, recorded from a live MarketStream with
+BookRecorder or loaded from a JSON-lines file. Each order is matched against
+the book in effect when it *arrives*: the send waits one injected network
+latency, the match sweeps the book (market orders, or the marketable part of
+a limit order), and the ack waits another one-way latency. Orders the account
+cannot cover are rejected (spot: quote for buys, base for sells; linear: the
+notional as 1x margin unless reduce-only). Partial fills and rejects are
+injected with configurable probabilities.
+
+Time is virtual (SimClock): it moves only by injected latency and by replay
+jumps between recorded events, and latency sleeps are paced at 1/speed of the
+wall clock, so a recorded session replays much faster than real time while
+keeping the relative timing of latency and book changes.
+"""
+import asyncio
+import itertools
+import json
+import random
+import time
+from typing import Optional
+
+import numpy as np
+
+from .base import BaseExchange, Ticker, OrderBook, Balance, Order, PreparedOrder, OrderRejected
+from .orderbook import L2Book
+
+
+class SimClock:
+    """Discrete virtual time: advances only through injected sleeps and replay jumps.
+
+    Sleeps are paced at 1/speed of the wall clock so concurrent legs still wake
+    in latency order; local processing time does not advance the clock.
+    """
+
+    def __init__(self, start: Optional[float] = None, speed: float = 1.0):
+        self.speed = speed
+        self._virtual = time.time() if start is None else start
+
+    def now(self) -> float:
+        return self._virtual
+
+    def jump(self, t: float):
+        """Move virtual time forward to t (never backwards)."""
+        if t > self._virtual:
+            self._virtual = t
+
+    async def sleep(self, seconds: float):
+        seconds = max(seconds, 0.0)
+        target = self._virtual + seconds
+        await asyncio.sleep(seconds / self.speed if self.speed > 0 else 0)
+        self.jump(target)
+
+
+class LatencyModel:
+    """One-way network latency: mean ± uniform jitter (ms)."""
+
+    def __init__(self, mean_ms: float = 0.0, jitter_ms: float = 0.0, seed: Optional[int] = None):
+        self.mean_ms = mean_ms
+        self.jitter_ms = jitter_ms
+        self._rng = random.Random(seed)
+
+    def sample(self) -> float:
+        """Seconds."""
+        jitter = self._rng.uniform(-self.jitter_ms, self.jitter_ms) if self.jitter_ms else 0.0
+        return max(self.mean_ms + jitter, 0.0) / 1000
+
+
+# ── Recorded books ────────────────────────────────────────────────────────────
+class BookTape:
+    """Time-ordered order book snapshots per symbol."""
+
+    def __init__(self):
+        self._ts: dict[str, list[float]] = {}
+        self._levels: dict[str, list[tuple]] = {}    # (bids (n,2), asks (n,2))
+        self._cache: dict[str, tuple[int, L2Book]] = {}
+
+    @property
+    def symbols(self) -> list[str]:
+        return list(self._ts)
+
+    def __len__(self) -> int:
+        return sum(len(ts) for ts in self._ts.values())
+
+    def record(self, symbol: str, timestamp: float, bids, asks):
+        ts = self._ts.setdefault(symbol, [])
+        levels = self._levels.setdefault(symbol, [])
+        entry = (np.asarray(bids, dtype=float).reshape(-1, 2), np.asarray(asks, dtype=float).reshape(-1, 2))
+        if ts and timestamp < ts[-1]:   # 순서가 어긋난 기록은 제자리에 삽입
+            i = int(np.searchsorted(ts, timestamp, side="right"))
+            ts.insert(i, timestamp)
+            levels.insert(i, entry)
+            self._cache.pop(symbol, None)
+        else:
+            ts.append(timestamp)
+            levels.append(entry)
+
+    def times(self, symbol: Optional[str] = None) -> np.ndarray:
+        """Snapshot timestamps (one symbol, or all symbols merged), ascending."""
+        if symbol is not None:
+            return np.asarray(self._ts.get(symbol, []))
+        if not self._ts:
+            return np.empty(0)
+        return np.sort(np.concatenate([np.asarray(ts) for ts in self._ts.values()]))
+
+    def at(self, symbol: str, t: float) -> Optional[L2Book]:
+        """Book in effect at time t (latest snapshot at or before t)."""
+        ts = self._ts.get(symbol)
+        if not ts:
+            return None
+        i = int(np.searchsorted(ts, t, side="right")) - 1
+        if i < 0:
+            return None
+        cached = self._cache.get(symbol)
+        if cached and cached[0] == i:
+            return cached[1]
+        bids, asks = self._levels[symbol][i]
+        book = L2Book(symbol)
+        book.apply_snapshot(bids, asks, timestamp=ts[i])
+        self._cache[symbol] = (i, book)
+        return book
+
+    def save(self, path: str):
+        with open(path, "w") as f:
+            for symbol, ts in self._ts.items():
+                for t, (bids, asks) in zip(ts, self._levels[symbol]):
+                    f.write(json.dumps({"symbol": symbol, "ts": t, "bids": bids.tolist(), "asks": asks.tolist()}) + "\n")
+
+    @classmethod
+    def load(cls, path: str) -> "BookTape":
+        tape = cls()
+        with open(path) as f:
+            for line in f:
+                if line.strip():
+                    d = json.loads(line)
+                    tape.record(d["symbol"], d["ts"], d["bids"], d["asks"])
+        return tape
+
+
+class BookRecorder:
+    """Appends every synced book update of a live exchange stream to a BookTape."""
+
+    def __init__(self, ex: BaseExchange, tape: Optional[BookTape] = None, depth: int = 20):
+        self.ex = ex
+        self.tape = tape or BookTape()
+        self.depth = depth
+
+    def start(self):
+        if self.ex.stream is None:
+            raise RuntimeError(f"{self.ex.name} stream not started")
+        self.ex.stream.add_listener(self._on_event)
+
+    def stop(self):
+        if self.ex.stream is not None:
+            self.ex.stream.remove_listener(self._on_event)
+
+    def _on_event(self, kind: str, symbol: str):
+        if kind != "orderbook":
+            return
+        book = self.ex.stream.book(symbol)
+        if book is None:
+            return
+        ob = book.to_orderbook(self.depth)
+        self.tape.record(symbol, time.time(), ob.bids, ob.asks)
+
+
+# ── Venue ─────────────────────────────────────────────────────────────────────
+class PaperExchange(BaseExchange):
+    """Simulated venue; symbols are "QUOTE-BASE" (Upbit style) or "BASEQUOTE" (Bybit style)."""
+
+    def __init__(
+        self,
+        name: str,
+        tape: BookTape,
+        clock: Optional[SimClock] = None,
+        latency: Optional[LatencyModel] = None,
+        taker_fee: float = 0.0,
+        maker_fee: Optional[float] = None,
+        category: str = "spot",
+        balances: Optional[dict[str, float]] = None,
+        partial_fill_prob: float = 0.0,
+        min_fill_ratio: float = 0.3,
+        reject_prob: float = 0.0,
+        seed: Optional[int] = None,
+    ):
+        super().__init__()
+        self.name = name
+        self.tape = tape
+        self.clock = clock or SimClock()
+        self.latency = latency or LatencyModel()
+        self.taker_fee = taker_fee
+        self.maker_fee = taker_fee if maker_fee is None else maker_fee
+        self.category = category
+        self.balances: dict[str, float] = dict(balances or {})
+        self.positions: dict[str, float] = {}    # linear: symbol -> signed qty
+        self.partial_fill_prob = partial_fill_prob
+        self.min_fill_ratio = min_fill_ratio
+        self.reject_prob = reject_prob
+        self._rng = random.Random(seed)
+        self._ids = itertools.count(1)
+        self._client_ids = itertools.count(1)
+        self._client_orders: dict[str, str] = {}   # client id -> order id
+        self.orders: dict[str, Order] = {}
+        self.fills: list[dict] = []
+
+    @staticmethod
+    def split_symbol(symbol: str) -> tuple[str, str]:
+        """(base, quote)."""
+        if "-" in symbol:
+            quote, base = symbol.split("-", 1)
+            return base, quote
+        for quote in ("USDT", "USDC", "BTC", "KRW"):
+            if symbol.endswith(quote) and len(symbol) > len(quote):
+                return symbol[:-len(quote)], quote
+        raise ValueError(f"Unknown symbol format: {symbol}")
+
+    def _book(self, symbol: str) -> L2Book:
+        book = self.tape.at(symbol, self.clock.now())
+        if book is None:
+            raise RuntimeError(f"{self.name}: no recorded book for {symbol} at {self.clock.now():.3f}")
+        return book
+
+    # ── Market data ──────────────────────────────────────────────────────────
+    async def get_ticker(self, symbol: str) -> Ticker:
+        book = self._book(symbol)
+        return Ticker(symbol=symbol, price=book.mid() or 0.0, volume_24h=0.0, change_24h=0.0,
+                      timestamp=self.clock.now())
+
+    async def get_orderbook(self, symbol: str, depth: int = 10) -> OrderBook:
+        return self._book(symbol).to_orderbook(depth)
+
+    async def get_ohlcv(self, symbol: str, interval: str = "1m", limit: int = 200,
+                        before: Optional[int] = None) -> list:
+        return []
+
+    # ── Account ───────────────────────────────────────────────────────────────
+    async def get_balances(self) -> list[Balance]:
+        return [Balance(currency=c, available=v, locked=0.0) for c, v in self.balances.items()]
+
+    async def get_positions(self, symbol: str = None) -> list:
+        return [
+            {"symbol": s, "size": abs(q), "side": "Buy" if q > 0 else "Sell"}
+            for s, q in self.positions.items() if q and (symbol is None or s == symbol)
+        ]
+
+    # ── Trading ───────────────────────────────────────────────────────────────
+    async def place_order(self, symbol: str, side: str, order_type: str = "market", qty: float = None,
+                          price: Optional[float] = None, krw_amount: Optional[float] = None,
+                          reduce_only: bool = False) -> Order:
+        return await self.send_order(self.prepare_order(symbol, side, order_type, qty, price, krw_amount, reduce_only))
+
+    def prepare_order(self, symbol: str, side: str, order_type: str = "market", qty: float = None,
+                      price: Optional[float] = None, krw_amount: Optional[float] = None,
+                      reduce_only: bool = False) -> PreparedOrder:
+        """Accepts both connector dialects: 'bid'/'ask' + krw_amount (Upbit), 'buy'/'sell' (Bybit)."""
+        body = {"qty": qty, "price": price, "quote_amount": krw_amount, "reduce_only": reduce_only}
+        return PreparedOrder(
+            symbol=symbol, side=side, order_type=order_type.lower(), qty=qty or 0, price=price or 0,
+            path="paper", body=json.dumps(body), headers={}, created=time.time(),
+            client_id=f"{self.name}-c{next(self._client_ids)}",
+        )
+
+    async def send_order(self, prepared: PreparedOrder) -> Order:
+        await self.clock.sleep(self.latency.sample())
+        if self.reject_prob and self._rng.random() < self.reject_prob:
+            await self.clock.sleep(self.latency.sample())
+            raise OrderRejected(f"{self.name}: order rejected (simulated)")
+        order = self._match(prepared)
+        await self.clock.sleep(self.latency.sample())
+        return order
+
+    def _match(self, prepared: PreparedOrder) -> Order:
+        body = json.loads(prepared.body)
+        side = "buy" if prepared.side.lower() in ("bid", "buy") else "sell"
+        book = self._book(prepared.symbol)
+        prices, cum_qty, cum_cost = book.ladder(side)
+
+        qty = body["qty"] or 0.0
+        if not qty and body["quote_amount"]:   # 시장가 매수 금액 지정 → 호가를 훑어 수량 환산
+            amount = body["quote_amount"]
+            k = int(np.searchsorted(cum_cost, amount, side="left"))
+            if k >= len(prices):
+                qty = float(cum_qty[-1]) if len(cum_qty) else 0.0
+            else:
+                prev_qty = cum_qty[k - 1] if k else 0.0
+                prev_cost = cum_cost[k - 1] if k else 0.0
+                qty = float(prev_qty + (amount - prev_cost) / prices[k])
+
+        available = float(cum_qty[-1]) if len(cum_qty) else 0.0
+        if prepared.order_type == "limit" and body["price"]:
+            limit = body["price"]
+            marketable = prices <= limit if side == "buy" else prices >= limit
+            n = int(np.count_nonzero(marketable))   # ladder 는 체결 순서이므로 앞쪽 n 개
+            available = float(cum_qty[n - 1]) if n else 0.0
+        fill = min(qty, available)
+        if fill > 0:
+            limit_px = body["price"] if prepared.order_type == "limit" and body["price"] else None
+            cost = fill * limit_px if limit_px and side == "buy" else float(book.cost_to_fill(side, fill))
+            self._check_balance(prepared.symbol, side, fill, cost, body["reduce_only"])
+        if fill > 0 and self.partial_fill_prob and self._rng.random() < self.partial_fill_prob:
+            fill *= self._rng.uniform(self.min_fill_ratio, 1.0)
+
+        avg = float(book.cost_to_fill(side, fill) / fill) if fill > 0 else 0.0
+        if prepared.order_type == "limit":
+            status = "filled" if fill >= qty else "open"
+        else:
+            status = "filled" if fill >= qty else "partiallyfilledcanceled"
+        order = Order(
+            order_id=f"{self.name}-{next(self._ids)}",
+            symbol=prepared.symbol,
+            side=side,
+            order_type=prepared.order_type,
+            price=avg or (body["price"] or 0.0),
+            qty=qty,
+            filled_qty=fill,
+            status=status,
+            timestamp=self.clock.now(),
+            avg_price=avg,
+        )
+        self.orders[order.order_id] = order
+        if prepared.client_id:
+            self._client_orders[prepared.client_id] = order.order_id
+        if fill > 0:
+            self._settle(prepared.symbol, side, fill, avg)
+        return order
+
+    def _check_balance(self, symbol: str, side: str, qty: float, cost: float, reduce_only: bool):
+        base, quote = self.split_symbol(symbol)
+        if self.category == "linear":
+            if reduce_only:
+                return
+            currency, need = quote, cost + self.calc_fee(cost, symbol=symbol)
+        elif side == "buy":
+            currency, need = quote, cost + self.calc_fee(cost, symbol=symbol)
+        else:
+            currency, need = base, qty
+        if need > self.balances.get(currency, 0.0) * (1 + 1e-9):
+            raise OrderRejected(
+                f"{self.name}: insufficient {currency} balance "
+                f"({self.balances.get(currency, 0.0):.8g} < {need:.8g})"
+            )
+
+    def _settle(self, symbol: str, side: str, qty: float, price: float):
+        base, quote = self.split_symbol(symbol)
+        notional = qty * price
+        fee = self.calc_fee(notional, symbol=symbol)
+        sign = 1 if side == "buy" else -1
+        if self.category == "linear":
+            self.positions[symbol] = self.positions.get(symbol, 0.0) + sign * qty
+            self.balances[quote] = self.balances.get(quote, 0.0) - fee
+        else:
+            self.balances[base] = self.balances.get(base, 0.0) + sign * qty
+            self.balances[quote] = self.balances.get(quote, 0.0) - sign * notional - fee
+        self.fills.append({"ts": self.clock.now(), "symbol": symbol, "side": side,
+                           "qty": qty, "price": price, "fee": fee})
+
+    async def cancel_order(self, symbol: str, order_id: str) -> bool:
+        await self.clock.sleep(2 * self.latency.sample())
+        order = self.orders.get(order_id)
+        if order is None or order.status != "open":
+            return False
+        order.status = "cancelled"
+        return True
+
+    async def get_order(self, symbol: str, order_id: str) -> Order:
+        await self.clock.sleep(2 * self.latency.sample())
+        if order_id not in self.orders:
+            raise LookupError(f"{self.name}: unknown order {order_id}")
+        return self.orders[order_id]
+
+    async def get_order_by_client_id(self, symbol: str, client_id: str) -> Order:
+        await self.clock.sleep(2 * self.latency.sample())
+        if client_id not in self._client_orders:
+            raise LookupError(f"{self.name}: unknown client order {client_id}")
+        return self.orders[self._client_orders[client_id]]
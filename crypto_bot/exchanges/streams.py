@@ -0,0 +1,323 @@
+"""Streaming market data: Upbit websocket and Bybit V5 public streams.
+
+A MarketStream keeps one websocket open, subscribes again after every
+(re)connect and folds the messages into the latest Ticker / L2 book / trade
+per symbol. While the stream is connected the exchange connectors answer
+get_ticker / get_orderbook from it without a network call.
+"""
+import asyncio
+import json
+import logging
+import time
+import uuid
+from typing import Callable, Optional
+
+import aiohttp
+
+from .base import Ticker, OrderBook
+from .orderbook import L2Book
+
+logger = logging.getLogger(__name__)
+
+UPBIT_WS = "wss://api.upbit.com/websocket/v1"
+BYBIT_WS = "wss://stream.bybit.com/v5/public/{category}"
+
+RECONNECT_MIN = 1.0    # seconds; doubles per failed attempt
+RECONNECT_MAX = 30.0
+
+
+class MarketStream:
+    """One websocket connection with reconnect + resubscribe."""
+    name: str = "base"
+    ping_interval: float = 20.0
+
+    def __init__(self, symbols: list[str], url: str,
+                 session_factory: Optional[Callable[[], aiohttp.ClientSession]] = None):
+        self.url = url
+        self.symbols: list[str] = list(dict.fromkeys(symbols))
+        self.tickers: dict[str, Ticker] = {}
+        self.trades: dict[str, dict] = {}     # symbol -> latest {price, qty, side, timestamp}
+        self.books: dict[str, L2Book] = {}
+        self.connected = False
+        self.reconnects = 0
+        self.last_message = 0.0
+        self._session_factory = session_factory
+        self._own_session: Optional[aiohttp.ClientSession] = None
+        self._ws: Optional[aiohttp.ClientWebSocketResponse] = None
+        self._task: Optional[asyncio.Task] = None
+        self._listeners: list[Callable[[str, str], None]] = []
+
+    # ── Listeners ─────────────────────────────────────────────────────────────
+    def add_listener(self, callback: Callable[[str, str], None]):
+        """callback(kind, symbol) after every ticker / orderbook update. Must not block."""
+        if callback not in self._listeners:
+            self._listeners.append(callback)
+
+    def remove_listener(self, callback: Callable[[str, str], None]):
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+
+    def _notify(self, kind: str, symbol: str):
+        for callback in self._listeners:
+            try:
+                callback(kind, symbol)
+            except Exception as e:
+                logger.warning(f"[{self.name}] 리스너 오류: {e}")
+
+    # ── Lifecycle ─────────────────────────────────────────────────────────────
+    async def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def close(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+        self.connected = False
+        if self._own_session:
+            await self._own_session.close()
+            self._own_session = None
+
+    async def subscribe(self, symbols: list[str]):
+        """Add symbols; sent right away when connected, and on every reconnect."""
+        new = [s for s in dict.fromkeys(symbols) if s not in self.symbols]
+        if not new:
+            return
+        self.symbols.extend(new)
+        if self._ws is not None and not self._ws.closed:
+            for msg in self._subscribe_messages(new):
+                await self._ws.send_str(json.dumps(msg))
+
+    def _session(self) -> aiohttp.ClientSession:
+        if self._session_factory:
+            return self._session_factory()
+        if self._own_session is None or self._own_session.closed:
+            self._own_session = aiohttp.ClientSession()
+        return self._own_session
+
+    async def _run(self):
+        delay = RECONNECT_MIN
+        while True:
+            try:
+                async with self._session().ws_connect(self.url, heartbeat=self.ping_interval) as ws:
+                    self._ws = ws
+                    if self.symbols:
+                        for msg in self._subscribe_messages(self.symbols):
+                            await ws.send_str(json.dumps(msg))
+                    self.connected = True
+                    delay = RECONNECT_MIN
+                    logger.info(f"[{self.name}] 스트림 연결: {self.url} ({len(self.symbols)}개 심볼)")
+                    keepalive = asyncio.create_task(self._keepalive(ws))
+                    try:
+                        async for msg in ws:
+                            if msg.type in (aiohttp.WSMsgType.TEXT, aiohttp.WSMsgType.BINARY):
+                                self.last_message = time.time()
+                                self._handle(json.loads(msg.data))
+                            elif msg.type == aiohttp.WSMsgType.ERROR:
+                                break
+                    finally:
+                        keepalive.cancel()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"[{self.name}] 스트림 오류: {e}")
+            finally:
+                self._ws = None
+                self.connected = False
+                self.books.clear()   # rebuilt from the snapshots sent on resubscribe
+            self.reconnects += 1
+            logger.info(f"[{self.name}] {delay:.0f}초 후 재연결")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, RECONNECT_MAX)
+
+    async def _keepalive(self, ws: aiohttp.ClientWebSocketResponse):
+        """Application-level ping for venues that want one (ws ping frames are automatic)."""
+        msg = self._ping_message()
+        if msg is None:
+            return
+        while not ws.closed:
+            await asyncio.sleep(self.ping_interval)
+            await ws.send_str(json.dumps(msg))
+
+    # ── Venue specifics ──────────────────────────────────────────────────────
+    def _subscribe_messages(self, symbols: list[str]) -> list:
+        raise NotImplementedError
+
+    def _ping_message(self) -> Optional[dict]:
+        return None
+
+    def _handle(self, data):
+        raise NotImplementedError
+
+    # ── Reads (no I/O) ────────────────────────────────────────────────────────
+    def ticker(self, symbol: str) -> Optional[Ticker]:
+        """Latest ticker, or None while disconnected / not yet received."""
+        return self.tickers.get(symbol) if self.connected else None
+
+    def book(self, symbol: str) -> Optional[L2Book]:
+        """Live local book, or None while disconnected / resyncing."""
+        book = self.books.get(symbol)
+        return book if self.connected and book is not None and book.synced else None
+
+    def orderbook(self, symbol: str, depth: int = 10) -> Optional[OrderBook]:
+        book = self.book(symbol)
+        return book.to_orderbook(depth) if book else None
+
+    def status(self) -> dict:
+        return {
+            "url": self.url,
+            "connected": self.connected,
+            "symbols": self.symbols,
+            "reconnects": self.reconnects,
+            "books_synced": sum(b.synced for b in self.books.values()),
+            "last_message": self.last_message,
+        }
+
+
+# ── Upbit ───────────────────────────────────────────────────────────────────────
+class UpbitStream(MarketStream):
+    name = "upbit"
+
+    def __init__(self, symbols: list[str], url: str = UPBIT_WS, session_factory=None):
+        super().__init__(symbols, url, session_factory)
+
+    def _subscribe_messages(self, symbols: list[str]) -> list:
+        # A new request replaces the connection's subscription, so always send every symbol
+        codes = self.symbols
+        return [[
+            {"ticket": str(uuid.uuid4())},
+            {"type": "ticker", "codes": codes},
+            {"type": "orderbook", "codes": codes},
+            {"type": "trade", "codes": codes},
+        ]]
+
+    def _handle(self, data):
+        kind = data.get("type")
+        symbol = data.get("code")
+        if kind == "ticker":
+            self.tickers[symbol] = Ticker(
+                symbol=symbol,
+                price=data["trade_price"],
+                volume_24h=data["acc_trade_volume_24h"],
+                change_24h=data["signed_change_rate"] * 100,
+                timestamp=data["timestamp"] / 1000,
+            )
+            self._notify("ticker", symbol)
+        elif kind == "orderbook":
+            units = data["orderbook_units"]   # full snapshot every message
+            book = self.books.get(symbol) or self.books.setdefault(symbol, L2Book(symbol))
+            book.apply_snapshot(
+                [[u["bid_price"], u["bid_size"]] for u in units],
+                [[u["ask_price"], u["ask_size"]] for u in units],
+                timestamp=data["timestamp"] / 1000,
+            )
+            self._notify("orderbook", symbol)
+        elif kind == "trade":
+            self.trades[symbol] = {
+                "price": data["trade_price"],
+                "qty": data["trade_volume"],
+                "side": "sell" if data["ask_bid"] == "ASK" else "buy",
+                "timestamp": data.get("trade_timestamp", data["timestamp"]) / 1000,
+            }
+        elif "error" in data:
+            logger.warning(f"[upbit] 스트림 오류 응답: {data['error']}")
+
+
+# ── Bybit V5 ────────────────────────────────────────────────────────────────────
+class BybitStream(MarketStream):
+    name = "bybit"
+    book_depth = 50
+    args_per_request = 10   # spot accepts at most 10 args per subscribe
+
+    def __init__(self, symbols: list[str], category: str = "spot", url: Optional[str] = None,
+                 session_factory=None):
+        super().__init__(symbols, url or BYBIT_WS.format(category=category), session_factory)
+        self.category = category
+        self._raw_tickers: dict[str, dict] = {}   # linear tickers arrive as snapshot + deltas
+        self._resyncing: set[str] = set()   # orderbook topics waiting for a new snapshot
+        self._resync_tasks: set[asyncio.Task] = set()
+        self.resyncs = 0
+
+    async def close(self):
+        for task in list(self._resync_tasks):
+            task.cancel()
+        if self._resync_tasks:
+            await asyncio.gather(*self._resync_tasks, return_exceptions=True)
+        self._resync_tasks.clear()
+        self._resyncing.clear()
+        await super().close()
+
+    def _subscribe_messages(self, symbols: list[str]) -> list:
+        args = [
+            topic
+            for s in symbols
+            for topic in (f"tickers.{s}", f"orderbook.{self.book_depth}.{s}", f"publicTrade.{s}")
+        ]
+        step = self.args_per_request
+        return [{"op": "subscribe", "args": args[i:i + step]} for i in range(0, len(args), step)]
+
+    def _ping_message(self) -> Optional[dict]:
+        return {"op": "ping"}
+
+    def _handle(self, data):
+        topic = data.get("topic")
+        if not topic:
+            if data.get("success") is False:
+                logger.warning(f"[bybit] 구독 실패: {data.get('ret_msg')}")
+            return
+        kind = topic.split(".", 1)[0]
+        if kind == "tickers":
+            self._on_ticker(data)
+        elif kind == "orderbook":
+            self._on_orderbook(data)
+        elif kind == "publicTrade" and data["data"]:
+            t = data["data"][-1]
+            self.trades[t["s"]] = {
+                "price": float(t["p"]),
+                "qty": float(t["v"]),
+                "side": t["S"].lower(),
+                "timestamp": t["T"] / 1000,
+            }
+
+    def _on_ticker(self, data):
+        d = data["data"]
+        symbol = d["symbol"]
+        raw = self._raw_tickers.setdefault(symbol, {})
+        if data.get("type") == "snapshot":
+            raw.clear()
+        raw.update(d)
+        if "lastPrice" not in raw:
+            return
+        self.tickers[symbol] = Ticker(
+            symbol=symbol,
+            price=float(raw["lastPrice"]),
+            volume_24h=float(raw.get("volume24h", raw.get("turnover24h", 0))),
+            change_24h=float(raw.get("price24hPcnt", 0)) * 100,
+            timestamp=data.get("ts", time.time() * 1000) / 1000,
+        )
+        self._notify("ticker", symbol)
+
+    def _on_orderbook(self, data):
+        topic, symbol = data["topic"], data["data"]["s"]
+        book = self.books.get(symbol) or self.books.setdefault(symbol, L2Book(symbol))
+        if book.apply_bybit(data):
+            self._resyncing.discard(topic)
+            self._notify("orderbook", symbol)
+        elif topic not in self._resyncing:
+            # Update id gap: resubscribe to get a fresh snapshot
+            logger.warning(f"[bybit] {symbol} 호가 시퀀스 누락 (u={data['data'].get('u')}) → 재동기화")
+            self.resyncs += 1
+            self._resyncing.add(topic)
+            # 여러 토픽이 동시에 끊길 수 있으므로 태스크를 모두 보관 (GC·덮어쓰기 방지)
+            task = asyncio.create_task(self._resubscribe(topic))
+            self._resync_tasks.add(task)
+            task.add_done_callback(self._resync_tasks.discard)
+
+    async def _resubscribe(self, topic: str):
+        if self._ws is not None and not self._ws.closed:
+            await self._ws.send_str(json.dumps({"op": "unsubscribe", "args": [topic]}))
+            await self._ws.send_str(json.dumps({"op": "subscribe", "args": [topic]}))
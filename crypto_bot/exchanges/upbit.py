@@ -1,5 +1,7 @@
 """Upbit exchange connector (KRW spot market)."""
 import hashlib
+import json
+import time
 import uuid
 import asyncio
 import logging
@@ -9,17 +11,27 @@ from urllib.parse import urlencode
 import aiohttp
 import jwt
 
-from .base import BaseExchange, Ticker, OrderBook, Balance, Order, FundingRate
+from .base import BaseExchange, Ticker, OrderBook, Balance, Order, FundingRate, PreparedOrder, OrderRejected
+from .streams import UpbitStream
 
 logger = logging.getLogger(__name__)
 
 UPBIT_BASE = "https://api.upbit.com/v1"
+ORDERBOOK_CHUNK = 100   # markets per bulk /orderbook request
 
 
 class UpbitExchange(BaseExchange):
     name = "upbit"
     taker_fee = 0.0005   # 0.05%
     maker_fee = 0.0005
+    quote_fees = {"BTC": 0.0025, "USDT": 0.0025}   # BTC/USDT 마켓 수수료 (maker = taker)
+
+    def fee_rate(self, is_taker: bool = True, symbol: Optional[str] = None) -> float:
+        if symbol:
+            quote = symbol.split("-", 1)[0]
+            if quote in self.quote_fees:
+                return self.quote_fees[quote]
+        return super().fee_rate(is_taker, symbol)
 
     # ── Internal helpers ─────────────────────────────────────────────────────
     def _auth_header(self, query_params: dict = None) -> dict:
@@ -35,38 +47,54 @@ class UpbitExchange(BaseExchange):
 
     async def _get(self, path: str, params: dict = None, auth: bool = False):
         headers = self._auth_header(params) if auth else {}
-        async with aiohttp.ClientSession() as session:
-            async with session.get(
-                f"{UPBIT_BASE}{path}", params=params, headers=headers, timeout=aiohttp.ClientTimeout(total=10)
-            ) as resp:
-                resp.raise_for_status()
-                return await resp.json()
+        session = self._session()
+        async with session.get(
+            f"{UPBIT_BASE}{path}", params=params, headers=headers, timeout=aiohttp.ClientTimeout(total=10)
+        ) as resp:
+            resp.raise_for_status()
+            return await resp.json()
 
     async def _post(self, path: str, data: dict):
         headers = self._auth_header(data)
         headers["Content-Type"] = "application/json"
-        async with aiohttp.ClientSession() as session:
-            async with session.post(
-                f"{UPBIT_BASE}{path}", json=data, headers=headers, timeout=aiohttp.ClientTimeout(total=10)
-            ) as resp:
-                resp.raise_for_status()
-                return await resp.json()
+        session = self._session()
+        async with session.post(
+            f"{UPBIT_BASE}{path}", json=data, headers=headers, timeout=aiohttp.ClientTimeout(total=10)
+        ) as resp:
+            resp.raise_for_status()
+            return await resp.json()
 
     async def _delete(self, path: str, params: dict):
         headers = self._auth_header(params)
-        async with aiohttp.ClientSession() as session:
-            async with session.delete(
-                f"{UPBIT_BASE}{path}", params=params, headers=headers, timeout=aiohttp.ClientTimeout(total=10)
-            ) as resp:
-                resp.raise_for_status()
-                return await resp.json()
+        session = self._session()
+        async with session.delete(
+            f"{UPBIT_BASE}{path}", params=params, headers=headers, timeout=aiohttp.ClientTimeout(total=10)
+        ) as resp:
+            resp.raise_for_status()
+            return await resp.json()
+
+    def _make_stream(self, symbols: list[str]) -> UpbitStream:
+        return UpbitStream(symbols, session_factory=self._session)
 
     # ── Market data ──────────────────────────────────────────────────────────
     async def get_ticker(self, symbol: str = "KRW-BTC") -> Ticker:
+        live = self._live_ticker(symbol)
+        if live:
+            return live
         data = await self._get("/ticker", {"markets": symbol})
-        d = data[0]
+        return self._ticker(data[0])
+
+    async def get_tickers(self, symbols: list[str]) -> dict[str, Ticker]:
+        """Tickers for many markets in one request."""
+        if not symbols:
+            return {}
+        data = await self._get("/ticker", {"markets": ",".join(symbols)})
+        return {d["market"]: self._ticker(d) for d in data}
+
+    @staticmethod
+    def _ticker(d: dict) -> Ticker:
         return Ticker(
-            symbol=symbol,
+            symbol=d["market"],
             price=d["trade_price"],
             volume_24h=d["acc_trade_volume_24h"],
             change_24h=d["signed_change_rate"] * 100,
@@ -74,6 +102,9 @@ class UpbitExchange(BaseExchange):
         )
 
     async def get_orderbook(self, symbol: str = "KRW-BTC", depth: int = 10) -> OrderBook:
+        live = self._live_orderbook(symbol, depth)
+        if live:
+            return live
         data = await self._get("/orderbook", {"markets": symbol})
         ob = data[0]
         units = ob["orderbook_units"][:depth]
@@ -81,7 +112,17 @@ class UpbitExchange(BaseExchange):
         asks = [[u["ask_price"], u["ask_size"]] for u in units]
         return OrderBook(bids=bids, asks=asks, timestamp=ob["timestamp"] / 1000)
 
-    async def get_ohlcv(self, symbol: str = "KRW-BTC", interval: str = "1m", limit: int = 200) -> list:
+    async def get_best_quotes(self, symbols: list[str]) -> dict[str, tuple[float, float]]:
+        """Best (bid, ask) for many markets, ORDERBOOK_CHUNK markets per request."""
+        chunks = [symbols[i:i + ORDERBOOK_CHUNK] for i in range(0, len(symbols), ORDERBOOK_CHUNK)]
+        pages = await asyncio.gather(*(self._get("/orderbook", {"markets": ",".join(c)}) for c in chunks))
+        return {
+            ob["market"]: (ob["orderbook_units"][0]["bid_price"], ob["orderbook_units"][0]["ask_price"])
+            for page in pages for ob in page if ob["orderbook_units"]
+        }
+
+    async def get_ohlcv(self, symbol: str = "KRW-BTC", interval: str = "1m", limit: int = 200,
+                        before: Optional[int] = None) -> list:
         interval_map = {
             "1m": ("minutes/1", {}),
             "3m": ("minutes/3", {}),
@@ -95,6 +136,10 @@ class UpbitExchange(BaseExchange):
         }
         path_suffix, extra = interval_map.get(interval, ("minutes/1", {}))
         params = {"market": symbol, "count": min(limit, 200), **extra}
+        if before:
+            # 'to' is exclusive; candle timestamps are YYYYMMDDHHMMSS (UTC)
+            t = str(before)
+            params["to"] = f"{t[:4]}-{t[4:6]}-{t[6:8]}T{t[8:10]}:{t[10:12]}:{t[12:14]}Z"
         data = await self._get(f"/candles/{path_suffix}", params)
         # Upbit returns newest-first; reverse to oldest-first
         data = list(reversed(data))
@@ -110,9 +155,10 @@ class UpbitExchange(BaseExchange):
             for d in data
         ]
 
-    async def get_all_markets(self) -> list[str]:
+    async def get_all_markets(self, quote: Optional[str] = "KRW") -> list[str]:
+        """Market codes ("KRW-BTC", "BTC-XRP", ...); quote=None returns every quote market."""
         data = await self._get("/market/all", {"isDetails": "false"})
-        return [m["market"] for m in data if m["market"].startswith("KRW-")]
+        return [m["market"] for m in data if quote is None or m["market"].startswith(f"{quote}-")]
 
     # ── Account ───────────────────────────────────────────────────────────────
     async def get_balances(self) -> list[Balance]:
@@ -143,6 +189,17 @@ class UpbitExchange(BaseExchange):
         price: Optional[float] = None,
         krw_amount: Optional[float] = None,
     ) -> Order:
+        return await self.send_order(self.prepare_order(symbol, side, order_type, qty, price, krw_amount))
+
+    def prepare_order(
+        self,
+        symbol: str,
+        side: str,
+        order_type: str = "market",
+        qty: float = None,
+        price: Optional[float] = None,
+        krw_amount: Optional[float] = None,
+    ) -> PreparedOrder:
         data: dict = {"market": symbol, "side": side}
 
         if order_type == "market":
@@ -157,8 +214,25 @@ class UpbitExchange(BaseExchange):
             data["price"] = str(price)
             data["volume"] = str(qty)
 
-        resp = await self._post("/orders", data)
-        return self._parse_order(resp)
+        data["identifier"] = uuid.uuid4().hex   # 응답을 못 받아도 이 값으로 주문 조회
+        headers = self._auth_header(data)
+        headers["Content-Type"] = "application/json"
+        return PreparedOrder(
+            symbol=symbol, side=side, order_type=order_type, qty=qty or 0, price=price or 0,
+            path="/orders", body=json.dumps(data), headers=headers, created=time.time(),
+            client_id=data["identifier"],
+        )
+
+    async def send_order(self, prepared: PreparedOrder) -> Order:
+        session = self._session()
+        async with session.post(
+            f"{UPBIT_BASE}{prepared.path}", data=prepared.body, headers=prepared.headers,
+            timeout=aiohttp.ClientTimeout(total=10),
+        ) as resp:
+            if 400 <= resp.status < 500:   # 거래소가 거절 → 주문은 생성되지 않음
+                raise OrderRejected(f"Upbit order rejected ({resp.status}): {await resp.text()}")
+            resp.raise_for_status()
+            return self._parse_order(await resp.json())
 
     async def cancel_order(self, symbol: str, order_id: str) -> bool:
         try:
@@ -171,7 +245,15 @@ class UpbitExchange(BaseExchange):
         data = await self._get("/order", {"uuid": order_id}, auth=True)
         return self._parse_order(data)
 
+    async def get_order_by_client_id(self, symbol: str, client_id: str) -> Order:
+        data = await self._get("/order", {"identifier": client_id}, auth=True)
+        return self._parse_order(data)
+
     def _parse_order(self, d: dict) -> Order:
+        executed = float(d.get("executed_volume") or 0)
+        funds = d.get("executed_funds")
+        if funds is None and d.get("trades"):
+            funds = sum(float(t.get("funds") or 0) for t in d["trades"])
         return Order(
             order_id=d.get("uuid", ""),
             symbol=d.get("market", ""),
@@ -179,7 +261,8 @@ class UpbitExchange(BaseExchange):
             order_type=d.get("ord_type", ""),
             price=float(d.get("price") or 0),
             qty=float(d.get("volume") or 0),
-            filled_qty=float(d.get("executed_volume") or 0),
+            filled_qty=executed,
             status=d.get("state", ""),
             timestamp=0,
+            avg_price=float(funds) / executed if executed and funds else 0.0,
         )
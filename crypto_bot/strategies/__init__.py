@@ -1,9 +1,13 @@
-from .indicators import compute_indicators, IndicatorResult
+from .indicators import (
+    compute_indicators, IndicatorResult, IndicatorState,
+    compute_indicators_batch, compute_indicator_series, IndicatorColumns, stack_ohlcv,
+)
 from .auto_strategy import AutoStrategy, AutoStrategyConfig, TradeRecord
 from .user_strategy import UserStrategy, UserStrategyConfig, DropLevel
 
 __all__ = [
-    "compute_indicators", "IndicatorResult",
+    "compute_indicators", "IndicatorResult", "IndicatorState",
+    "compute_indicators_batch", "compute_indicator_series", "IndicatorColumns", "stack_ohlcv",
     "AutoStrategy", "AutoStrategyConfig", "TradeRecord",
     "UserStrategy", "UserStrategyConfig", "DropLevel",
 ]
@@ -6,7 +6,7 @@ from dataclasses import dataclass, field
 from typing import Optional
 
 from ..exchanges.base import BaseExchange
-from .indicators import compute_indicators, IndicatorResult
+from .indicators import IndicatorState, IndicatorResult
 
 logger = logging.getLogger(__name__)
 
@@ -50,20 +50,25 @@ class AutoStrategyConfig:
 
 
 class AutoStrategy:
-    def __init__(self, exchange: BaseExchange, config: AutoStrategyConfig):
+    def __init__(self, exchange: BaseExchange, config: AutoStrategyConfig, candle_store=None):
         self.exchange = exchange
         self.cfg = config
+        self.candle_store = candle_store   # optional CandleStore for cached candles
         self.position: Optional[dict] = None   # {price, qty, high_price}
         self.last_trade_time: float = 0
         self.trade_history: list[TradeRecord] = []
         self.running = False
         self._task = None
+        self._indicators = IndicatorState()
 
     async def analyze(self) -> dict:
         """Run full analysis and return recommendation."""
-        ohlcv = await self.exchange.get_ohlcv(self.cfg.symbol, self.cfg.interval, 200)
+        if self.candle_store:
+            ohlcv = await self.candle_store.get_ohlcv(self.exchange, self.cfg.symbol, self.cfg.interval, 200)
+        else:
+            ohlcv = await self.exchange.get_ohlcv(self.cfg.symbol, self.cfg.interval, 200)
         ticker = await self.exchange.get_ticker(self.cfg.symbol)
-        indicators = compute_indicators(ohlcv)
+        indicators = self._indicators.sync(ohlcv)
         if not indicators:
             return {"error": "Not enough data"}
 
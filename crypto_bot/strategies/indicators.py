@@ -1,5 +1,6 @@
 """Technical indicators - pure numpy, no TA-Lib dependency required."""
 import numpy as np
+from collections import deque
 from dataclasses import dataclass
 from typing import Optional
 
@@ -47,9 +48,44 @@ def compute_indicators(ohlcv: list) -> Optional[IndicatorResult]:
 
     arr = np.array(ohlcv, dtype=float)
     closes = arr[:, 4]
-    highs = arr[:, 2]
-    lows = arr[:, 3]
-    volumes = arr[:, 5]
+
+    # ── MACD (12, 26, 9) ─────────────────────────────────────────────────────
+    ema12 = _ema(closes, 12)
+    ema26 = _ema(closes, 26)
+    macd_line = ema12 - ema26
+    signal_line = _ema(macd_line, 9)
+
+    # ── EMAs ─────────────────────────────────────────────────────────────────
+    ema5_val = _ema(closes, 5)[-1]
+    ema20_val = _ema(closes, 20)[-1]
+    ema60_val = _ema(closes, 60)[-1] if len(closes) >= 60 else closes[-1]
+    ema120_val = _ema(closes, 120)[-1] if len(closes) >= 120 else closes[-1]
+
+    return _build_result(
+        arr[-WINDOW_TAIL:, 2:6],
+        float(macd_line[-1]), float(signal_line[-1]),
+        ema5_val, ema20_val, ema60_val, ema120_val,
+    )
+
+
+# Longest look-back of the windowed indicators (BB / volume 20, Stoch D 17).
+WINDOW_TAIL = 20
+
+
+def _build_result(
+    hlcv: np.ndarray,
+    macd: float,
+    macd_signal: float,
+    ema5_val: float,
+    ema20_val: float,
+    ema60_val: float,
+    ema120_val: float,
+) -> IndicatorResult:
+    """Windowed indicators + scoring from the last WINDOW_TAIL [high, low, close, volume] rows."""
+    highs = hlcv[:, 0]
+    lows = hlcv[:, 1]
+    closes = hlcv[:, 2]
+    volumes = hlcv[:, 3]
 
     # ── RSI (14) ──────────────────────────────────────────────────────────────
     deltas = np.diff(closes)
@@ -61,11 +97,7 @@ def compute_indicators(ohlcv: list) -> Optional[IndicatorResult]:
     rsi = 100 - 100 / (1 + rs)
 
     # ── MACD (12, 26, 9) ─────────────────────────────────────────────────────
-    ema12 = _ema(closes, 12)
-    ema26 = _ema(closes, 26)
-    macd_line = ema12 - ema26
-    signal_line = _ema(macd_line, 9)
-    macd_hist = macd_line[-1] - signal_line[-1]
+    macd_hist = macd - macd_signal
 
     # ── Bollinger Bands (20, 2σ) ─────────────────────────────────────────────
     sma20 = np.mean(closes[-20:])
@@ -73,12 +105,6 @@ def compute_indicators(ohlcv: list) -> Optional[IndicatorResult]:
     bb_upper = sma20 + 2 * std20
     bb_lower = sma20 - 2 * std20
 
-    # ── EMAs ─────────────────────────────────────────────────────────────────
-    ema5_val = _ema(closes, 5)[-1]
-    ema20_val = _ema(closes, 20)[-1]
-    ema60_val = _ema(closes, 60)[-1] if len(closes) >= 60 else closes[-1]
-    ema120_val = _ema(closes, 120)[-1] if len(closes) >= 120 else closes[-1]
-
     # ── Volume ratio ─────────────────────────────────────────────────────────
     vol_avg = np.mean(volumes[-20:])
     vol_ratio = volumes[-1] / vol_avg if vol_avg > 0 else 1.0
@@ -118,9 +144,9 @@ def compute_indicators(ohlcv: list) -> Optional[IndicatorResult]:
         score -= 12
 
     # MACD (weight 20)
-    if macd_hist > 0 and macd_line[-1] > signal_line[-1]:
+    if macd_hist > 0 and macd > macd_signal:
         score += 20
-    elif macd_hist < 0 and macd_line[-1] < signal_line[-1]:
+    elif macd_hist < 0 and macd < macd_signal:
         score -= 20
 
     # Bollinger Bands (weight 15)
@@ -174,8 +200,8 @@ def compute_indicators(ohlcv: list) -> Optional[IndicatorResult]:
 
     return IndicatorResult(
         rsi=round(rsi, 2),
-        macd=round(float(macd_line[-1]), 6),
-        macd_signal=round(float(signal_line[-1]), 6),
+        macd=round(macd, 6),
+        macd_signal=round(macd_signal, 6),
         macd_hist=round(macd_hist, 6),
         bb_upper=round(bb_upper, 2),
         bb_mid=round(sma20, 2),
@@ -192,3 +218,336 @@ def compute_indicators(ohlcv: list) -> Optional[IndicatorResult]:
         signal=signal,
         score=round(score, 2),
     )
+
+
+class IndicatorState:
+    """Streaming version of compute_indicators.
+
+    Feed candles one at a time with update(); a candle with the same timestamp
+    as the last one replaces it (the still-forming bar). EMAs are advanced one
+    step and the windowed indicators only look at the last WINDOW_TAIL bars, so
+    each update costs the same no matter how much history has been seen.
+    """
+
+    EMA_PERIODS = (5, 12, 20, 26, 60, 120)
+
+    def __init__(self, ohlcv: Optional[list] = None):
+        self.reset()
+        if ohlcv:
+            self.sync(ohlcv)
+
+    def reset(self):
+        self.count = 0
+        self.last_ts = None
+        self._tail: deque = deque(maxlen=WINDOW_TAIL)
+        # EMA values after the last bar, and before it (to redo a forming bar)
+        self._ema: dict = {}
+        self._prev_ema: dict = {}
+
+    def update(self, candle: list) -> Optional[IndicatorResult]:
+        """candle: [ts, open, high, low, close, volume]"""
+        ts = candle[0]
+        row = (float(candle[2]), float(candle[3]), float(candle[4]), float(candle[5]))
+        if self.last_ts is not None and ts < self.last_ts:
+            return self.result()
+
+        if ts == self.last_ts:
+            self._tail[-1] = row
+        else:
+            self._tail.append(row)
+            self._prev_ema = self._ema
+            self.count += 1
+            self.last_ts = ts
+        self._ema = self._step(self._prev_ema, row[2])
+        return self.result()
+
+    def sync(self, ohlcv: list) -> Optional[IndicatorResult]:
+        """Feed an oldest-first candle list, skipping bars already seen.
+
+        If the list starts after the last seen bar there is a gap, so the state
+        is rebuilt from the list instead.
+        """
+        if not ohlcv:
+            return self.result()
+        if self.last_ts is None or ohlcv[0][0] > self.last_ts:
+            self.reset()
+        for candle in ohlcv:
+            if self.last_ts is None or candle[0] >= self.last_ts:
+                self.update(candle)
+        return self.result()
+
+    def result(self) -> Optional[IndicatorResult]:
+        if self.count < 60:
+            return None
+        ema = self._ema
+        close = self._tail[-1][2]
+        return _build_result(
+            np.array(self._tail, dtype=float),
+            ema["macd"], ema["signal"],
+            ema[5], ema[20],
+            ema[60],
+            ema[120] if self.count >= 120 else close,
+        )
+
+    def _step(self, prev: dict, close: float) -> dict:
+        if not prev:
+            ema = {p: close for p in self.EMA_PERIODS}
+            ema["macd"] = 0.0
+            ema["signal"] = 0.0
+            return ema
+        ema = {}
+        for p in self.EMA_PERIODS:
+            k = 2 / (p + 1)
+            ema[p] = close * k + prev[p] * (1 - k)
+        ema["macd"] = ema[12] - ema[26]
+        k = 2 / (9 + 1)
+        ema["signal"] = ema["macd"] * k + prev["signal"] * (1 - k)
+        return ema
+
+
+# ── Vectorized (batch) indicators ─────────────────────────────────────────────
+# The functions below work on arrays shaped (..., candles) and compute every
+# indicator for every bar in one pass. Value at bar t equals what
+# compute_indicators returns for the candles up to and including t.
+
+def _ema_filter(values: np.ndarray, period: int) -> np.ndarray:
+    """_ema along the last axis without a per-element Python loop.
+
+    Uses the closed form ema[t] = a^(t+1) * (ema[-1] + k * sum(x[j] / a^(j+1)))
+    in chunks short enough that a^-chunk stays far from float64 overflow.
+    """
+    k = 2 / (period + 1)
+    a = 1 - k
+    n = values.shape[-1]
+    out = np.empty(values.shape, dtype=float)
+    chunk = max(1, int(300 / -np.log(a)))
+    prev = values[..., 0]
+    for start in range(0, n, chunk):
+        x = values[..., start:start + chunk]
+        powers = a ** np.arange(1, x.shape[-1] + 1)
+        out[..., start:start + x.shape[-1]] = powers * (prev[..., None] + k * np.cumsum(x / powers, axis=-1))
+        prev = out[..., start + x.shape[-1] - 1]
+    return out
+
+
+def _rolling(values: np.ndarray, window: int) -> np.ndarray:
+    """Strided (..., n, window) view; the first window-1 rows are NaN-padded."""
+    pad = np.full(values.shape[:-1] + (window - 1,), np.nan)
+    padded = np.concatenate([pad, values], axis=-1)
+    return np.lib.stride_tricks.sliding_window_view(padded, window, axis=-1)
+
+
+def _shift(values: np.ndarray, n: int = 1) -> np.ndarray:
+    """values[t - n] along the last axis, NaN where t < n."""
+    out = np.full(values.shape, np.nan)
+    out[..., n:] = values[..., :-n]
+    return out
+
+
+def _indicator_arrays(highs: np.ndarray, lows: np.ndarray, closes: np.ndarray,
+                      volumes: np.ndarray, tail: Optional[int] = None) -> dict:
+    """All indicators for the last `tail` bars (default: every bar).
+
+    EMAs need the whole history; the windowed indicators only need the last
+    tail + WINDOW_TAIL bars, so they are computed on that slice alone.
+    """
+    n = closes.shape[-1]
+    tail = n if tail is None else min(tail, n)
+    bar = np.arange(n - tail, n)
+    full_closes = closes
+    window = slice(max(0, n - tail - WINDOW_TAIL), None)
+    highs, lows, closes, volumes = highs[..., window], lows[..., window], closes[..., window], volumes[..., window]
+
+    # ── RSI (14) ──────────────────────────────────────────────────────────────
+    deltas = closes - _shift(closes)
+    gains = np.where(deltas > 0, deltas, 0.0)
+    losses = np.where(deltas < 0, -deltas, 0.0)
+    gains[..., 0] = losses[..., 0] = np.nan
+    avg_gain = _rolling(gains, 14).mean(axis=-1)
+    avg_loss = _rolling(losses, 14).mean(axis=-1)
+    rs = np.where(avg_loss != 0, avg_gain / np.where(avg_loss != 0, avg_loss, 1), 100)
+    rsi = 100 - 100 / (1 + rs)
+
+    # ── MACD (12, 26, 9) ─────────────────────────────────────────────────────
+    macd = _ema_filter(full_closes, 12) - _ema_filter(full_closes, 26)
+    macd_signal = _ema_filter(macd, 9)[..., -tail:]
+    macd = macd[..., -tail:]
+
+    # ── Bollinger Bands (20, 2σ) ─────────────────────────────────────────────
+    win20 = _rolling(closes, 20)
+    sma20 = win20.mean(axis=-1)
+    std20 = win20.std(axis=-1)
+
+    # ── EMAs ─────────────────────────────────────────────────────────────────
+    price = full_closes[..., -tail:]
+    ema60 = np.where(bar >= 59, _ema_filter(full_closes, 60)[..., -tail:], price)
+    ema120 = np.where(bar >= 119, _ema_filter(full_closes, 120)[..., -tail:], price)
+
+    # ── Volume ratio ─────────────────────────────────────────────────────────
+    vol_avg = _rolling(volumes, 20).mean(axis=-1)
+    vol_ratio = np.where(vol_avg > 0, volumes / np.where(vol_avg > 0, vol_avg, 1), 1.0)
+
+    # ── Stochastic (14, 3) ────────────────────────────────────────────────────
+    def _stoch(high, low, close):
+        rng = high - low
+        return np.where(rng != 0, (close - low) / np.where(rng != 0, rng, 1) * 100, 50.0)
+
+    stoch_k = _stoch(_rolling(highs, 14).max(axis=-1), _rolling(lows, 14).min(axis=-1), closes)
+    # compute_indicators builds D from K over the 14 bars *before* each bar
+    k_prev = _stoch(_shift(_rolling(highs, 14).max(axis=-1)), _shift(_rolling(lows, 14).min(axis=-1)), closes)
+    stoch_d = _rolling(k_prev, 3).mean(axis=-1)
+
+    # ── ATR (14) ─────────────────────────────────────────────────────────────
+    prev_close = _shift(closes)
+    tr = np.maximum(highs - lows, np.maximum(np.abs(highs - prev_close), np.abs(lows - prev_close)))
+    atr = _rolling(tr, 14).mean(axis=-1)
+
+    columns = {
+        "rsi": rsi,
+        "macd": macd,
+        "macd_signal": macd_signal,
+        "macd_hist": macd - macd_signal,
+        "bb_upper": sma20 + 2 * std20,
+        "bb_mid": sma20,
+        "bb_lower": sma20 - 2 * std20,
+        "ema5": _ema_filter(full_closes, 5),
+        "ema20": _ema_filter(full_closes, 20),
+        "ema60": ema60,
+        "ema120": ema120,
+        "volume_ratio": vol_ratio,
+        "stoch_k": stoch_k,
+        "stoch_d": stoch_d,
+        "atr": atr,
+    }
+    return {name: values[..., -tail:] for name, values in columns.items()}
+
+
+def _score_arrays(ind: dict, price: np.ndarray) -> np.ndarray:
+    """Vectorized copy of the scoring rules in _build_result."""
+    rsi = ind["rsi"]
+    score = np.select([rsi < 30, rsi < 40, rsi > 70, rsi > 60], [25.0, 12.0, -25.0, -12.0], 0.0)
+
+    macd, macd_signal, hist = ind["macd"], ind["macd_signal"], ind["macd_hist"]
+    score += np.select([(hist > 0) & (macd > macd_signal), (hist < 0) & (macd < macd_signal)], [20.0, -20.0], 0.0)
+
+    upper, lower = ind["bb_upper"], ind["bb_lower"]
+    bb_pct = (price - lower) / (upper - lower)
+    score += np.select([price < lower, price > upper], [15.0, -15.0], (0.5 - bb_pct) * 20)
+
+    e5, e20, e60 = ind["ema5"], ind["ema20"], ind["ema60"]
+    score += np.select(
+        [(e5 > e20) & (e20 > e60), e5 > e20, (e5 < e20) & (e20 < e60), e5 < e20],
+        [20.0, 10.0, -20.0, -10.0], 0.0,
+    )
+
+    k, d = ind["stoch_k"], ind["stoch_d"]
+    score += np.select([(k < 20) & (d < 20), (k > 80) & (d > 80)], [10.0, -10.0], 0.0)
+
+    score += np.where(ind["volume_ratio"] > 1.5, np.where(score > 0, 10.0, -10.0), 0.0)
+    return score
+
+
+def _trend_signal(score: np.ndarray) -> tuple:
+    trend = np.select(
+        [score >= 50, score >= 20, score <= -50, score <= -20],
+        ["strong_up", "up", "strong_down", "down"], "sideways",
+    )
+    signal = np.select([score >= 40, score <= -40], ["buy", "sell"], "hold")
+    return trend, signal
+
+
+@dataclass
+class IndicatorColumns:
+    """Columnar IndicatorResult: every field is an array with the same shape."""
+    rsi: np.ndarray
+    macd: np.ndarray
+    macd_signal: np.ndarray
+    macd_hist: np.ndarray
+    bb_upper: np.ndarray
+    bb_mid: np.ndarray
+    bb_lower: np.ndarray
+    ema5: np.ndarray
+    ema20: np.ndarray
+    ema60: np.ndarray
+    ema120: np.ndarray
+    volume_ratio: np.ndarray
+    stoch_k: np.ndarray
+    stoch_d: np.ndarray
+    atr: np.ndarray
+    trend: np.ndarray
+    signal: np.ndarray
+    score: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.score)
+
+    def to_dict(self) -> dict:
+        """JSON-friendly columns; NaN (warm-up bars) becomes None."""
+        out = {}
+        for name in IndicatorResult.__dataclass_fields__:
+            values = getattr(self, name)
+            if values.dtype.kind in "US":
+                out[name] = [v or None for v in values.tolist()]
+            else:
+                out[name] = np.where(np.isnan(values), None, np.round(values, 6)).tolist()
+        return out
+
+    def row(self, i: int) -> IndicatorResult:
+        """Single entry, rounded the same way as compute_indicators."""
+        digits = {"macd": 6, "macd_signal": 6, "macd_hist": 6}
+        values = {}
+        for name in IndicatorResult.__dataclass_fields__:
+            v = getattr(self, name)[i]
+            values[name] = str(v) if name in ("trend", "signal") else round(float(v), digits.get(name, 2))
+        return IndicatorResult(**values)
+
+
+def _columns(ind: dict, price: np.ndarray) -> IndicatorColumns:
+    with np.errstate(divide="ignore", invalid="ignore"):
+        score = _score_arrays(ind, price)
+    trend, signal = _trend_signal(score)
+    return IndicatorColumns(**ind, trend=trend, signal=signal, score=score)
+
+
+def stack_ohlcv(ohlcv_list: list, limit: int = 200) -> np.ndarray:
+    """Stack per-symbol get_ohlcv() lists into a (symbols, candles, 6) array.
+
+    Every symbol is cut to the newest `limit` candles, or to the shortest
+    history if one of them is shorter.
+    """
+    n = min([limit] + [len(o) for o in ohlcv_list])
+    return np.stack([np.asarray(o[len(o) - n:], dtype=float) for o in ohlcv_list])
+
+
+def compute_indicators_batch(ohlcv: np.ndarray) -> Optional[IndicatorColumns]:
+    """ohlcv: array (symbols, candles, 6) of [ts, open, high, low, close, volume].
+
+    Returns the latest value per symbol as arrays of shape (symbols,);
+    batch.row(i) equals compute_indicators(ohlcv[i]).
+    """
+    ohlcv = np.asarray(ohlcv, dtype=float)
+    if ohlcv.ndim != 3 or ohlcv.shape[1] < 60:
+        return None
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ind = _indicator_arrays(ohlcv[..., 2], ohlcv[..., 3], ohlcv[..., 4], ohlcv[..., 5], tail=1)
+    last = {name: values[:, -1] for name, values in ind.items()}
+    return _columns(last, ohlcv[:, -1, 4])
+
+
+def compute_indicator_series(ohlcv) -> Optional[IndicatorColumns]:
+    """ohlcv: list or (candles, 6) array of [ts, open, high, low, close, volume].
+
+    Returns every indicator for every bar in one vectorized pass, aligned with
+    the input: series.row(t) equals compute_indicators(ohlcv[:t + 1]). The
+    first 59 bars have no value (NaN, empty trend/signal).
+    """
+    arr = np.asarray(ohlcv, dtype=float)
+    if arr.ndim != 2 or len(arr) < 60:
+        return None
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ind = _indicator_arrays(arr[:, 2], arr[:, 3], arr[:, 4], arr[:, 5])
+    series = _columns(ind, arr[:, 4])
+    for name in IndicatorResult.__dataclass_fields__:
+        values = getattr(series, name)
+        values[:59] = "" if values.dtype.kind in "US" else np.nan
+    return series
@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+
+from crypto_bot.exchanges import BookTape
+
+FX = 1350.0
+
+
+def pulse_tapes(n: int = 600, dt: float = 0.05) -> tuple[BookTape, BookTape]:
+    """Synthetic Upbit/Bybit tapes: 0.9% premium pulses that decay within 8 events (0.4s)."""
+    upbit, bybit = BookTape(), BookTape()
+    t0 = 1_700_000_000.0
+    for i in range(n):
+        t = t0 + i * dt
+        k = i % 40
+        prem = 0.9 * max(0.0, 1 - k / 8) if (i // 40) % 2 == 0 else 0.0
+        usd = 60000 + i * 0.5
+        krw = usd * FX * (1 + prem / 100)
+        upbit.record("KRW-BTC", t,
+                     [[krw - 1000 * j - 500, 0.05] for j in range(10)],
+                     [[krw + 1000 * j + 500, 0.05] for j in range(10)])
+        bybit.record("BTCUSDT", t + 0.01,
+                     [[usd - 0.5 * j - 0.25, 0.05] for j in range(10)],
+                     [[usd + 0.5 * j + 0.25, 0.05] for j in range(10)])
+    return upbit, bybit
+
+
+@pytest.fixture
+def tapes():
+    return pulse_tapes()
+
+
+@pytest.fixture
+def book_tape():
+    """One BTC/KRW snapshot: asks 101/102/103, bids 100/99/98, 1 BTC per level."""
+    tape = BookTape()
+    tape.record("KRW-BTC", 0.0, np.array([[100, 1], [99, 1], [98, 1]]), np.array([[101, 1], [102, 1], [103, 1]]))
+    return tape
+
+
+@pytest.fixture
+def tmp_db(tmp_path, monkeypatch):
+    """crypto_bot.data.database pointed at a fresh file under tmp_path (migrated, closed afterwards)."""
+    from crypto_bot.data import database as db
+    monkeypatch.setattr(db, "DB_PATH", tmp_path / "bot.db")
+    db.init_db()
+    yield db
+    db.close()
@@ -0,0 +1,21 @@
+import asyncio
+
+from crypto_bot.backtest import ArbitrageReplay
+
+from .conftest import FX
+
+
+def test_capture_drops_as_latency_rises(tapes):
+    replay = ArbitrageReplay(*tapes, FX, speed=200, min_profit_pct=0.2, trade_amount_krw=5_000_000)
+    reports = asyncio.run(replay.sweep_latency([0, 100, 300]))
+    ratios = [r.capture_ratio for r in reports]
+    assert all(r.trades > 0 for r in reports)
+    assert ratios[0] > 0.99
+    assert ratios[0] > ratios[1] > ratios[2]
+    assert reports[0].captured_krw > reports[2].captured_krw
+
+
+def test_leg_latencies_are_drawn_independently(tapes):
+    replay = ArbitrageReplay(*tapes, FX, latency_ms=50, jitter_ms=40, seed=7)
+    upbit, bybit = replay._venues(None, 50)
+    assert [upbit.latency.sample() for _ in range(5)] != [bybit.latency.sample() for _ in range(5)]
@@ -0,0 +1,136 @@
+import json
+import math
+from dataclasses import replace
+
+import numpy as np
+import pytest
+
+from crypto_bot.backtest import Backtester, grid_candidates, load_ohlcv, random_candidates, sweep
+from crypto_bot.backtest.engine import WARMUP
+from crypto_bot.strategies.auto_strategy import AutoStrategy, AutoStrategyConfig
+from crypto_bot.strategies.user_strategy import UserStrategyConfig
+
+BAR = 900
+
+
+def swing_candles(n: int = 1500) -> np.ndarray:
+    """15m candles with multi-day swings (scores cross ±40 several times)."""
+    rows = []
+    for i in range(n):
+        c = 50_000_000 * (1 + 0.12 * math.sin(i / 40) + 0.04 * math.sin(i / 9) + 0.01 * math.sin(i * 1.7))
+        o = c * (1 - 0.002 * math.sin(i * 0.8))
+        rows.append([1_700_000_000 + BAR * i, o, max(o, c) * 1.003, min(o, c) * 0.997, c,
+                     10 + 4 * math.sin(i / 5) + (15 if i % 23 == 0 else 0)])
+    return np.array(rows)
+
+
+def naive_auto(bt: Backtester, cfg: AutoStrategyConfig) -> list[tuple]:
+    """Every bar through _build_recommendation, like the live loop calling execute_signal."""
+    strategy = AutoStrategy(None, cfg)
+    balance, trades = bt.seed_krw, []
+    for t in range(WARMUP, len(bt)):
+        ts, price = bt._times[t], bt._closes[t]
+        if ts < strategy.last_trade_time + cfg.trade_cooldown:
+            continue
+        ind = bt.series.row(t)
+        rec = strategy._build_recommendation(price, ind)
+        if rec["action"] == "buy" and strategy.position is None:
+            krw = min(strategy.calc_invest_amount(bt.seed_krw, ind), balance)
+            if krw < 5000:
+                break
+            balance -= krw
+            qty = krw * (1 - bt.taker_fee) / price
+            strategy.position = {"price": price, "qty": qty, "high_price": price}
+            strategy.last_trade_time = ts
+            trades.append(("buy", t, round(qty, 12)))
+        elif rec["action"] == "sell" and strategy.position is not None:
+            qty = strategy.position["qty"]
+            balance += qty * price * (1 - bt.taker_fee)
+            strategy.position = None
+            strategy.last_trade_time = ts
+            trades.append(("sell", t, round(qty, 12)))
+    return trades
+
+
+@pytest.fixture(scope="module")
+def bt():
+    return Backtester(swing_candles(), symbol="KRW-BTC", seed_krw=1_000_000)
+
+
+@pytest.mark.parametrize("overrides", [{}, {"trade_cooldown": 0, "min_score_buy": 25.0},
+                                       {"stop_loss_pct": 0.01, "trailing_stop_pct": 0.005}])
+def test_auto_skipping_matches_bar_by_bar(bt, overrides):
+    cfg = replace(AutoStrategyConfig(), **overrides)
+    report = bt.run_auto(cfg)
+    got = [(tr.side, int(tr.order_id[3:]), round(tr.qty, 12)) for tr in report.trades]
+    assert got == naive_auto(bt, cfg)
+    assert report.trade_count >= 4
+
+
+def test_report_accounting(bt):
+    report = bt.run_auto(AutoStrategyConfig(trade_cooldown=0))
+    flows = sum(-tr.krw_amount if tr.side == "buy" else tr.krw_amount - tr.fee for tr in report.trades)
+    held = sum(tr.qty if tr.side == "buy" else -tr.qty for tr in report.trades)
+    assert report.final_equity == pytest.approx(bt.seed_krw + flows + held * bt._closes[-1])
+    assert report.total_fee == pytest.approx(sum(tr.fee for tr in report.trades))
+    assert report.win_count + report.lose_count == sum(tr.side == "sell" for tr in report.trades)
+    assert len(report.equity) == len(bt) and 0 <= report.max_drawdown_pct < 100
+    assert "equity" not in report.summary(with_trades=False)
+
+
+def test_user_strategy_closes_whole_position(bt):
+    report = bt.run_user(UserStrategyConfig(trade_cooldown_sec=0))
+    assert report.trade_count >= 4 and report.trades[0].side == "buy"
+    held = cost = 0.0
+    for tr in report.trades:
+        if tr.side == "buy":
+            held += tr.qty
+            cost += tr.krw_amount - tr.fee
+        else:
+            assert tr.qty == pytest.approx(held)
+            assert tr.pnl == pytest.approx(tr.krw_amount - tr.fee - cost)
+            held = cost = 0.0
+
+
+def test_too_short_history_is_rejected():
+    with pytest.raises(ValueError):
+        Backtester(swing_candles(59))
+
+
+def test_load_ohlcv_csv_and_json(tmp_path):
+    arr = swing_candles(80)
+    shuffled = arr[::-1]
+    csv_path = tmp_path / "c.csv"
+    np.savetxt(csv_path, shuffled, delimiter=",", header="ts,open,high,low,close,volume", comments="")
+    json_path = tmp_path / "c.json"
+    json_path.write_text(json.dumps({"data": shuffled.tolist()}))
+    for path in (csv_path, json_path):
+        assert np.allclose(load_ohlcv(path), arr)
+
+
+def test_sweep_matches_direct_runs_and_ranks(bt):
+    base = AutoStrategyConfig(trade_cooldown=0)
+    candidates = grid_candidates({"min_score_buy": [25.0, 40.0], "stop_loss_pct": [0.01, 0.03]})
+    assert len(candidates) == 4 and {"min_score_buy": 25.0, "stop_loss_pct": 0.03} in candidates
+    results = sweep(swing_candles(), base, candidates, seed_krw=bt.seed_krw, workers=2)
+    assert [r.sharpe for r in results] == sorted((r.sharpe for r in results), reverse=True)
+    for r in results:
+        direct = bt.run_auto(replace(base, **r.params))
+        assert (r.trade_count, r.total_pnl) == (direct.trade_count, pytest.approx(direct.total_pnl))
+
+    by_dd = sweep(swing_candles(), base, candidates, rank_by="max_drawdown_pct", workers=2)
+    assert [r.max_drawdown_pct for r in by_dd] == sorted(r.max_drawdown_pct for r in by_dd)
+    with pytest.raises(ValueError):
+        sweep(swing_candles(), base, candidates, rank_by="return_pct")
+
+
+def test_sweep_user_config_and_random_candidates(bt):
+    space = {"stop_loss_pct": (1.0, 4.0), "buy_rsi_below": [30.0, 35.0]}
+    candidates = random_candidates(space, 3, seed=7)
+    assert candidates == random_candidates(space, 3, seed=7)
+    assert all(1.0 <= c["stop_loss_pct"] <= 4.0 for c in candidates)
+    base = UserStrategyConfig(trade_cooldown_sec=0)
+    results = sweep(swing_candles(), base, candidates, rank_by="total_pnl", workers=2)
+    for r in results:
+        direct = bt.run_user(UserStrategyConfig.from_dict({**base.to_dict(), **r.params}))
+        assert r.total_pnl == pytest.approx(direct.total_pnl)
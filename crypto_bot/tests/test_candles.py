@@ -0,0 +1,133 @@
+import asyncio
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from crypto_bot.data import candle_archive as ca, candle_store as cs
+from crypto_bot.data.candle_archive import CandleArchive
+from crypto_bot.data.candle_store import CandleStore
+
+T0 = 1_700_000_000 // 60 * 60
+
+
+class FakeVenue:
+    """1m candles in epoch seconds; get_ohlcv pages like the exchanges (newest `limit` bars before `before`)."""
+    name = "fake"
+    ohlcv_page_limit = 5
+
+    def __init__(self, first: int, last: int):
+        self.first, self.last = first, last     # 거래소가 가진 가장 오래된/최신 봉 ts
+        self.revision = 0                       # 최신 봉(형성 중) 종가 변경용
+        self.requests: list[tuple] = []
+
+    def bar(self, ts: int) -> list:
+        close = ts / 60 + (self.revision if ts == self.last else 0)
+        return [ts, close, close + 1, close - 1, close, 1.0]
+
+    async def get_ohlcv(self, symbol, interval, limit, before=None):
+        self.requests.append((limit, before))
+        end = self.last if before is None else min(self.last, before - 60)
+        start = max(self.first, end - (limit - 1) * 60)
+        return [self.bar(ts) for ts in range(start, end + 1, 60)]
+
+
+@pytest.fixture
+def store(tmp_db, monkeypatch):
+    monkeypatch.setattr(cs, "PAGE_DELAY", 0)
+    return CandleStore()
+
+
+def test_sync_pages_back_then_fills_forward_gap(store, monkeypatch):
+    venue = FakeVenue(T0 - 1000 * 60, T0)
+    clock = SimpleNamespace(time=lambda: venue.last + 30)
+    monkeypatch.setattr(cs, "time", clock)
+
+    candles = asyncio.run(store.get_ohlcv(venue, "X", "1m", 12))
+    assert [c[0] for c in candles] == list(range(T0 - 11 * 60, T0 + 60, 60))
+    assert [r[0] for r in venue.requests] == [5, 5, 2]
+
+    # 8봉이 지남 → 한 페이지(5)보다 긴 공백을 뒤로 걸어가며 메움
+    venue.requests.clear()
+    venue.last += 8 * 60
+    candles = asyncio.run(store.get_ohlcv(venue, "X", "1m", 12))
+    assert [c[0] for c in candles] == list(range(venue.last - 11 * 60, venue.last + 60, 60))
+    assert venue.requests == [(5, None), (5, venue.last - 4 * 60)]
+    assert store.bounds("fake", "X", "1m") == (T0 - 11 * 60, venue.last, 20)
+
+
+def test_sync_refreshes_forming_bar_and_stops_at_exchange_history(store, monkeypatch):
+    venue = FakeVenue(T0 - 7 * 60, T0)
+    monkeypatch.setattr(cs, "time", SimpleNamespace(time=lambda: venue.last + 30))
+
+    asyncio.run(store.sync(venue, "X", "1m", 50))       # 거래소에 8봉뿐 → 거기서 멈춤
+    assert store.bounds("fake", "X", "1m") == (T0 - 7 * 60, T0, 8)
+
+    venue.revision = 3.0
+    asyncio.run(store.sync(venue, "X", "1m", 8))
+    assert store.read("fake", "X", "1m", limit=1)[0][4] == T0 / 60 + 3.0
+    assert store.read("fake", "X", "1m", start=T0 - 2 * 60, end=T0 - 60) == [
+        venue.bar(T0 - 120), venue.bar(T0 - 60)]
+
+
+# ── Archive ───────────────────────────────────────────────────────────────────
+def rows(first: int, n: int) -> np.ndarray:
+    ts = np.arange(first, first + n) * 60
+    close = ts / 60.0
+    return np.column_stack([ts, close, close + 1, close - 1, close, np.ones(n)])
+
+
+@pytest.fixture
+def archive(tmp_path, monkeypatch):
+    monkeypatch.setattr(ca, "BLOCK", 8)     # 블록 경계를 작은 데이터로 검증
+    return CandleArchive(tmp_path / "candles")
+
+
+def test_archive_range_reads_match_brute_force(archive):
+    data = rows(1000, 100)
+    for chunk in np.array_split(data, 7):
+        archive.append("v", "X", "1m", chunk)
+    assert archive.count("v", "X", "1m") == 100
+    ts = data[:, 0]
+    for start, end in [(None, None), (1000 * 60, 1000 * 60), (1007 * 60, 1017 * 60),
+                       (1003 * 60 + 1, 1050 * 60 - 1), (0, 999 * 60), (1099 * 60, 10**10)]:
+        view = archive.read("v", "X", "1m", start=start, end=end)
+        mask = (ts >= (start or 0)) & (ts <= (end or np.inf))
+        assert np.array_equal(view.to_array(), data[mask])
+    assert np.array_equal(archive.read("v", "X", "1m", limit=5).to_array(), data[-5:])
+
+
+def test_archive_overwrites_forming_bar_and_ignores_older(archive):
+    archive.append("v", "X", "1m", rows(0, 10))
+    forming = rows(9, 2)
+    forming[0, 4] = -1.0
+    assert archive.append("v", "X", "1m", np.vstack([rows(3, 2), forming])) == 1
+    view = archive.read("v", "X", "1m")
+    assert len(view) == 11 and view.close[9] == -1.0 and view.ts[-1] == 600
+
+
+def test_archive_repairs_torn_append(archive):
+    archive.append("v", "X", "1m", rows(0, 20))
+    path = archive._dir("v", "X", "1m")
+    # 값 컬럼은 썼지만 ts(커밋 지점)와 인덱스는 못 쓴 채 중단된 append
+    for name in ("open", "close"):
+        with open(path / f"{name}.f8", "ab") as f:
+            f.write(np.arange(3, dtype=np.float64).tobytes())
+    (path / "index.i8").write_bytes(b"")
+    assert np.array_equal(CandleArchive(archive.root).read("v", "X", "1m").to_array(), rows(0, 20))
+
+    assert archive.append("v", "X", "1m", rows(20, 5)) == 5
+    assert (path / "open.f8").stat().st_size == (path / "ts.i8").stat().st_size == 25 * 8
+    assert np.array_equal(np.fromfile(path / "index.i8", dtype=np.int64), rows(0, 25)[::8, 0])
+    assert np.array_equal(archive.read("v", "X", "1m", start=17 * 60).to_array(), rows(17, 8))
+
+
+def test_archive_mirrors_store(archive, tmp_db):
+    store = CandleStore()
+    store.write("v", "X", "1m", rows(10, 10).tolist())
+    assert archive.sync_from_store(store, "v", "X", "1m") == 10
+    store.write("v", "X", "1m", rows(20, 3).tolist())
+    assert archive.sync_from_store(store, "v", "X", "1m") == 3
+    store.write("v", "X", "1m", rows(0, 10).tolist())          # 과거 백필 → 재구성
+    assert archive.sync_from_store(store, "v", "X", "1m") == 23
+    assert np.array_equal(archive.read("v", "X", "1m").to_array(), rows(0, 23))
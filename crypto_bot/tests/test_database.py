@@ -0,0 +1,172 @@
+import asyncio
+import json
+import sqlite3
+import threading
+
+import numpy as np
+import pytest
+
+from crypto_bot.data.database import WriteBehind
+from crypto_bot.data.migrations import migrate
+
+
+def test_write_behind_dead_letters_bad_rows(tmp_db):
+    wb = WriteBehind(flush_rows=10_000)
+    good = (1.0, 0.5, "upbit_to_bybit", 100, 99, 1350, 1e6, 5000, "executed", 1_700_000_000.0)
+    bad = ("only", "three", "values")
+    for row in (good, bad, good):
+        wb.put("arbitrage", row)
+
+    assert wb.drain() == 3
+    stats = wb.stats()
+    assert stats["written"] == 2
+    assert stats["dead_letter"] == 1
+    assert stats["buffered"] == 0 and stats["in_flight"] == 0
+    table, row, error = wb.dead_letter[0]
+    assert (table, row) == ("arbitrage", bad) and error
+
+    # 격리된 행은 다음 flush 를 막지 않는다
+    wb.put("arbitrage", good)
+    assert wb.drain() == 1
+    assert wb.stats()["written"] == 3
+    n = tmp_db.get_conn().execute("SELECT COUNT(*) FROM arbitrage").fetchone()[0]
+    assert n == 3
+
+
+def test_save_and_queue_signal_split_indicator_columns(tmp_db):
+    tmp_db.save_signal("upbit", "KRW-BTC", "BUY", 0.7, 100.0, {"rsi": 28.5, "atr": None, "note": "x"})
+    tmp_db.queue_signal("upbit", "KRW-BTC", "SELL", -0.4, 101.0, {"rsi": 71})
+    tmp_db.write_behind.drain()
+    rows = tmp_db.get_conn().execute("SELECT signal, rsi, atr, indicators FROM signals ORDER BY id").fetchall()
+    assert [tuple(r) for r in rows] == [("BUY", 28.5, None, '{"note": "x"}'), ("SELL", 71.0, None, None)]
+
+
+# ── Connection pool ───────────────────────────────────────────────────────────
+def test_connections_are_per_thread_wal_and_reopened_after_close(tmp_db):
+    conn = tmp_db.get_conn()
+    assert tmp_db.get_conn() is conn
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1          # NORMAL
+
+    others = []
+    worker = threading.Thread(target=lambda: others.append(tmp_db.get_conn()))
+    worker.start()
+    worker.join()
+    assert others[0] is not conn
+
+    tmp_db.close()
+    assert tmp_db.get_conn() is not conn
+
+
+def test_run_uses_the_db_thread_and_readers_see_its_writes(tmp_db):
+    async def main():
+        names = await asyncio.gather(*(tmp_db.run(lambda: threading.current_thread().name) for _ in range(5)))
+        assert len(set(names)) == 1 and names[0].startswith("db")
+        await tmp_db.run(tmp_db.save_config, "k", {"v": 1})
+        return await asyncio.get_running_loop().run_in_executor(None, tmp_db.load_config, "k")
+
+    assert asyncio.run(main()) == {"v": 1}
+    future = tmp_db.submit(tmp_db.save_config, "k", {"v": 2})
+    future.result(timeout=5)
+    assert tmp_db.load_config("k") == {"v": 2}
+
+
+# ── Write-behind ──────────────────────────────────────────────────────────────
+def test_backpressure_drops_signals_but_never_trades(tmp_db):
+    wb = WriteBehind(flush_rows=10_000, flush_interval_ms=60_000, max_pending=3)
+    signal = ("upbit", "KRW-BTC", "BUY", 1.0, 100.0, None, 1.0) + (None,) * len(tmp_db.INDICATOR_COLUMNS)
+    trade = ("upbit", "KRW-BTC", "buy", 100.0, 1.0, 100.0, 0.05, 0, "", "auto", "", 1, 1.0)
+    release = threading.Event()
+    tmp_db.submit(release.wait, 5)               # DB 스레드를 막아 flush 된 배치가 기록 대기로 남게
+    assert all(wb.put("signals", signal) for _ in range(3))
+    assert not wb.put("signals", signal)         # 버퍼 + 기록 대기 = 한도
+    assert wb.put("trades", trade)               # 한도 초과여도 거래는 받음 (즉시 flush 요청)
+    stats = wb.stats()
+    assert (stats["dropped"], stats["high_water"]) == (1, 4)
+    release.set()
+    wb.close()
+    tmp_db.submit(lambda: None).result(timeout=5)   # 먼저 넘겨진 배치까지 기록 완료
+    assert wb.stats()["written"] == 4 and wb.stats()["buffered"] == 0
+    assert tmp_db.get_conn().execute("SELECT COUNT(*) FROM signals").fetchone()[0] == 3
+
+
+def test_queued_rows_are_visible_to_reads_and_flushed_on_close(tmp_db):
+    tmp_db.queue_trade("upbit", "KRW-BTC", "buy", 100.0, 1.0, 100.0, 0.05, dry_run=False)
+    tmp_db.queue_arbitrage(1.2, 0.8, "kimchi_buy_bybit", 100, 99, 1350, 1e6, 8000, "executed")
+    assert [t["side"] for t in tmp_db.get_trades()] == ["buy"]            # 조회 전 drain
+    assert tmp_db.get_pnl_summary()["arb_trades"] == 1
+
+    tmp_db.queue_signal("upbit", "KRW-BTC", "HOLD", 0.0, 100.0, {"rsi": 50})
+    tmp_db.close()
+    assert tmp_db.get_conn().execute("SELECT COUNT(*) FROM signals").fetchone()[0] == 1
+
+
+# ── Rollups / retention ───────────────────────────────────────────────────────
+def test_rollup_triggers_match_rebuild(tmp_db, monkeypatch):
+    day = 86400
+    base = 1_700_000_000.0
+    trades = [("buy", 0, 10.0, 0), ("sell", 500.0, 12.0, 0), ("sell", -200.0, 9.0, 1),
+              ("buy", 0, 5.0, 1), ("sell", 0.0, 4.0, 2)]
+    for i, (side, pnl, fee, day_n) in enumerate(trades):
+        with monkeypatch.context() as mp:
+            mp.setattr(tmp_db.time, "time", lambda t=base + day_n * day + i: t)
+            tmp_db.save_trade("upbit", "KRW-BTC", side, 100.0, 1.0, 100.0, fee, pnl=pnl, dry_run=i == 3)
+            tmp_db.save_arbitrage(1.0, 0.5, "kimchi_buy_bybit", 100, 99, 1350, 1e6, 1000.0 * (i + 1),
+                                  "executed" if i % 2 == 0 else "failed")
+
+    conn = tmp_db.get_conn()
+    rolled = [tuple(r) for r in conn.execute("SELECT * FROM pnl_daily ORDER BY day, dry_run")]
+    arb = [tuple(r) for r in conn.execute("SELECT * FROM arb_daily ORDER BY day")]
+    tmp_db.rebuild_rollups()
+    assert [tuple(r) for r in conn.execute("SELECT * FROM pnl_daily ORDER BY day, dry_run")] == rolled
+    assert [tuple(r) for r in conn.execute("SELECT * FROM arb_daily ORDER BY day")] == arb
+
+    summary = tmp_db.get_pnl_summary()                       # 실거래(dry_run=0)만
+    assert (summary["total_trades"], summary["wins"], summary["losses"]) == (4, 1, 2)
+    assert summary["net_pnl"] == 300.0 - 35.0
+    assert (summary["arb_trades"], summary["arb_profit"]) == (3, 9000.0)
+    days = tmp_db.get_pnl_daily()
+    assert [d["trades"] for d in days] == [1, 1, 2] and days[-1]["arb_profit"] == 1000.0
+
+
+def test_prune_signals_deletes_only_old_rows_in_chunks(tmp_db, monkeypatch):
+    monkeypatch.setattr(tmp_db, "PRUNE_CHUNK", 7)
+    now = tmp_db.time.time()
+    rows = [("upbit", "KRW-BTC", "HOLD", 0.0, 1.0, None, now - age * 86400) + (None,) * len(tmp_db.INDICATOR_COLUMNS)
+            for age in [40] * 20 + [1] * 5]
+    with tmp_db.get_conn() as conn:
+        conn.executemany(tmp_db.INSERT_SQL["signals"], rows)
+    assert tmp_db.prune_signals(30) == 20
+    assert tmp_db.get_conn().execute("SELECT COUNT(*) FROM signals").fetchone()[0] == 5
+
+
+# ── Indicator columns ─────────────────────────────────────────────────────────
+def test_load_indicators_returns_typed_arrays(tmp_db):
+    for i in range(5):
+        tmp_db.save_signal("upbit" if i % 2 == 0 else "bybit", "KRW-BTC", "HOLD", float(i), 100.0 + i,
+                           {"rsi": 30.0 + i, "atr": None if i == 2 else 1.5})
+    tmp_db.save_signal("upbit", "KRW-ETH", "HOLD", 0.0, 1.0, {"rsi": 99.0})
+    cols = tmp_db.load_indicators("KRW-BTC", ["rsi", "atr"])
+    assert list(cols) == ["timestamp", "price", "score", "rsi", "atr"]
+    assert cols["rsi"].tolist() == [30.0, 31.0, 32.0, 33.0, 34.0]
+    assert np.isnan(cols["atr"][2]) and cols["atr"][0] == 1.5
+    assert tmp_db.load_indicators("KRW-BTC", ["rsi"], exchange="bybit")["score"].tolist() == [1.0, 3.0]
+    with pytest.raises(ValueError):
+        tmp_db.load_indicators("KRW-BTC", ["nope"])
+
+
+def test_v4_moves_json_indicators_into_columns(tmp_path):
+    conn = sqlite3.connect(tmp_path / "v3.db")
+    migrate(conn, target=3)
+    conn.executemany(
+        "INSERT INTO signals (exchange, symbol, signal, score, price, indicators, timestamp) VALUES (?,?,?,?,?,?,?)",
+        [("upbit", "KRW-BTC", "BUY", 50.0, 1.0, json.dumps({"rsi": 25.0, "macd": -1.5, "trend": "up"}), 1.0),
+         ("upbit", "KRW-BTC", "HOLD", 0.0, 1.0, json.dumps({"rsi": 50.0}), 2.0),
+         ("upbit", "KRW-BTC", "HOLD", 0.0, 1.0, "not json", 3.0)],
+    )
+    conn.commit()
+    assert migrate(conn) == [4]
+    rows = conn.execute("SELECT rsi, macd, indicators FROM signals ORDER BY id").fetchall()
+    assert rows == [(25.0, -1.5, '{"trend":"up"}'), (50.0, None, None), (None, None, "not json")]
+    assert migrate(conn) == []
+    conn.close()
@@ -0,0 +1,69 @@
+import numpy as np
+import pytest
+
+from crypto_bot.arbitrage.depth import evaluate_depth
+from crypto_bot.exchanges.orderbook import L2Book
+
+FX = 1350.0
+
+
+def books():
+    upbit, bybit = L2Book("KRW-BTC"), L2Book("BTCUSDT")
+    # 업비트 매수호가: 2% / 1% / 0% 김프 레벨, 바이비트 매도호가 100000 → 100100
+    upbit.apply_snapshot([[135_000_000 * 1.02, 0.5], [135_000_000 * 1.01, 0.5], [135_000_000, 1.0]],
+                         [[135_000_000 * 1.021, 1.0]])
+    bybit.apply_snapshot([[99_990, 5.0]], [[100_000, 0.4], [100_100, 2.0]])
+    return upbit, bybit
+
+
+def walk(levels, qty):
+    cost, left = 0.0, qty
+    for price, size in levels:
+        take = min(size, left)
+        cost += take * price
+        left -= take
+    return cost if left <= 1e-12 else np.nan
+
+
+def test_vwap_premium_and_net_profit_match_manual_walk():
+    upbit, bybit = books()
+    amount = 135_000_000 * 1.02 * 0.8        # 업비트 최우선가 기준 0.8 BTC
+    quote = evaluate_depth(upbit, bybit, FX, True, amount, fee_pct=0.3, min_profit_pct=0.5)
+    qty = 0.8
+    upbit_krw = walk([[135_000_000 * 1.02, 0.5], [135_000_000 * 1.01, 0.5]], qty)
+    bybit_krw = walk([[100_000, 0.4], [100_100, 2.0]], qty) * FX
+    premium = (upbit_krw - bybit_krw) / bybit_krw * 100
+    top = (135_000_000 * 1.02 - 100_000 * FX) / (100_000 * FX) * 100
+    assert quote.filled and quote.qty == pytest.approx(qty)
+    assert quote.upbit_vwap_krw == pytest.approx(upbit_krw / qty)
+    assert quote.bybit_vwap_usdt == pytest.approx(bybit_krw / FX / qty)
+    assert quote.premium_pct == pytest.approx(premium, abs=1e-4)
+    assert quote.slippage_pct == pytest.approx(top - premium, abs=1e-4)
+    assert quote.net_profit_pct == pytest.approx(premium - 0.3, abs=1e-4)
+
+
+def test_max_profitable_size_is_largest_grid_size_above_threshold():
+    upbit, bybit = books()
+    grid = 64
+    quote = evaluate_depth(upbit, bybit, FX, True, 1_000_000, fee_pct=0.3, min_profit_pct=0.5, grid=grid)
+    max_qty = min(upbit.depth("sell"), bybit.depth("buy"))
+    sizes = np.linspace(max_qty / grid, max_qty, grid)
+    net = (upbit.cost_to_fill("sell", sizes) / (bybit.cost_to_fill("buy", sizes) * FX) - 1) * 100 - 0.3
+    best = sizes[net >= 0.5].max()
+    assert quote.max_profitable_qty == pytest.approx(best)
+    assert quote.max_profitable_krw == pytest.approx(upbit.cost_to_fill("sell", best))
+    assert 0.5 < best < max_qty           # 전량 깊이에서는 기준 미달
+
+
+def test_reverse_direction_and_thin_books():
+    upbit, bybit = books()
+    quote = evaluate_depth(upbit, bybit, FX, False, 135_000_000 * 1.021 * 0.5, fee_pct=0.3, min_profit_pct=0.0)
+    premium = (135_000_000 * 1.021 - 99_990 * FX) / (99_990 * FX) * 100
+    assert quote.premium_pct == pytest.approx(premium, abs=1e-4)
+    assert quote.net_profit_pct == pytest.approx(-premium - 0.3, abs=1e-4)
+    assert quote.max_profitable_qty == 0.0
+
+    thin = evaluate_depth(upbit, bybit, FX, True, 135_000_000 * 10, fee_pct=0.3, min_profit_pct=0.5)
+    assert not thin.filled and thin.net_profit_pct == 0.0 and thin.max_profitable_qty > 0
+    empty = evaluate_depth(L2Book("KRW-BTC"), bybit, FX, True, 1_000_000, 0.3, 0.5)
+    assert not empty.filled and empty.qty == 0.0
@@ -0,0 +1,120 @@
+import json
+import sqlite3
+
+import pytest
+
+from crypto_bot.data import database as db, export
+from crypto_bot.data.export import export_table, import_table, resolve_export_path
+from crypto_bot.data.migrations import LATEST_VERSION, schema_version
+
+# c9b1135 의 init_db 스키마 (user_version 없음)
+V0_SCHEMA = """
+CREATE TABLE trades (
+    id INTEGER PRIMARY KEY AUTOINCREMENT, exchange TEXT NOT NULL, symbol TEXT NOT NULL,
+    side TEXT NOT NULL, price REAL NOT NULL, qty REAL NOT NULL, amount_krw REAL NOT NULL,
+    fee REAL NOT NULL, pnl REAL DEFAULT 0, order_id TEXT, strategy TEXT DEFAULT 'auto',
+    note TEXT, dry_run INTEGER DEFAULT 1, timestamp REAL NOT NULL
+);
+CREATE TABLE signals (
+    id INTEGER PRIMARY KEY AUTOINCREMENT, exchange TEXT, symbol TEXT, signal TEXT,
+    score REAL, price REAL, indicators TEXT, timestamp REAL NOT NULL
+);
+CREATE TABLE arbitrage (
+    id INTEGER PRIMARY KEY AUTOINCREMENT, kimchi_pct REAL, net_profit_pct REAL, direction TEXT,
+    upbit_price REAL, bybit_price_krw REAL, usd_krw REAL, amount_krw REAL, profit_krw REAL,
+    status TEXT, timestamp REAL NOT NULL
+);
+CREATE TABLE config (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+"""
+
+
+def test_v0_database_migrates_in_place_with_backup(tmp_path, monkeypatch):
+    path = tmp_path / "old.db"
+    conn = sqlite3.connect(path)
+    conn.executescript(V0_SCHEMA)
+    conn.execute("INSERT INTO trades (exchange,symbol,side,price,qty,amount_krw,fee,pnl,dry_run,timestamp) "
+                 "VALUES ('upbit','KRW-BTC','sell',1,1,1,0.5,100,0,1700000000)")
+    conn.execute("INSERT INTO signals (exchange,symbol,signal,score,price,indicators,timestamp) VALUES "
+                 "('upbit','KRW-BTC','BUY',50,1,?,1700000000)", (json.dumps({"rsi": 28.0, "ema5": 3.0}),))
+    conn.commit()
+    conn.close()
+
+    monkeypatch.setattr(db, "DB_PATH", path)
+    try:
+        assert db.init_db() == list(range(1, LATEST_VERSION + 1))
+        assert db.schema_version() == LATEST_VERSION
+        conn = db.get_conn()
+        assert tuple(conn.execute("SELECT trades, wins, pnl FROM pnl_daily").fetchone()) == (1, 1, 100.0)
+        assert tuple(conn.execute("SELECT rsi, ema5, indicators FROM signals").fetchone()) == (28.0, 3.0, None)
+        assert db.init_db() == []
+    finally:
+        db.close()
+
+    backup = sqlite3.connect(tmp_path / "old.db.v0.bak")
+    assert schema_version(backup) == 0
+    assert backup.execute("SELECT indicators FROM signals").fetchone()[0] == json.dumps({"rsi": 28.0, "ema5": 3.0})
+    backup.close()
+
+
+def _fill(n: int = 25):
+    for i in range(n):
+        db.save_trade("upbit", "KRW-BTC", "sell" if i % 2 else "buy", 100.0 + i, 0.1, 10.0, 0.005,
+                      pnl=float(i), order_id=f"o{i}", note=f"n{i}", dry_run=False)
+        db.save_signal("upbit", "KRW-BTC", "HOLD", i / 3, 1.0, {"rsi": None if i == 4 else 40.0 + i, "x": i})
+
+
+def _rows(table: str) -> list[tuple]:
+    return [tuple(r) for r in db.get_conn().execute(f"SELECT * FROM {table} ORDER BY id")]
+
+
+@pytest.mark.parametrize("name", ["trades.csv", "trades.csv.gz", "trades.parquet"])
+def test_export_import_round_trip(tmp_db, tmp_path, name):
+    if name.endswith(".parquet"):
+        pytest.importorskip("pyarrow")
+    _fill()
+    trades, signals = _rows("trades"), _rows("signals")
+    summary = db.get_pnl_summary()
+
+    out = export_table("trades", tmp_path / name, chunk_rows=7)
+    assert out["rows"] == 25 and not (tmp_path / (name + ".part")).exists()
+    sig_name = name.replace("trades", "signals")
+    export_table("signals", tmp_path / sig_name, chunk_rows=7)
+    since = export_table("trades", tmp_path / ("late_" + name), since=trades[20][-1])
+    assert since["rows"] == 5
+
+    with db.get_conn() as conn:
+        conn.execute("DELETE FROM trades")
+        conn.execute("DELETE FROM signals")
+    db.rebuild_rollups()
+    assert import_table("trades", tmp_path / name, keep_ids=True, chunk_rows=4)["rows"] == 25
+    assert import_table("signals", tmp_path / sig_name, keep_ids=True)["rows"] == 25
+    assert _rows("trades") == trades
+    assert _rows("signals") == signals
+    assert db.get_pnl_summary() == summary                  # 트리거가 집계도 다시 채움
+
+    assert import_table("trades", tmp_path / name, keep_ids=True)["rows"] == 0      # 멱등
+    assert import_table("trades", tmp_path / name)["rows"] == 25                    # 새 id 로 추가
+    assert len(_rows("trades")) == 50
+
+
+def test_export_rejects_unknown_table_and_format(tmp_db, tmp_path):
+    with pytest.raises(ValueError):
+        export_table("config", tmp_path / "c.csv")
+    with pytest.raises(ValueError):
+        export_table("trades", tmp_path / "t.csv", fmt="xlsx")
+    with pytest.raises(ValueError):
+        import_table("trades", tmp_path / "missing.csv")
+
+
+def test_resolve_export_path_stays_inside_export_dir(tmp_path, monkeypatch):
+    root = tmp_path / "exports"
+    monkeypatch.setattr(export, "EXPORT_DIR", root)
+    assert resolve_export_path("a/b.csv.gz", create_dir=True) == root.resolve() / "a" / "b.csv.gz"
+    assert (root / "a").is_dir()
+    for bad in ["", "../x.csv", "a/../../x.csv", str(tmp_path / "x.csv"), "x.txt", "x.pq", "x.csv.zip"]:
+        with pytest.raises(ValueError):
+            resolve_export_path(bad)
+    (tmp_path / "outside").mkdir()
+    (root / "link").symlink_to(tmp_path / "outside")
+    with pytest.raises(ValueError):
+        resolve_export_path("link/x.csv")
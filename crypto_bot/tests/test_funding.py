@@ -0,0 +1,62 @@
+import asyncio
+import time
+
+import pytest
+
+from crypto_bot.arbitrage.funding import FundingScanner
+
+T0 = 1_700_000_000.0
+PERIOD = 8 * 3600
+
+
+class FakeBybit:
+    def __init__(self, settled: dict[str, list[float]]):
+        self.settled = settled         # symbol -> 정산 펀딩비 (오래된 순)
+        self.calls: list[str] = []
+        self.release = asyncio.Event()
+
+    async def get_instruments(self):
+        self.calls.append("instruments")
+        return [{"symbol": s, "base": s[:-4], "quote": "USDT", "funding_interval_min": 480}
+                for s in self.settled]
+
+    async def get_funding_rates(self, symbols=None):
+        self.calls.append("tickers")
+        return {s: {"rate": 0.0003, "next_funding": T0 + len(r) * PERIOD, "mark_price": 10.0,
+                    "index_price": 10.0, "turnover_24h": 1e6}
+                for s, r in self.settled.items()}
+
+    async def get_historical_funding(self, symbol, limit=30):
+        self.calls.append(f"history:{symbol}")
+        await self.release.wait()
+        return [{"symbol": symbol, "rate": r, "timestamp": T0 + i * PERIOD}
+                for i, r in enumerate(self.settled[symbol][-limit:])]
+
+
+def test_scan_is_one_tickers_request_and_backfill_runs_in_background(tmp_db):
+    async def main():
+        bybit = FakeBybit({"AAAUSDT": [0.0001, -0.0002, 0.0001, 0.0002], "BBBUSDT": [-0.0001] * 3})
+        scanner = FundingScanner(bybit)
+        assert scanner.start_backfill()
+        quotes = await scanner.scan()                 # 백필이 끝나지 않아도 스캔은 바로 응답
+        assert scanner.backfilling
+        assert "tickers" in bybit.calls
+        assert [q.persistence for q in quotes] == [1, 1]   # 현재 예상치만
+        bybit.release.set()
+        await scanner._backfill_task
+        assert not scanner.start_backfill()           # 이력이 있으면 다시 하지 않음
+
+        bybit.calls.clear()
+        quotes = {q.symbol: q for q in await scanner.scan(min_persistence=2)}
+        assert bybit.calls == ["tickers"]
+        assert set(quotes) == {"AAAUSDT"}              # BBB 는 음수 이력 뒤 양수 예상치 1회
+        assert quotes["AAAUSDT"].persistence == 3
+        await scanner.stop()
+
+    asyncio.run(main())
+    tmp_db.close()      # 제출된 save_funding 마저 기록
+
+    restored = FundingScanner(FakeBybit({}))
+    assert restored.load_history(days=(time.time() - T0) / 86400 + 1) == 9
+    n, avg_pct = restored.persistence("AAAUSDT")
+    assert n == 3 and avg_pct == pytest.approx(0.01)
@@ -0,0 +1,34 @@
+import asyncio
+import math
+
+from crypto_bot.arbitrage.fx import FxService, StaticFxSource
+
+
+def test_falls_back_to_next_source_when_primary_fails():
+    primary, backup = StaticFxSource(1350.0, "primary"), StaticFxSource(1340.0, "backup")
+    fx = FxService([primary, backup], source_max_age=60)
+    assert fx.rate is None and fx.age == math.inf
+
+    asyncio.run(fx.refresh())
+    assert (fx.rate, fx.quote.source) == (1350.0, "primary")
+
+    primary.fail = True
+    fx.quotes["primary"].timestamp -= 120     # 마지막 성공 값이 source_max_age 를 넘김
+    asyncio.run(fx.refresh())
+    assert (fx.rate, fx.quote.source) == (1340.0, "backup")
+
+    primary.fail = False
+    asyncio.run(fx.refresh())
+    assert fx.quote.source == "primary"       # 복구되면 우선순위 소스로 복귀
+
+
+def test_keeps_last_quote_and_reports_age_when_all_sources_fail():
+    source = StaticFxSource(1350.0)
+    fx = FxService([source], source_max_age=60)
+    asyncio.run(fx.refresh())
+    source.fail = True
+    fx.quote.timestamp -= 300
+    asyncio.run(fx.refresh())
+    assert fx.rate == 1350.0
+    assert fx.age >= 300
+    assert fx.status()["age_sec"] >= 300
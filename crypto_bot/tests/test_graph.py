@@ -0,0 +1,115 @@
+import math
+
+import numpy as np
+import pytest
+
+from crypto_bot.arbitrage.graph import ANCHORS, MIN_CYCLE_LEN, ArbitrageGraph
+
+UPBIT = {"KRW-BTC": ("BTC", "KRW"), "KRW-ETH": ("ETH", "KRW"), "KRW-XRP": ("XRP", "KRW"),
+         "KRW-USDT": ("USDT", "KRW"), "BTC-ETH": ("ETH", "BTC"), "BTC-XRP": ("XRP", "BTC")}
+BYBIT = {"BTCUSDT": ("BTC", "USDT"), "ETHUSDT": ("ETH", "USDT"), "XRPUSDT": ("XRP", "USDT"),
+         "ETHBTC": ("ETH", "BTC")}
+USD = {"BTC": 60_000.0, "ETH": 3_000.0, "XRP": 0.5, "USDT": 1.0, "KRW": 1 / 1350}
+
+
+class FakeVenue:
+    def __init__(self, name: str, fee: float):
+        self.name, self.fee = name, fee
+
+    def calc_fee(self, amount, is_taker=True, symbol=None):
+        return amount * self.fee
+
+
+def make_graph(max_len: int = 4) -> ArbitrageGraph:
+    upbit, bybit = FakeVenue("upbit", 0.0005), FakeVenue("bybit", 0.001)
+    graph = ArbitrageGraph(max_len=max_len, min_profit_pct=0.1)
+    for ex, markets in ((upbit, UPBIT), (bybit, BYBIT)):
+        for symbol, (base, quote) in markets.items():
+            graph.add_market(ex, symbol, base, quote)
+    for asset in ("BTC", "ETH", "XRP", "USDT"):
+        graph.add_transfer(asset, "upbit", "bybit", 0.05)
+    graph.add_fx()
+    graph.build()
+    return graph
+
+
+def fair(base: str, quote: str, noise: float = 0.0) -> tuple[float, float]:
+    mid = USD[base] / USD[quote] * (1 + noise)
+    return mid * 0.9999, mid * 1.0001
+
+
+def brute_force_cycles(graph: ArbitrageGraph) -> set:
+    """Every simple anchor cycle of MIN_CYCLE_LEN..max_len edges, rotated to start at its first anchor."""
+    anchors = [graph.node_index[a] for a in ANCHORS]
+    found = set()
+
+    def extend(path: list):
+        last = graph.edges[path[-1]].dst
+        start = graph.edges[path[0]].src
+        if last == start:
+            nodes = [graph.edges[e].src for e in path]
+            first = next((a for a in anchors if a in nodes), None)
+            if len(path) >= MIN_CYCLE_LEN and first is not None:
+                k = nodes.index(first)
+                found.add(tuple(path[k:] + path[:k]))
+            return
+        if len(path) == graph.max_len:
+            return
+        seen = {graph.edges[e].src for e in path}
+        for e, edge in enumerate(graph.edges):
+            if edge.src == last and edge.dst not in seen - {start}:
+                extend(path + [e])
+
+    for e in range(len(graph.edges)):
+        extend([e])
+    return found
+
+
+def test_build_enumerates_each_anchor_cycle_once():
+    graph = make_graph()
+    pad = len(graph.edges)
+    cycles = [tuple(int(e) for e in row if e != pad) for row in graph.cycles]
+    assert len(cycles) == len(set(cycles))
+    assert set(cycles) == brute_force_cycles(graph)
+
+
+def test_incremental_updates_match_full_recompute():
+    graph = make_graph()
+    rng = np.random.default_rng(11)
+    graph.set_fx(1350.0)
+    for venue, markets in (("upbit", UPBIT), ("bybit", BYBIT)):
+        graph.update_quotes(venue, {s: fair(*bq) for s, bq in markets.items()})
+    assert np.array_equal(graph.cycle_weight, graph.weights[graph.cycles].sum(axis=1))
+    assert graph.best(profitable_only=True) == []           # 공정가 + 수수료 → 이익 사이클 없음
+
+    threshold = -math.log1p(graph.min_profit_pct / 100)
+    markets = [("upbit", s, bq) for s, bq in UPBIT.items()] + [("bybit", s, bq) for s, bq in BYBIT.items()]
+    for _ in range(300):
+        venue, symbol, (base, quote) = markets[rng.integers(len(markets))]
+        bid, ask = fair(base, quote, rng.normal(0, 0.004))
+        hits = graph.update_quote(venue, symbol, bid, ask)
+
+        full = graph.weights[graph.cycles].sum(axis=1)
+        assert np.array_equal(graph.cycle_weight, full)
+        changed = [graph.edge_index[(venue, symbol, a)] for a in ("sell", "buy")]
+        through = np.isin(graph.cycles, changed).any(axis=1)
+        expected = np.flatnonzero(through & (full <= threshold))
+        assert sorted(c.steps for c in hits) == sorted(graph.cycle(c).steps for c in expected)
+        assert all(c.is_profitable for c in hits)
+
+
+def test_triangular_mispricing_found_by_search_and_bellman_ford():
+    graph = make_graph(max_len=3)
+    graph.set_fx(1350.0)
+    for venue, markets in (("upbit", UPBIT), ("bybit", BYBIT)):
+        graph.update_quotes(venue, {s: fair(*bq) for s, bq in markets.items()})
+    assert graph.bellman_ford() is None
+
+    bid, ask = fair("XRP", "KRW", 0.01)          # 업비트 XRP 원화 마켓만 1% 비쌈
+    hits = graph.update_quote("upbit", "KRW-XRP", bid, ask)
+    best = hits[0]
+    assert best.steps[0].startswith("upbit KRW-") and best.steps[-1] == "upbit KRW-XRP sell"
+    assert best.return_pct == pytest.approx(graph.best(1)[0].return_pct)
+    assert 0.5 < best.return_pct < 1.0
+    cycle = graph.bellman_ford()
+    assert cycle is not None and cycle.return_pct > 0
@@ -0,0 +1,91 @@
+import dataclasses
+import math
+
+import numpy as np
+import pytest
+
+from crypto_bot.strategies.indicators import (
+    IndicatorState, compute_indicator_series, compute_indicators, compute_indicators_batch, stack_ohlcv,
+)
+
+# 기준 구현(c9b1135 의 compute_indicators)으로 계산해 둔 값
+BASELINE = {
+    100: dict(rsi=75.22, macd=4.088677, macd_signal=2.826008, macd_hist=1.262669, bb_upper=120.94,
+              bb_mid=105.97, bb_lower=91.0, ema5=114.62, ema20=108.32, ema60=104.37, ema120=115.27,
+              volume_ratio=1.25, stoch_k=82.74, stoch_d=94.74, atr=4.24, trend="sideways",
+              signal="hold", score=-1.21),
+    300: dict(rsi=32.59, macd=-3.433265, macd_signal=-2.541323, macd_hist=-0.891942, bb_upper=123.54,
+              bb_mid=110.99, bb_lower=98.43, ema5=104.46, ema20=109.45, ema60=112.1, ema120=111.42,
+              volume_ratio=0.76, stoch_k=12.64, stoch_d=16.51, atr=4.04, trend="sideways",
+              signal="hold", score=-11.75),
+}
+
+
+def candles(n: int, phase: float = 0.0) -> list:
+    out = []
+    for i in range(n):
+        c = 100 + 10 * math.sin(i / 7 + phase) + 0.05 * i + 3 * math.sin(i * 1.3)
+        o = c - math.sin(i * 0.9)
+        out.append([1_700_000_000 + 60 * i, o,
+                    max(o, c) + 1 + 0.5 * math.sin(i / 2) ** 2,
+                    min(o, c) - 1 - 0.5 * math.cos(i / 3) ** 2,
+                    c, 1000 + 300 * math.sin(i / 3) + (500 if i % 17 == 0 else 0)])
+    return out
+
+
+def assert_same(result, expected: dict):
+    got = dataclasses.asdict(result)
+    for name, value in expected.items():
+        if isinstance(value, str):
+            assert got[name] == value, name
+        else:
+            assert got[name] == pytest.approx(value, abs=0.011), name
+
+
+@pytest.mark.parametrize("n", sorted(BASELINE))
+def test_compute_indicators_matches_baseline(n):
+    assert_same(compute_indicators(candles(n)), BASELINE[n])
+
+
+def test_streaming_state_matches_full_recompute():
+    ohlcv = candles(300)
+    state = IndicatorState()
+    for t, candle in enumerate(ohlcv):
+        result = state.update(candle)
+        if t < 59:
+            assert result is None
+        else:
+            assert_same(result, dataclasses.asdict(compute_indicators(ohlcv[:t + 1])))
+
+
+def test_streaming_state_replaces_forming_bar_and_rebuilds_after_gap():
+    ohlcv = candles(200)
+    state = IndicatorState(ohlcv[:150])
+    forming = list(ohlcv[149])
+    forming[4] += 5
+    state.update(forming)                       # 같은 ts → 마지막 봉 교체
+    assert_same(state.result(), dataclasses.asdict(compute_indicators(ohlcv[:149] + [forming])))
+
+    state.sync(ohlcv[170:])                     # 빈 구간 → 새 목록으로 재구성
+    assert state.count == 30 and state.result() is None
+
+
+def test_batch_rows_match_per_symbol_compute():
+    per_symbol = [candles(250, phase) for phase in (0.0, 1.0, 2.5)] + [candles(220, 4.0)]
+    stacked = stack_ohlcv(per_symbol, limit=200)
+    assert stacked.shape == (4, 200, 6)
+    batch = compute_indicators_batch(stacked)
+    for i, ohlcv in enumerate(per_symbol):
+        assert_same(batch.row(i), dataclasses.asdict(compute_indicators(ohlcv[-200:])))
+    assert compute_indicators_batch(stacked[:, :59]) is None
+
+
+def test_series_rows_match_prefix_compute():
+    ohlcv = candles(300)
+    series = compute_indicator_series(np.array(ohlcv))
+    assert len(series) == 300
+    assert np.isnan(series.rsi[:59]).all() and series.signal[58] == ""
+    for t in range(59, 300, 7):
+        assert_same(series.row(t), dataclasses.asdict(compute_indicators(ohlcv[:t + 1])))
+    assert_same(series.row(299), BASELINE[300])
+    assert series.to_dict()["rsi"][0] is None
@@ -0,0 +1,82 @@
+import asyncio
+
+import pytest
+
+from crypto_bot.arbitrage import inventory as inv
+from crypto_bot.arbitrage.inventory import InventoryManager
+from crypto_bot.exchanges.paper import PaperExchange, SimClock
+
+from .conftest import FX, pulse_tapes
+
+
+def venues(category: str):
+    upbit_tape, bybit_tape = pulse_tapes(n=40)
+    clock = SimClock(start=1_700_000_001.0, speed=0.0)
+    upbit = PaperExchange("upbit", upbit_tape, clock=clock, taker_fee=0.0005,
+                          balances={"KRW": 50_000_000.0, "BTC": 0.4})
+    bybit = PaperExchange("bybit", bybit_tape, clock=clock, taker_fee=0.00055, category=category,
+                          balances={"USDT": 20_000.0, "BTC": 0.3} if category == "spot" else {"USDT": 20_000.0})
+    return upbit, bybit
+
+
+@pytest.mark.parametrize("category", ["spot", "linear"])
+def test_apply_fill_tracks_exchange_balances(category):
+    upbit, bybit = venues(category)
+    manager = InventoryManager(upbit, bybit, buffer_pct=0.0)
+
+    async def main():
+        await manager.sync(force=True)
+        for ex, symbol, side, qty in [(upbit, "KRW-BTC", "ask", 0.1), (bybit, "BTCUSDT", "buy", 0.1),
+                                      (upbit, "KRW-BTC", "bid", 0.05), (bybit, "BTCUSDT", "sell", 0.15)]:
+            order = await ex.place_order(symbol, side, "market", qty=qty)
+            manager.apply_fill(ex, symbol, side, order.filled_qty, order.avg_price)
+        cached, position = manager.balances, manager.position
+        assert manager.fills_since_sync == 4
+        assert not await manager.sync()               # 캐시가 신선하면 다시 읽지 않음
+        assert await manager.sync(force=True)
+        return cached, position
+
+    cached, position = asyncio.run(main())
+    for venue, balances in manager.balances.items():
+        assert cached[venue] == pytest.approx(balances)
+    assert position == pytest.approx(manager.position)
+    assert manager.position == (pytest.approx(-0.05) if category == "linear" else 0.0)
+
+
+def test_capacity_krw_spot_and_linear():
+    upbit, bybit = venues("spot")
+    manager = InventoryManager(upbit, bybit, buffer_pct=2.0)
+    manager.balances = {"upbit": {"KRW": 10_000_000, "BTC": 0.5}, "bybit": {"USDT": 5_000, "BTC": 0.2}}
+    up_px, by_px = 80_000_000, 60_000
+    # 업비트 코인 매도 / 바이비트 USDT 로 매수
+    assert manager.capacity_krw("kimchi_buy_bybit", up_px, by_px, FX) == pytest.approx(
+        min(0.5 * 0.98 * up_px, 5_000 * 0.98 * FX / (1 + bybit.fee_rate())))
+    # 업비트 원화로 매수 / 바이비트 코인 매도
+    assert manager.capacity_krw("reverse_buy_upbit", up_px, by_px, FX) == pytest.approx(
+        min(10_000_000 * 0.98 / (1 + upbit.fee_rate()), 0.2 * 0.98 * by_px * FX))
+
+    bybit.category = "linear"
+    manager = InventoryManager(upbit, bybit, buffer_pct=0.0, leverage=2.0)
+    manager.balances = {"upbit": {"KRW": 1e9, "BTC": 1.0}, "bybit": {"USDT": 5_000}}
+    manager.position = -0.1                        # 숏 청산 여력 + 증거금 × 레버리지
+    assert manager.capacity_krw("kimchi_buy_bybit", up_px, by_px, FX) == pytest.approx(
+        0.1 * by_px * FX + 5_000 * FX * 2.0)
+    assert manager.capacity_krw("reverse_buy_upbit", up_px, by_px, FX) == pytest.approx(5_000 * FX * 2.0)
+
+
+def test_cap_trade_and_simulate_until_blocked():
+    upbit, bybit = venues("spot")
+    manager = InventoryManager(upbit, bybit, buffer_pct=0.0)
+    assert manager.cap_trade("kimchi_buy_bybit", 1e9, 40_000_000, 30_000, FX) == 1e9   # 동기화 전
+    manager.balances = {"upbit": {"KRW": 0.0, "BTC": 1.0}, "bybit": {"USDT": 1e6, "BTC": 0.0}}
+    manager.synced_at = 1.0
+    assert manager.cap_trade("kimchi_buy_bybit", 1e9, 40_000_000, 30_000, FX) == pytest.approx(40_000_000)
+    assert manager.cap_trade("reverse_buy_upbit", 1e6, 40_000_000, 30_000, FX) == 0.0
+    manager.balances["upbit"]["BTC"] = inv.MIN_TRADE_KRW / 2 / 40_000_000
+    assert manager.cap_trade("kimchi_buy_bybit", 1e6, 40_000_000, 30_000, FX) == 0.0
+
+    manager.balances["upbit"]["BTC"] = 1.0
+    sim = manager.simulate("kimchi_buy_bybit", 10_000_000, 40_000_000, 30_000, FX)
+    assert sim["trades_until_rebalance"] == 4      # 0.25 BTC × 4 회에 업비트 코인 소진
+    assert sim["balances_at_limit"]["upbit"]["BTC"] == pytest.approx(0.0)
+    assert manager.balances["upbit"]["BTC"] == 1.0  # 사본에서만 시뮬레이션
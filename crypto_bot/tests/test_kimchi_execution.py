@@ -0,0 +1,130 @@
+import asyncio
+
+import pytest
+
+from crypto_bot.arbitrage import kimchi
+from crypto_bot.arbitrage.fx import FxService, StaticFxSource
+from crypto_bot.arbitrage.history import PremiumHistory
+from crypto_bot.arbitrage.kimchi import KimchiPremiumMonitor
+from crypto_bot.exchanges import BookTape
+from crypto_bot.exchanges.paper import PaperExchange, SimClock
+
+from .conftest import FX
+
+
+def _monitor(bybit_partial: float = 0.0):
+    """업비트가 1% 비싼 호가 한 장면 + 종이 거래소 두 곳."""
+    upbit_tape, bybit_tape = BookTape(), BookTape()
+    krw = 60000 * FX * 1.01
+    upbit_tape.record("KRW-BTC", 0.0, [[krw - 1000 * j, 1] for j in range(10)],
+                      [[krw + 1000 * (j + 1), 1] for j in range(10)])
+    bybit_tape.record("BTCUSDT", 0.0, [[60000 - j, 1] for j in range(10)], [[60000 + j + 1, 1] for j in range(10)])
+    clock = SimClock(start=0.0, speed=1000.0)
+    upbit = PaperExchange("upbit", upbit_tape, clock=clock, taker_fee=0.0005,
+                          balances={"KRW": 1e10, "BTC": 10.0})
+    bybit = PaperExchange("bybit", bybit_tape, clock=clock, taker_fee=0.00055, category="linear",
+                          balances={"USDT": 1e7}, partial_fill_prob=bybit_partial, min_fill_ratio=0.3, seed=1)
+    monitor = KimchiPremiumMonitor(upbit, bybit, min_profit_pct=0.1, trade_amount_krw=5_000_000,
+                                   fx=FxService([StaticFxSource(FX)]), premiums=PremiumHistory(persist=False))
+    asyncio.run(monitor.fx.refresh())
+    upbit_book, bybit_book = upbit_tape.at("KRW-BTC", 0.0), bybit_tape.at("BTCUSDT", 0.0)
+    opp = monitor.evaluate(FX, upbit_book.mid(), bybit_book.mid(), upbit_book, bybit_book)
+    assert opp.is_profitable and opp.direction == "kimchi_buy_bybit"
+    return monitor, opp
+
+
+def test_transient_get_order_errors_are_retried():
+    monitor, opp = _monitor()
+    get_order, calls = monitor.bybit.get_order, []
+
+    async def flaky(symbol, order_id):
+        calls.append(order_id)
+        if len(calls) < 3:
+            raise IndexError("list index out of range")   # 접수 직후 빈 목록
+        return await get_order(symbol, order_id)
+    monitor.bybit.get_order = flaky
+
+    result = asyncio.run(monitor.execute_arbitrage(opp))
+    assert result.status == "executed"
+    assert result.bybit_filled_qty == pytest.approx(0.061)
+    assert not result.unwind_order_ids
+
+
+def test_partial_fill_excess_is_unwound_and_profit_uses_fills():
+    monitor, opp = _monitor(bybit_partial=1.0)
+    result = asyncio.run(monitor.execute_arbitrage(opp))
+    assert result.status == "executed"
+    assert result.bybit_filled_qty < result.upbit_filled_qty
+    assert len(result.unwind_order_ids) == 1
+    upbit_sold = 10.0 - monitor.upbit.balances["BTC"]
+    assert upbit_sold == pytest.approx(monitor.bybit.positions["BTCUSDT"], abs=kimchi.HEDGE_MIN_QTY)
+    assert result.actual_profit_krw == pytest.approx(
+        monitor._realized_profit(opp, result.bybit_filled_qty, result.upbit_avg_price, result.bybit_avg_price)
+    )
+    assert result.actual_profit_krw < result.expected_profit_krw
+
+
+def test_unconfirmed_leg_is_not_unwound(monkeypatch):
+    monkeypatch.setattr(kimchi, "FILL_TIMEOUT", 0.2)
+    monkeypatch.setattr(kimchi, "LEG_TIMEOUT", 0.2)
+    monkeypatch.setattr(kimchi, "FILL_POLL_INTERVAL", 0.01)
+    monitor, opp = _monitor()
+
+    async def down(symbol, order_id):
+        raise RuntimeError("bybit down")
+    monitor.bybit.get_order = down
+
+    result = asyncio.run(monitor.execute_arbitrage(opp))
+    assert result.status == "failed"
+    assert "수동 확인" in result.error
+    assert not result.unwind_order_ids
+    assert result.upbit_filled_qty > 0
+
+
+def test_send_timeout_after_fill_is_reconciled_by_client_id(monkeypatch):
+    monkeypatch.setattr(kimchi, "LEG_TIMEOUT", 0.2)
+    monitor, opp = _monitor()
+    send_order = monitor.bybit.send_order
+
+    async def slow_ack(prepared):
+        order = await send_order(prepared)   # 거래소에서는 체결됨
+        await asyncio.sleep(1.0)             # 응답이 LEG_TIMEOUT 을 넘김
+        return order
+    monitor.bybit.send_order = slow_ack
+
+    result = asyncio.run(monitor.execute_arbitrage(opp))
+    assert result.status == "executed"
+    assert result.bybit_filled_qty == pytest.approx(0.061)
+    assert result.bybit_order_id in monitor.bybit.orders
+    assert not result.unwind_order_ids      # 업비트 레그를 청산하지 않음
+
+
+def test_transport_error_without_order_is_unknown(monkeypatch):
+    monkeypatch.setattr(kimchi, "FILL_POLL_INTERVAL", 0.01)
+    monitor, opp = _monitor()
+
+    async def broken(prepared):
+        raise ConnectionResetError("connection reset")   # 전송됐는지 알 수 없음
+    monitor.bybit.send_order = broken
+
+    result = asyncio.run(monitor.execute_arbitrage(opp))
+    assert result.status == "failed"
+    assert "수동 확인" in result.error
+    assert not result.unwind_order_ids
+
+
+def test_definite_rejection_unwinds_the_other_leg():
+    monitor, opp = _monitor()
+    monitor.bybit.reject_prob = 1.0
+    result = asyncio.run(monitor.execute_arbitrage(opp))
+    assert result.status == "unwound"
+    assert len(result.unwind_order_ids) == 1
+    assert monitor.upbit.balances["BTC"] == pytest.approx(10.0, abs=1e-3)
+
+
+def test_prepared_orders_carry_client_ids():
+    from crypto_bot.exchanges import UpbitExchange, BybitExchange
+    upbit = UpbitExchange("key", "s" * 32).prepare_order("KRW-BTC", "bid", "market", krw_amount=10_000)
+    bybit = BybitExchange("key", "s" * 32, "linear").prepare_order("BTCUSDT", "buy", "Market", qty=0.001)
+    assert upbit.client_id and f'"identifier": "{upbit.client_id}"' in upbit.body
+    assert bybit.client_id and f'"orderLinkId": "{bybit.client_id}"' in bybit.body
@@ -0,0 +1,82 @@
+import numpy as np
+import pytest
+
+from crypto_bot.exchanges.orderbook import L2Book
+
+
+def reference_apply(side: dict, levels):
+    for price, qty in levels:
+        if float(qty) == 0:
+            side.pop(float(price), None)
+        else:
+            side[float(price)] = float(qty)
+
+
+def assert_book(book: L2Book, bids: dict, asks: dict):
+    assert book.bids.prices.tolist() == sorted(bids)
+    assert book.bids.qtys.tolist() == [bids[p] for p in sorted(bids)]
+    assert book.asks.prices.tolist() == sorted(asks)
+    assert book.asks.qtys.tolist() == [asks[p] for p in sorted(asks)]
+
+
+def test_random_deltas_match_dict_reference():
+    rng = np.random.default_rng(3)
+    bids = {100.0 - i: 1.0 + i for i in range(20)}
+    asks = {101.0 + i: 1.0 + i for i in range(20)}
+    book = L2Book("BTCUSDT")
+    book.apply_snapshot([[str(p), str(q)] for p, q in bids.items()],
+                        [[str(p), str(q)] for p, q in asks.items()], update_id=10)
+    for u in range(11, 400):
+        # 기존/신규 레벨 갱신·삭제, 같은 가격 중복(마지막 값 우선) 포함
+        b = [[float(rng.integers(60, 101)), float(rng.choice([0, 0.5, 2.0]))] for _ in range(rng.integers(0, 6))]
+        a = [[float(rng.integers(101, 142)), float(rng.choice([0, 0.5, 2.0]))] for _ in range(rng.integers(0, 6))]
+        assert book.apply_delta(b, a, update_id=u)
+        reference_apply(bids, b)
+        reference_apply(asks, a)
+        assert_book(book, bids, asks)
+    assert book.best_bid() == max(bids) and book.best_ask() == min(asks)
+    assert book.to_orderbook(3).bids == [[p, bids[p]] for p in sorted(bids, reverse=True)[:3]]
+
+
+def test_update_id_gap_unsyncs_until_snapshot():
+    book = L2Book("X")
+    assert not book.apply_delta([[1, 1]], [], update_id=1)          # 스냅샷 전
+    book.apply_snapshot([[99, 1]], [[101, 1]], update_id=5)
+    assert book.apply_delta([[98, 2]], [], update_id=6)
+    assert not book.apply_delta([[97, 1]], [], update_id=8)          # 7 누락
+    assert not book.synced
+    assert not book.apply_delta([[96, 1]], [], update_id=9)
+    assert 97.0 not in book.bids.prices and 96.0 not in book.bids.prices
+    book.apply_snapshot([[99, 3]], [[101, 3]], update_id=20)
+    assert book.synced and book.apply_delta([], [[102, 1]], update_id=21)
+
+
+def test_crossed_book_unsyncs():
+    book = L2Book("X")
+    book.apply_snapshot([[99, 1]], [[101, 1]], update_id=1)
+    assert not book.apply_delta([[101.5, 1]], [], update_id=2)
+    assert not book.synced
+
+
+def test_bybit_messages_and_restart_snapshot():
+    book = L2Book("BTCUSDT")
+    snap = {"type": "snapshot", "ts": 1_000, "data": {"b": [["99", "1"]], "a": [["101", "1"]], "u": 7, "seq": 70}}
+    assert book.apply_bybit(snap) and (book.update_id, book.seq, book.timestamp) == (7, 70, 1.0)
+    delta = {"type": "delta", "ts": 2_000, "data": {"b": [["99", "0"], ["98", "4"]], "a": [], "u": 8, "seq": 71}}
+    assert book.apply_bybit(delta) and book.best_bid() == 98.0
+    assert not book.apply_bybit({"type": "delta", "data": {"b": [], "a": [], "u": 10}})
+    restart = {"type": "delta", "data": {"b": [["90", "1"]], "a": [["91", "1"]], "u": 1}}
+    assert book.apply_bybit(restart) and book.synced and book.mid() == 90.5
+
+
+def test_cost_to_fill_walks_levels_and_caches_ladder():
+    book = L2Book("X")
+    book.apply_snapshot([[100, 1], [99, 2]], [[101, 1], [102, 2], [103, 1]], update_id=1)
+    assert book.cost_to_fill("buy", 2.5) == pytest.approx(101 + 1.5 * 102)
+    assert book.vwap("sell", 3) == pytest.approx((100 + 2 * 99) / 3)
+    costs = book.cost_to_fill("buy", np.array([0.5, 4.0, 4.5]))
+    assert costs[:2] == pytest.approx([50.5, 101 + 204 + 103]) and np.isnan(costs[2])
+    ladder = book.ladder("buy")
+    assert book.ladder("buy")[0] is ladder[0]
+    book.apply_delta([], [[101, 0]], update_id=2)
+    assert book.ladder("buy")[0].tolist() == [102.0, 103.0] and book.depth("buy") == 3.0
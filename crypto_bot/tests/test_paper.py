@@ -0,0 +1,58 @@
+import asyncio
+
+import pytest
+
+from crypto_bot.exchanges.paper import PaperExchange, SimClock, LatencyModel
+
+
+def _venue(tape, **kwargs):
+    kwargs.setdefault("balances", {"KRW": 1_000.0, "BTC": 2.0})
+    return PaperExchange("upbit", tape, clock=SimClock(start=0.0), **kwargs)
+
+
+def test_market_buy_sweeps_levels(book_tape):
+    ex = _venue(book_tape, taker_fee=0.001)
+    order = asyncio.run(ex.place_order("KRW-BTC", "bid", "market", qty=1.5))
+    assert order.status == "filled"
+    assert order.filled_qty == pytest.approx(1.5)
+    assert order.avg_price == pytest.approx((101 + 0.5 * 102) / 1.5)
+    cost = 101 + 0.5 * 102
+    assert ex.balances["BTC"] == pytest.approx(3.5)
+    assert ex.balances["KRW"] == pytest.approx(1_000 - cost * 1.001)
+
+
+def test_market_buy_by_quote_amount(book_tape):
+    ex = _venue(book_tape)
+    order = asyncio.run(ex.place_order("KRW-BTC", "bid", "market", krw_amount=152))
+    assert order.filled_qty == pytest.approx(1.5)
+
+
+def test_limit_order_fills_only_marketable_part(book_tape):
+    ex = _venue(book_tape)
+    order = asyncio.run(ex.place_order("KRW-BTC", "ask", "limit", qty=2.0, price=99.5))
+    assert order.filled_qty == pytest.approx(1.0)    # 99.5 이상 매수호가는 100 한 단계
+    assert order.status == "open"
+
+
+def test_partial_fill(book_tape):
+    ex = _venue(book_tape, partial_fill_prob=1.0, min_fill_ratio=0.3, seed=1)
+    order = asyncio.run(ex.place_order("KRW-BTC", "ask", "market", qty=2.0))
+    assert order.status == "partiallyfilledcanceled"
+    assert 0.6 <= order.filled_qty < 2.0
+    assert ex.balances["BTC"] == pytest.approx(2.0 - order.filled_qty)
+
+
+def test_rejects_order_above_balance(book_tape):
+    ex = _venue(book_tape, balances={"KRW": 150.0, "BTC": 0.5})
+    with pytest.raises(RuntimeError, match="insufficient KRW"):
+        asyncio.run(ex.place_order("KRW-BTC", "bid", "market", qty=2.0))
+    with pytest.raises(RuntimeError, match="insufficient BTC"):
+        asyncio.run(ex.place_order("KRW-BTC", "ask", "market", qty=1.0))
+    assert ex.orders == {} and ex.balances == {"KRW": 150.0, "BTC": 0.5}
+
+
+def test_latency_advances_virtual_clock(book_tape):
+    ex = _venue(book_tape, latency=LatencyModel(50.0))
+    ex.clock.speed = 1000.0
+    asyncio.run(ex.place_order("KRW-BTC", "bid", "market", qty=0.1))
+    assert ex.clock.now() == pytest.approx(0.1)   # 전송 + 응답 편도 지연
@@ -0,0 +1,207 @@
+import asyncio
+import json
+import time
+from typing import Optional
+
+import pytest
+from aiohttp import WSMsgType, web
+from aiohttp.test_utils import TestServer
+
+from crypto_bot.exchanges import streams
+from crypto_bot.exchanges.streams import BybitStream, UpbitStream
+
+
+def _bybit_book(symbol: str, kind: str, u: int, bids, asks) -> dict:
+    return {"topic": f"orderbook.50.{symbol}", "type": kind, "ts": 1_700_000_000_000,
+            "data": {"s": symbol, "u": u, "b": bids, "a": asks}}
+
+
+def test_upbit_orderbook_snapshot_notifies_listeners():
+    stream = UpbitStream(["KRW-BTC"])
+    stream.connected = True
+    events = []
+    stream.add_listener(lambda kind, symbol: events.append((kind, symbol)))
+    stream._handle({"type": "orderbook", "code": "KRW-BTC", "timestamp": 1_700_000_000_000,
+                    "orderbook_units": [{"bid_price": 100, "bid_size": 1, "ask_price": 101, "ask_size": 2}]})
+    assert events == [("orderbook", "KRW-BTC")]
+    assert stream.book("KRW-BTC").mid() == 100.5
+
+
+def test_bybit_delta_gap_resyncs_every_topic():
+    async def run():
+        stream = BybitStream(["BTCUSDT", "ETHUSDT"])
+        sent = []
+
+        async def resubscribe(topic):
+            sent.append(topic)
+            await asyncio.sleep(10)
+        stream._resubscribe = resubscribe
+
+        for symbol in ("BTCUSDT", "ETHUSDT"):
+            stream._handle(_bybit_book(symbol, "snapshot", 1, [["100", "1"]], [["101", "1"]]))
+            stream._handle(_bybit_book(symbol, "delta", 2, [["100", "2"]], []))
+            stream._handle(_bybit_book(symbol, "delta", 5, [], []))   # u 3, 4 누락
+            stream._handle(_bybit_book(symbol, "delta", 6, [], []))   # 재동기화 중에는 한 번만
+        await asyncio.sleep(0)
+        assert stream.resyncs == 2
+        assert sorted(sent) == ["orderbook.50.BTCUSDT", "orderbook.50.ETHUSDT"]
+        assert len(stream._resync_tasks) == 2
+        book = stream.books["BTCUSDT"]
+        assert book.bids.qtys[-1] == 2 and not book.synced   # 누락 전 델타까지 반영, 스냅샷 대기
+
+        tasks = list(stream._resync_tasks)
+        await stream.close()
+        assert all(t.cancelled() for t in tasks)
+        assert not stream._resync_tasks
+
+        stream._handle(_bybit_book("BTCUSDT", "snapshot", 1, [["100", "1"]], [["101", "1"]]))
+        assert stream.books["BTCUSDT"].synced
+
+    asyncio.run(run())
+
+
+# ── Fake websocket venue ──────────────────────────────────────────────────────
+class FakeVenue:
+    """Local aiohttp websocket server: records what each connection sent, lets the test push/drop."""
+
+    def __init__(self):
+        self.connections: list[dict] = []
+        self.attempts: list[float] = []    # 핸드셰이크 시도 시각 (거절 포함)
+        self.refuse = 0                    # 앞으로 거절할 연결 수
+        self.server: Optional[TestServer] = None
+
+    async def __aenter__(self):
+        app = web.Application()
+        app.router.add_get("/ws", self._handler)
+        self.server = TestServer(app)
+        await self.server.start_server()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.server.close()
+
+    @property
+    def url(self) -> str:
+        return str(self.server.make_url("/ws"))
+
+    async def _handler(self, request):
+        self.attempts.append(time.monotonic())
+        if self.refuse:
+            self.refuse -= 1
+            return web.Response(status=503)
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        conn = {"ws": ws, "received": [], "at": time.monotonic()}
+        self.connections.append(conn)
+        async for msg in ws:
+            if msg.type == WSMsgType.TEXT:
+                conn["received"].append(json.loads(msg.data))
+        return ws
+
+    async def wait(self, predicate, timeout: float = 3.0):
+        deadline = time.monotonic() + timeout
+        while not predicate():
+            assert time.monotonic() < deadline, "timed out waiting for the stream"
+            await asyncio.sleep(0.01)
+
+    def topics(self, conn: dict) -> set:
+        return {t for m in conn["received"] if m.get("op") == "subscribe" for t in m["args"]}
+
+
+@pytest.fixture
+def fast_reconnect(monkeypatch):
+    monkeypatch.setattr(streams, "RECONNECT_MIN", 0.05)
+
+
+def test_bybit_reconnects_resubscribes_and_waits_for_snapshot(fast_reconnect):
+    async def run():
+        async with FakeVenue() as venue:
+            stream = BybitStream(["BTCUSDT"], url=venue.url)
+            await stream.start()
+            await venue.wait(lambda: venue.connections and venue.topics(venue.connections[0]))
+            first = venue.connections[0]
+            assert venue.topics(first) == {"tickers.BTCUSDT", "orderbook.50.BTCUSDT", "publicTrade.BTCUSDT"}
+
+            await first["ws"].send_json(_bybit_book("BTCUSDT", "snapshot", 1, [["100", "1"]], [["101", "1"]]))
+            await venue.wait(lambda: stream.book("BTCUSDT") is not None)
+
+            await first["ws"].close()   # 서버가 연결을 끊음
+            await venue.wait(lambda: len(venue.connections) == 2 and venue.topics(venue.connections[1]))
+            second = venue.connections[1]
+            assert venue.topics(second) == venue.topics(first)
+            assert stream.reconnects == 1
+            assert stream.connected and stream.book("BTCUSDT") is None   # 새 스냅샷 전까지 호가 없음
+
+            await second["ws"].send_json(_bybit_book("BTCUSDT", "snapshot", 1, [["200", "1"]], [["201", "1"]]))
+            await venue.wait(lambda: stream.book("BTCUSDT") is not None)
+            assert stream.book("BTCUSDT").mid() == 200.5
+            await stream.close()
+            assert not stream.connected
+
+    asyncio.run(run())
+
+
+def test_reconnect_backoff_doubles_and_resets_after_connect(fast_reconnect):
+    async def run():
+        async with FakeVenue() as venue:
+            venue.refuse = 3
+            stream = BybitStream([], url=venue.url)
+            await stream.start()
+            await venue.wait(lambda: venue.connections)
+            await venue.connections[0]["ws"].close()
+            await venue.wait(lambda: len(venue.connections) == 2)
+            await stream.close()
+            gaps = [b - a for a, b in zip(venue.attempts, venue.attempts[1:])]
+            # 거절 3번: 0.05 → 0.1 → 0.2 초, 연결 성공 후 끊기면 다시 0.05 초
+            assert [round(g, 2) >= d for g, d in zip(gaps, (0.05, 0.1, 0.2, 0.05))] == [True] * 4
+            assert gaps[2] > 1.5 * gaps[1] > 2 * gaps[0]
+            assert gaps[3] < gaps[2]
+            assert stream.reconnects == 4
+
+    asyncio.run(run())
+
+
+def test_subscribe_while_connected_sends_new_topics(fast_reconnect):
+    async def run():
+        async with FakeVenue() as venue:
+            stream = BybitStream(["BTCUSDT"], url=venue.url)
+            await stream.start()
+            await venue.wait(lambda: stream.connected and venue.topics(venue.connections[0]))
+            await stream.subscribe(["BTCUSDT", "ETHUSDT"])   # 이미 있는 심볼은 다시 보내지 않음
+            conn = venue.connections[0]
+            await venue.wait(lambda: "orderbook.50.ETHUSDT" in venue.topics(conn))
+            sent = [t for m in conn["received"] if m.get("op") == "subscribe" for t in m["args"]]
+            assert sent.count("orderbook.50.BTCUSDT") == 1
+            assert stream.symbols == ["BTCUSDT", "ETHUSDT"]
+            await stream.close()
+
+    asyncio.run(run())
+
+
+def test_upbit_resubscribe_replaces_with_every_code(fast_reconnect):
+    async def run():
+        async with FakeVenue() as venue:
+            stream = UpbitStream(["KRW-BTC"], url=venue.url)
+            await stream.start()
+            await venue.wait(lambda: stream.connected and venue.connections[0]["received"])
+            await stream.subscribe(["KRW-ETH"])
+            conn = venue.connections[0]
+            await venue.wait(lambda: len(conn["received"]) == 2)
+            codes = {part["type"]: part["codes"] for part in conn["received"][1] if "type" in part}
+            assert codes == {t: ["KRW-BTC", "KRW-ETH"] for t in ("ticker", "orderbook", "trade")}
+            await stream.close()
+
+    asyncio.run(run())
+
+
+def test_bybit_keepalive_sends_application_ping(fast_reconnect):
+    async def run():
+        async with FakeVenue() as venue:
+            stream = BybitStream(["BTCUSDT"], url=venue.url)
+            stream.ping_interval = 0.05
+            await stream.start()
+            await venue.wait(lambda: venue.connections
+                             and {"op": "ping"} in venue.connections[0]["received"])
+            await stream.close()
+
+    asyncio.run(run())